@@ -0,0 +1,57 @@
+"""Checks the NumPy batch scorer against the scalar Scorer on all 7776 ordered rolls and measures its throughput.
+
+Run from the repository root:
+    python benchmarks/bench_batch.py
+"""
+import os
+import sys
+import time
+from itertools import product
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine import Scorer, ScoreKeeper, batch
+from engine.categories import CATEGORIES
+
+BATCH_SIZE = 2_000_000
+
+
+def check():
+    """Asserts that batch.score_dice and batch.yahtzee_bonus match Scorer.score_roll on all 7776 ordered rolls
+    for boards with an empty, zeroed and scored yahtzee category."""
+    dice = np.array(list(product(range(1, 7), repeat=5)))
+    matrix = batch.score_dice(dice)
+    counts = batch.face_counts(dice)
+    for yahtzee_box in (None, 0, 50):
+        boxes = np.full(len(dice), batch.UNSCORED if yahtzee_box is None else yahtzee_box)
+        bonus = batch.yahtzee_bonus(counts, boxes)
+        for row, roll in enumerate(dice.tolist()):
+            for column, category in enumerate(CATEGORIES):
+                if category == "yahtzee" and yahtzee_box is not None:
+                    continue
+                board = ScoreKeeper()
+                board.score_board_dict["yahtzee"] = yahtzee_box
+                assert Scorer(list(roll), board).score_roll(category) == matrix[row, column], (roll, category)
+                assert board.score_board_dict["yahtzee bonus"] == bonus[row], (roll, yahtzee_box)
+
+
+def main():
+    """Scores BATCH_SIZE random rolls from dice and from face counts and prints rolls per second for each."""
+    check()
+    dice = np.random.default_rng(0).integers(1, 7, size=(BATCH_SIZE, 5))
+    start = time.perf_counter()
+    matrix = batch.score_dice(dice)
+    from_dice = time.perf_counter() - start
+    counts = batch.face_counts(dice)
+    start = time.perf_counter()
+    batch.score_counts(counts)
+    from_counts = time.perf_counter() - start
+    print(f"score_dice    {BATCH_SIZE / from_dice / 1e6:6.2f} M rolls/s")
+    print(f"score_counts  {BATCH_SIZE / from_counts / 1e6:6.2f} M rolls/s")
+    assert matrix.shape == (BATCH_SIZE, len(CATEGORIES))
+
+
+if __name__ == "__main__":
+    main()
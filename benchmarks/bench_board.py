@@ -0,0 +1,106 @@
+"""Memory and query benchmark of the compact Board against the dict score board ScoreKeeper kept before it.
+
+Run from the repository root:
+    python benchmarks/bench_board.py [--boards N]
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine.board import Board
+from engine.categories import BONUS_CATEGORIES, CATEGORIES, UPPER_CATEGORIES
+from engine.scoreboard import ScoreKeeper
+
+
+class LegacyScoreKeeper:
+    """The dict backed ScoreKeeper: every category name maps to its score or None and the bonus and final score are summed
+    from the dict each time they are asked for."""
+
+    def __init__(self):
+        self.score_board_dict = dict.fromkeys(CATEGORIES)
+        self.score_board_dict.update(dict.fromkeys(BONUS_CATEGORIES, 0))
+        self.scord_board_upper_list = UPPER_CATEGORIES
+
+    def score_bonus(self):
+        upper = sum(self.score_board_dict[category] or 0 for category in self.scord_board_upper_list)
+        self.score_board_dict["upper bonus"] = 35 if upper >= 63 else 0
+
+    def end_of_game_score(self):
+        self.score_bonus()
+        self.score_final = sum(score for score in self.score_board_dict.values() if score is not None)
+        return self.score_final
+
+
+def filled_boards(make, count, score):
+    """Expects a board factory, a count and a function writing (board, category, points). Returns count boards each holding
+    a random half of the categories with random points, the same boards for every factory."""
+    rng = random.Random(0)
+    boards = []
+    for _ in range(count):
+        board = make()
+        for category in rng.sample(CATEGORIES, len(CATEGORIES) // 2):
+            score(board, category, rng.randrange(31))
+        boards.append(board)
+    return boards
+
+
+def legacy_score(board, category, points):
+    board.score_board_dict[category] = points
+
+
+def board_score(board, category, points):
+    board.score(CATEGORIES.index(category), points)
+
+
+def view_score(board, category, points):
+    board.score_board_dict[category] = points
+
+
+def bytes_per_board(make, count, score):
+    """Returns the bytes allocated per board while building count filled boards."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    boards = filled_boards(make, count, score)
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del boards
+    return used / count
+
+
+def check():
+    """Asserts the Board and the dict board agree on the final score of the same boards, and the view reads back the dict."""
+    legacy = filled_boards(LegacyScoreKeeper, 1000, legacy_score)
+    keepers = filled_boards(ScoreKeeper, 1000, view_score)
+    for old, new in zip(legacy, keepers):
+        assert old.end_of_game_score() == new.end_of_game_score()
+        assert dict(new.score_board_dict.items()) == old.score_board_dict
+
+
+def main():
+    """Prints the bytes per board of each representation and the time to ask a board for its bonus and final score."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--boards", type=int, default=100_000)
+    args = parser.parse_args()
+    check()
+    legacy = bytes_per_board(LegacyScoreKeeper, args.boards, legacy_score)
+    compact = bytes_per_board(Board, args.boards, board_score)
+    keeper = bytes_per_board(ScoreKeeper, args.boards, view_score)
+    print(f"dict ScoreKeeper    {legacy:8.1f} bytes per board")
+    print(f"Board               {compact:8.1f} bytes per board ({legacy / compact:.1f}x smaller)")
+    print(f"ScoreKeeper + view  {keeper:8.1f} bytes per board")
+
+    old = filled_boards(LegacyScoreKeeper, 1000, legacy_score)
+    new = filled_boards(Board, 1000, board_score)
+    legacy_time = min(timeit.repeat(lambda: [board.end_of_game_score() for board in old], number=10, repeat=5))
+    board_time = min(timeit.repeat(lambda: [board.final_score() for board in new], number=10, repeat=5))
+    print(f"dict final score    {legacy_time / 10_000 * 1e9:8.1f} ns per board")
+    print(f"Board final score   {board_time / 10_000 * 1e9:8.1f} ns per board ({legacy_time / board_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
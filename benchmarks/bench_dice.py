@@ -0,0 +1,46 @@
+"""Measures the engine.dice sources against the per-die random.randint calls turns used to make: the cost of the five dice
+of a roll, one roll at a time the way a turn asks for them, and of generating a million faces in bulk.
+
+Run from the repository root:
+    python benchmarks/bench_dice.py
+"""
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine.dice import BufferedDice, RandomDice, game_dice
+
+ROLLS = 100000
+BULK = 1000000
+
+
+def best_of(function, number, repeat=5):
+    """Returns the best time of repeat runs of function called number times, in seconds per call."""
+    return min(timeit.repeat(function, number=number, repeat=repeat)) / number
+
+
+def main():
+    """Prints the time per roll of five dice and per face in bulk for each source, and the speedup over randint."""
+    rng = random.Random(0)
+    per_die = best_of(lambda: [[rng.randint(1, 6) for _ in range(5)] for _ in range(ROLLS)], 1) / ROLLS
+    sources = {
+        "RandomDice": RandomDice(random.Random(0)),
+        "BufferedDice": BufferedDice(0),
+        "game_dice": game_dice(0, 0),
+    }
+    print(f"{'random.randint':<16}{per_die * 1e9:8.0f} ns per roll of 5")
+    for name, source in sources.items():
+        per_roll = best_of(lambda: [source.roll(5) for _ in range(ROLLS)], 1) / ROLLS
+        print(f"{name:<16}{per_roll * 1e9:8.0f} ns per roll of 5 ({per_die / per_roll:.1f}x)")
+    bulk_randint = best_of(lambda: [rng.randint(1, 6) for _ in range(BULK)], 1, 3) / BULK
+    buffered = BufferedDice(0)
+    bulk_buffered = best_of(lambda: buffered.faces(BULK), 1, 3) / BULK
+    print(f"bulk randint    {bulk_randint * 1e9:8.1f} ns per face")
+    print(f"bulk buffered   {bulk_buffered * 1e9:8.1f} ns per face ({bulk_randint / bulk_buffered:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
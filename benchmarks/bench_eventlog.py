@@ -0,0 +1,76 @@
+"""Measures the size and cost of the binary event log: logs two player greedy games, then streams them back and replays them
+through the engine, checking the replayed final scores against the scores of the games as they were played.
+
+Run from the repository root:
+    python benchmarks/bench_eventlog.py [games]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine.eventlog import EventLog, read_records, replay
+from engine.game import Game
+from engine.scoreboard import ScoreKeeper
+from engine.simulate import play_turn
+from engine.strategies import GreedyStrategy
+from engine.turn import TurnTaker
+
+
+def play_games(games, log=None):
+    """Plays games two player greedy games, logged when log is given. Returns the final scores of every game."""
+    strategy = GreedyStrategy()
+    finals = []
+    for number in range(games):
+        rng = random.Random(number)
+        strategy.start_game(rng)
+        players = [TurnTaker(ScoreKeeper(), rng) for _ in range(2)]
+        match = Game(players)
+        if log is not None:
+            log.listen(match)
+        match.start()
+        while match.state != Game.GAME_OVER:
+            play_turn(match, strategy)
+        finals.append(tuple(player.board.scores.final_score() for player in players))
+    return finals
+
+
+def main():
+    """Prints the bytes per turn, the cost of logging with a write every turn and with a 64 KiB buffer, and the read and replay throughput."""
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "games.log")
+        start = time.perf_counter()
+        expected = play_games(games)
+        unlogged = time.perf_counter() - start
+        turns = games * 2 * 13
+        for buffer_size in (0, 1 << 16):
+            if os.path.exists(path):
+                os.remove(path)
+            start = time.perf_counter()
+            with EventLog(path, buffer_size) as log:
+                assert play_games(games, log) == expected
+            logged = time.perf_counter() - start
+            print(
+                f"buffer {buffer_size:6d} bytes: logging adds {(logged - unlogged) / turns * 1e6:6.2f} us per turn "
+                f"({logged / unlogged - 1:.1%} of play time)"
+            )
+        print(f"{os.path.getsize(path) / turns:6.1f} bytes per turn, {os.path.getsize(path) / games:6.1f} bytes per game")
+
+        start = time.perf_counter()
+        records = sum(1 for _ in read_records(path))
+        elapsed = time.perf_counter() - start
+        print(f"read_records  {records / elapsed:10.0f} records/s")
+
+        start = time.perf_counter()
+        replayed = [tuple(board.scores.final_score() for board in boards) for _, boards in replay(path)]
+        elapsed = time.perf_counter() - start
+        assert replayed == expected
+        print(f"replay        {games / elapsed:10.0f} games/s, final scores match")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Measures how long HoldOptimizer takes to rank the 32 holds of a roll, for a board seen for the first time and for a board
+already in its caches, and reports the cache hit rates over a run of simulated games.
+
+Run from the repository root:
+    python benchmarks/bench_holds.py [value table path]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine import ScoreKeeper, solver
+from engine.holds import HoldOptimizer
+from engine.simulate import simulate, summarize
+from engine.strategies import OptimalStrategy
+
+QUERIES = 20000
+
+
+def main():
+    """Prints cold and warm rank_holds latency with and without a value table, then the hit rates of an optimal strategy's caches."""
+    path = sys.argv[1] if len(sys.argv) > 1 else solver.DEFAULT_TABLE_PATH
+    values = solver.load_table(path) if os.path.exists(path) else None
+    rng = random.Random(0)
+    rolls = [[rng.randint(1, 6) for _ in range(5)] for _ in range(QUERIES)]
+    for label, table in (("no table", None), ("value table", values)):
+        if label == "value table" and table is None:
+            print(f"value table: {path} missing, run python -m engine.solver")
+            continue
+        optimizer = HoldOptimizer(table)
+        board = ScoreKeeper()
+        start = time.perf_counter()
+        optimizer.rank_holds(rolls[0], 2, board)
+        cold = time.perf_counter() - start
+        start = time.perf_counter()
+        for roll in rolls:
+            optimizer.rank_holds(roll, 2, board)
+        warm = (time.perf_counter() - start) / QUERIES
+        print(f"{label:12s} cold {cold * 1e3:6.3f} ms, warm {warm * 1e6:6.1f} us per rank_holds")
+    if values is not None:
+        strategy = OptimalStrategy(path)
+        strategy.get_optimizer()
+        summarize(simulate(strategy, 200, workers=1, seed=1))
+        for name, info in strategy.optimizer.cache_info().items():
+            print(f"{name:18s} hits {info.hits:7d} misses {info.misses:6d}")
+        print(f"overall hit rate {strategy.optimizer.hit_rate():.1%}")
+
+
+if __name__ == "__main__":
+    main()
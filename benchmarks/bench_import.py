@@ -0,0 +1,45 @@
+"""Measures how long a fresh interpreter takes to import the headless engine package.
+
+Run from the repository root:
+    python benchmarks/bench_import.py
+"""
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUNS = 20
+
+
+def import_time_ms(module):
+    """Expects a module name. Imports it in a fresh interpreter with -X importtime and returns the cumulative import time in milliseconds."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    for line in result.stderr.splitlines():
+        fields = [field.strip() for field in line.split("|")]
+        if len(fields) == 3 and fields[2] == module:
+            return int(fields[1]) / 1000
+    raise RuntimeError(f"{module} missing from importtime output")
+
+
+def main():
+    """Imports the engine RUNS times and prints the best and median cumulative import time."""
+    times = sorted(import_time_ms("engine") for _ in range(RUNS))
+    print(f"import engine: best {times[0]:.2f} ms, median {times[len(times) // 2]:.2f} ms")
+    if "tkinter" in subprocess.run(
+        [sys.executable, "-c", "import sys, engine; print(' '.join(sys.modules))"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.split():
+        raise SystemExit("engine imported tkinter")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""Measures the category odds overlay: the one-off cost of building the engine.odds tables, which the game window does in a
+background thread, and the cost of looking up the odds of a hold, the work done on the event loop after every die click.
+
+Run from the repository root:
+    python benchmarks/bench_odds.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+QUERIES = 20000
+FRAME_MS = 1000 / 60
+
+
+def main():
+    """Prints the table build time, including the NumPy import, and the mean lookup time against a 60 Hz frame."""
+    start = time.perf_counter()
+    from engine.odds import TurnOdds
+
+    imported = time.perf_counter()
+    odds = TurnOdds()
+    built = time.perf_counter()
+    print(f"import {(imported - start) * 1e3:6.1f} ms, build {(built - imported) * 1e3:6.1f} ms, off the event loop")
+    rng = random.Random(0)
+    holds = [
+        ([rng.randint(1, 6) for _ in range(rng.randrange(6))], rng.randint(1, 2))
+        for _ in range(QUERIES)
+    ]
+    start = time.perf_counter()
+    for held_dice, rerolls in holds:
+        odds.lookup(held_dice, rerolls)
+    lookup = (time.perf_counter() - start) / QUERIES
+    print(f"lookup {lookup * 1e6:6.1f} us per hold, {lookup * 1e3 / FRAME_MS:.2%} of a 60 Hz frame")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Measures how long engine.opponent takes to decide a move at each strength, against the DEFAULT_TIME_BUDGET the game
+window allows before playing the fallback move. Decisions are timed over the moves of whole games played by the opponent,
+so the hard strength's cache warms up the way it does over a game.
+
+Run from the repository root:
+    python benchmarks/bench_opponent.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine import Game, ScoreKeeper, TurnTaker
+from engine.opponent import DEFAULT_TIME_BUDGET, STRENGTHS, Opponent
+
+GAMES = 5
+
+
+def decision_times(opponent, rng):
+    """Expects an Opponent and a random.Random. Plays GAMES solitaire games with it and returns the seconds of every decision."""
+    timings = []
+    for _ in range(GAMES):
+        turn = TurnTaker(ScoreKeeper(), rng)
+        match = Game([turn])
+        match.start()
+        while match.state != Game.GAME_OVER:
+            if match.state == Game.TURN_START:
+                match.roll()
+                continue
+            start = time.perf_counter()
+            move = opponent.decide(list(turn.roll_result), turn.num_rolls, turn.board.copy())
+            timings.append(time.perf_counter() - start)
+            if move.category is not None:
+                match.score(move.category)
+                continue
+            for index in move.keep:
+                match.hold(index)
+            match.roll()
+    return sorted(timings)
+
+
+def main():
+    """Prints the median and slowest decision of each strength, loading the hard strength's table before timing it."""
+    print(f"time budget {DEFAULT_TIME_BUDGET * 1e3:.0f} ms")
+    for strength in STRENGTHS:
+        opponent = Opponent(strength, seed=0)
+        if opponent.needs_table:
+            opponent.strategy.get_optimizer()
+        timings = decision_times(opponent, random.Random(0))
+        median = timings[len(timings) // 2]
+        print(f"{strength:<8}{median * 1e3:9.3f} ms median {timings[-1] * 1e3:9.3f} ms slowest over {len(timings)} decisions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Measures engine.regret throughput: choices analysed per second over an event log of two player heuristic games, in this
+process and across every core.
+
+Run from the repository root:
+    python benchmarks/bench_regret.py
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine import Game, ScoreKeeper, TurnTaker
+from engine.eventlog import EventLog
+from engine.regret import analyze
+from engine.simulate import play_turn
+from engine.strategies import HeuristicStrategy
+
+GAMES = 200
+
+
+def write_log(path, games, rng):
+    """Expects a path, a number of games and a random.Random. Logs that many two player heuristic games to path."""
+    strategy = HeuristicStrategy()
+    strategy.start_game(rng)
+    with EventLog(path, buffer_size=1 << 16) as log:
+        for _ in range(games):
+            match = Game([TurnTaker(ScoreKeeper(), rng) for _ in range(2)])
+            log.listen(match)
+            match.start()
+            while match.state != Game.GAME_OVER:
+                play_turn(match, strategy)
+
+
+def main():
+    """Prints the games and choices analysed per second with one worker and with every core."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "games.log")
+        write_log(path, GAMES, random.Random(0))
+        for workers in sorted({1, os.cpu_count()}):
+            start = time.perf_counter()
+            schema = analyze(path, os.path.join(directory, f"regret-{workers}"), workers)
+            elapsed = time.perf_counter() - start
+            print(
+                f"{workers:3d} workers  {schema['games'] / elapsed:7.1f} games/s  {schema['rows'] / elapsed:8.0f} choices/s"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Microbenchmark of the precomputed score table against the sort-and-set scoring methods that Scorer used before it.
+
+Run from the repository root:
+    python benchmarks/bench_scoring.py
+"""
+import os
+import sys
+import timeit
+from itertools import product
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine import table
+from engine.categories import CATEGORIES
+
+ALL_ROLLS = [list(roll) for roll in product(range(1, 7), repeat=5)]
+
+
+def legacy_scores(roll_result):
+    """Expects a roll result. Scores it in every category with the algorithms Scorer used before the lookup table,
+    sorting the list in place and building temporary sets. Returns the 13 scores."""
+    roll_result.sort()
+    singles = [sum(i for i in roll_result if i == face) for face in range(1, 7)]
+    three = (
+        sum(roll_result)
+        if roll_result[0] == roll_result[2]
+        or roll_result[1] == roll_result[3]
+        or roll_result[2] == roll_result[4]
+        else 0
+    )
+    four = (
+        sum(roll_result)
+        if roll_result[0] == roll_result[3] or roll_result[1] == roll_result[4]
+        else 0
+    )
+    if len(set(roll_result)) != 2:
+        full = 0
+    elif roll_result[0] != roll_result[3] and roll_result[1] != roll_result[4]:
+        full = 25
+    else:
+        full = 0
+    if len(set(roll_result)) < 4:
+        small = 0
+    elif (
+        (len(set([1, 2, 3, 4]).intersection(set(roll_result))) == 4)
+        or (len(set([2, 3, 4, 5]).intersection(set(roll_result))) == 4)
+        or (len(set([3, 4, 5, 6]).intersection(set(roll_result))) == 4)
+    ):
+        small = 30
+    else:
+        small = 0
+    if len(set(roll_result)) < 5:
+        large = 0
+    elif (len(set([1, 2, 3, 4, 5]).intersection(set(roll_result))) == 5) or (
+        len(set([2, 3, 4, 5, 6]).intersection(set(roll_result))) == 5
+    ):
+        large = 40
+    else:
+        large = 0
+    yahtzee = 50 if len(set(roll_result)) == 1 else 0
+    return [*singles, three, four, full, small, large, yahtzee, sum(roll_result)]
+
+
+def check():
+    """Asserts that the table matches the legacy algorithms on all 7776 ordered rolls and never reorders the roll."""
+    for roll in ALL_ROLLS:
+        before = list(roll)
+        looked_up = [table.score(roll, category) for category in CATEGORIES]
+        assert roll == before, roll
+        assert looked_up == legacy_scores(list(roll)), roll
+
+
+def main():
+    """Times scoring all 7776 ordered rolls in every category with both implementations and prints the speedup."""
+    check()
+    rolls = [list(roll) for roll in ALL_ROLLS]
+    lookups = len(rolls) * len(CATEGORIES)
+    legacy = min(
+        timeit.repeat(lambda: [legacy_scores(roll) for roll in rolls], number=1, repeat=5)
+    )
+    per_category = min(
+        timeit.repeat(
+            lambda: [table.score(roll, category) for roll in rolls for category in CATEGORIES],
+            number=1,
+            repeat=5,
+        )
+    )
+    whole_row = min(
+        timeit.repeat(lambda: [table.scores(roll) for roll in rolls], number=1, repeat=5)
+    )
+    print(f"legacy methods      {legacy / lookups * 1e9:8.1f} ns per category score")
+    print(f"table.score         {per_category / lookups * 1e9:8.1f} ns per category score ({legacy / per_category:.1f}x)")
+    print(f"table.scores        {whole_row / lookups * 1e9:8.1f} ns per category score ({legacy / whole_row:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
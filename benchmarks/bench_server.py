@@ -0,0 +1,118 @@
+"""Load test of engine.server over loopback: starts the server in its own process, opens many connections that each join a
+two player table and play a whole game with the greedy strategy, and reports the latency of every action, from writing the
+request to reading the event it caused, plus the action throughput. The clients share one event loop in this process.
+
+Run from the repository root:
+    python benchmarks/bench_server.py [connections]
+"""
+import asyncio
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from engine.scoreboard import ScoreKeeper
+from engine.strategies import GreedyStrategy
+
+RESPONSES = ("rolled", "held", "scored")
+
+
+async def play(host, port, number, latencies, connected):
+    """Plays one connection's game, appending the latency of each action to latencies. Returns the final scores."""
+    reader, writer = await asyncio.open_connection(host, port)
+    strategy = GreedyStrategy()
+    board = ScoreKeeper()
+    seat = None
+    pending = []
+    sent_at = None
+
+    def send(request):
+        nonlocal sent_at
+        sent_at = time.perf_counter()
+        writer.write(json.dumps(request).encode() + b"\n")
+
+    def after_roll(event):
+        dice, rolls_left = event["dice"], event["rolls_left"]
+        kept = strategy.choose_keep(dice, rolls_left, board) if rolls_left else set(range(5))
+        if len(kept) == 5:
+            send({"op": "score", "category": strategy.choose_category(dice, board)})
+        else:
+            pending.extend({"op": "hold", "index": index} for index in sorted(kept))
+            pending.append({"op": "roll"})
+            send(pending.pop(0))
+
+    await connected.wait()
+    send({"op": "join", "name": f"bot {number}", "seats": 2})
+    while True:
+        line = await reader.readline()
+        if not line:
+            raise ConnectionError("server closed the connection")
+        event = json.loads(line)
+        kind = event["event"]
+        if kind == "error":
+            raise RuntimeError(event["message"])
+        if kind == "game over":
+            writer.close()
+            return event["scores"]
+        if kind == "joined" and seat is None:
+            seat = event["seat"]
+        if event["seat"] != seat or kind in ("joined", "started"):
+            continue
+        if kind in RESPONSES:
+            latencies.append(time.perf_counter() - sent_at)
+        if kind == "turn started":
+            send({"op": "roll"})
+        elif kind == "rolled":
+            after_roll(event)
+        elif kind == "held":
+            send(pending.pop(0))
+        elif kind == "scored":
+            board.score_board_dict[event["category"]] = event["score"]
+
+
+def percentile(values, fraction):
+    """Returns the value at fraction of the way through the sorted values."""
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+async def load_test(host, port, connections):
+    """Connects every client, lets them play once all are connected and prints the latency percentiles."""
+    latencies = []
+    connected = asyncio.Barrier(connections + 1)
+    clients = [asyncio.create_task(play(host, port, number, latencies, connected)) for number in range(connections)]
+    await connected.wait()
+    start = time.perf_counter()
+    results = await asyncio.gather(*clients)
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    print(f"{connections} connections, {len(results) // 2} tables, {len(latencies)} actions in {elapsed:.1f}s ({len(latencies) / elapsed:.0f}/s)")
+    print(
+        f"action latency p50 {percentile(latencies, 0.5) * 1e3:.2f} ms, p99 {percentile(latencies, 0.99) * 1e3:.2f} ms, "
+        f"max {latencies[-1] * 1e3:.2f} ms"
+    )
+
+
+def main():
+    """Starts the server on a free port, runs the load test against it and stops the server."""
+    connections = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    server = subprocess.Popen(
+        [sys.executable, "-m", "engine.server", "--port", "0", "--turn-timeout", "120", "--seed", "0"],
+        cwd=ROOT,
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        host, port = re.match(r"serving on (.+):(\d+)", server.stdout.readline()).groups()
+        asyncio.run(load_test(host, int(port), connections))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
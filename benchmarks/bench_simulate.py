@@ -0,0 +1,31 @@
+"""Measures simulation throughput per worker for one worker up to every core, to check that it scales close to linearly.
+
+Run from the repository root:
+    python benchmarks/bench_simulate.py [games per worker]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine.simulate import simulate, summarize
+from engine.strategies import GreedyStrategy
+
+
+def main():
+    """Simulates the same number of games per worker for each worker count and prints games/s per worker and the scaling efficiency."""
+    games_per_worker = int(sys.argv[1]) if len(sys.argv) > 1 else 4000
+    counts = sorted({1, 2, 4, 8, 16, os.cpu_count()} & set(range(1, os.cpu_count() + 1)))
+    baseline = None
+    for workers in counts:
+        games = games_per_worker * workers
+        start = time.perf_counter()
+        summarize(simulate(GreedyStrategy(), games, workers))
+        per_worker = games / (time.perf_counter() - start) / workers
+        baseline = baseline or per_worker
+        print(f"{workers:3d} workers  {per_worker:8.0f} games/s per worker  {per_worker / baseline:6.1%} of one worker")
+
+
+if __name__ == "__main__":
+    main()
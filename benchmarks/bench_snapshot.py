@@ -0,0 +1,69 @@
+"""Measures the engine.snapshot codec and autosave: packing and unpacking one player, packing a two player game, and the
+latency of the atomic save written after every roll and hold.
+
+Run from the repository root:
+    python benchmarks/bench_snapshot.py
+"""
+import os
+import random
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine import Game, ScoreKeeper, TurnTaker
+from engine.snapshot import Autosave, pack_game, pack_player, unpack_game, unpack_player
+
+NUMBER = 20000
+SAVES = 2000
+
+
+def best_of(function, number, repeat=5):
+    """Returns the best time of repeat runs of function called number times, in seconds per call."""
+    return min(timeit.repeat(function, number=number, repeat=repeat)) / number
+
+
+def mid_game():
+    """Returns a two player Game half way through, the current player holding two dice after a roll."""
+    rng = random.Random(0)
+    players = [TurnTaker(ScoreKeeper(), rng) for _ in range(2)]
+    for number, player in enumerate(players, start=1):
+        player.name = f"player{number}"
+    match = Game(players)
+    match.start()
+    for _ in range(12):
+        match.roll()
+        match.score(rng.choice(match.current_player.board.open_categories()))
+    match.roll()
+    match.hold(0)
+    match.hold(3)
+    return match
+
+
+def main():
+    """Prints the time per call of each codec function and the median and 99th percentile latency of an autosave."""
+    match = mid_game()
+    player = match.current_player
+    snapshot = pack_player(player)
+    data = pack_game(match)
+    copy = TurnTaker(ScoreKeeper(), random)
+    print(f"player snapshot {len(snapshot)} bytes, two player save {len(data)} bytes")
+    for name, function in (
+        ("pack_player", lambda: pack_player(player)),
+        ("unpack_player", lambda: unpack_player(snapshot, copy)),
+        ("pack_game", lambda: pack_game(match)),
+        ("unpack_game", lambda: unpack_game(data)),
+    ):
+        print(f"{name:<16}{best_of(function, NUMBER) * 1e6:8.2f} us")
+    with tempfile.TemporaryDirectory() as directory:
+        autosave = Autosave(os.path.join(directory, "autosave.bin"))
+        autosave.listen(match)
+        timings = timeit.repeat(lambda: autosave.record("held", player), number=1, repeat=SAVES)
+    timings.sort()
+    median, tail = timings[SAVES // 2], timings[SAVES * 99 // 100]
+    print(f"{'autosave':<16}{median * 1e6:8.2f} us median, {tail * 1e6:.2f} us at the 99th percentile")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Measures game window startup: the time from launching python yahtzee.py to the first paint of the welcome screen, and to the
+dice images having loaded in the background after it. Runs the game under a virtual X server, starting Xvfb when DISPLAY is
+not set, and replaces mainloop with a probe that pumps the event loop until the window is painted and the images are cached.
+
+Run from the repository root:
+    python benchmarks/bench_startup.py [runs]
+"""
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import json, sys, time, tkinter
+launched = float(sys.argv[1])
+
+def probe(self, n=0):
+    gamegui = sys.modules["gamegui"]
+    while not gamegui.game.canvas.winfo_viewable():
+        self.update()
+    self.update_idletasks()
+    painted = time.monotonic()
+    while gamegui.game.preload is not None or len(gamegui._image_cache) < 12:
+        self.update()
+    loaded = time.monotonic()
+    print(json.dumps({"first_paint": painted - launched, "dice_loaded": loaded - launched}))
+    self.winfo_toplevel().destroy()
+
+tkinter.Misc.mainloop = probe
+sys.argv = ["yahtzee.py"]
+import yahtzee
+"""
+
+
+def start_display():
+    """Starts Xvfb on a free display number when no display is set. Returns the Xvfb process, or None if one is not needed.
+    Raises RuntimeError when there is no display and Xvfb is not installed."""
+    if os.environ.get("DISPLAY"):
+        return None
+    if shutil.which("Xvfb") is None:
+        raise RuntimeError("DISPLAY is not set and Xvfb is not installed")
+    for display in range(99, 120):
+        if not os.path.exists(f"/tmp/.X11-unix/X{display}"):
+            break
+    server = subprocess.Popen(["Xvfb", f":{display}", "-screen", "0", "1280x1080x24"], stderr=subprocess.DEVNULL)
+    for _ in range(100):
+        if os.path.exists(f"/tmp/.X11-unix/X{display}"):
+            break
+        time.sleep(0.05)
+    os.environ["DISPLAY"] = f":{display}"
+    return server
+
+
+def decode_time():
+    """Returns the seconds taken to decode the twelve dice images, the work that used to happen before the first paint."""
+    import tkinter as tk
+
+    root = tk.Tk()
+    root.withdraw()
+    start = time.perf_counter()
+    images = [
+        tk.PhotoImage(file=os.path.join(ROOT, "images", f"die{face}{highlight}.png"))
+        for highlight in ("", "_highlight")
+        for face in range(1, 7)
+    ]
+    elapsed = time.perf_counter() - start
+    del images
+    root.destroy()
+    return elapsed
+
+
+def main():
+    """Launches the game runs times and prints the median time to first paint and to the dice images being loaded."""
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    try:
+        server = start_display()
+    except RuntimeError as error:
+        sys.exit(f"{error}, install xvfb to run the startup benchmark")
+    try:
+        results = []
+        for _ in range(runs):
+            launched = time.monotonic()
+            output = subprocess.run(
+                [sys.executable, "-c", PROBE, str(launched)], cwd=ROOT, capture_output=True, text=True, check=True
+            ).stdout
+            results.append(json.loads(output.splitlines()[-1]))
+        first_paint = statistics.median(result["first_paint"] for result in results)
+        dice_loaded = statistics.median(result["dice_loaded"] for result in results)
+        print(f"first paint   {first_paint * 1e3:7.1f} ms median of {runs} launches")
+        print(f"dice loaded   {dice_loaded * 1e3:7.1f} ms, in idle callbacks after the first paint")
+        print(f"dice decode   {decode_time() * 1e3:7.1f} ms that no longer delays the first paint")
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Measures engine.winprob: the time to open the moments table and the time of each win probability estimate over seeded two
+player games played with the optimal strategy, one estimate after every roll the way the game window makes them.
+
+Run from the repository root, after python -m engine.winprob has written the table:
+    python benchmarks/bench_winprob.py [games]
+"""
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine import ScoreKeeper, TurnTaker, winprob
+from engine.strategies import OptimalStrategy
+
+
+def main():
+    """Plays the games and prints the median, 99th percentile and slowest estimate, with and without warm caches."""
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    start = time.perf_counter()
+    moments = winprob.load_moments()
+    print(f"table opened in {(time.perf_counter() - start) * 1e3:.2f} ms")
+    strategy = OptimalStrategy()
+    estimator = winprob.WinEstimator(moments)
+    times = []
+    for seed in range(games):
+        rng = random.Random(seed)
+        boards = [ScoreKeeper(), ScoreKeeper()]
+        for _ in range(13):
+            for current, board in enumerate(boards):
+                turn = TurnTaker(board, rng)
+                turn.roll()
+                while True:
+                    start = time.perf_counter()
+                    estimator.win_probabilities([board.scores for board in boards], current, turn.roll_result, turn.num_rolls)
+                    times.append(time.perf_counter() - start)
+                    if not turn.can_roll():
+                        break
+                    kept = strategy.choose_keep(turn.roll_result, turn.num_rolls, board)
+                    if len(kept) == 5:
+                        break
+                    turn.kept_dice = set(kept)
+                    turn.roll()
+                turn.score_category(strategy.choose_category(turn.roll_result, board))
+    times.sort()
+    print(
+        f"{len(times)} estimates: median {statistics.median(times) * 1e3:.2f} ms, "
+        f"p99 {times[int(len(times) * 0.99)] * 1e3:.2f} ms, max {times[-1] * 1e3:.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+"""Benchmark suite for tracking performance between commits on the same machine. Measures
+    scorer      Scorer throughput per category
+    board       ScoreKeeper.end_of_game_score and score_bonus cost on filled boards
+    rules       score lookups and Scorer.score_roll under every engine.rules variant
+    highscores  store_player_scores, get_highscores and player statistics latency as the store grows to 1M scores
+    render      roll button click to rendered dice latency in the game window, under a virtual X server
+and saves the results as JSON in benchmarks/results, named after the commit, to compare against a saved run.
+
+Run from the repository root:
+    python benchmarks/suite.py [--only scorer board ...] [--quick] [--compare benchmarks/results/OLD.json]
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from engine.categories import CATEGORIES
+from engine.highscores import HighScores
+from engine.rules import RULES, get_rules
+from engine.scoreboard import ScoreKeeper
+from engine.scoring import Scorer
+
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+REGRESSION = 1.10
+
+
+def best_of(function, number, repeat=5):
+    """Returns the best time of repeat runs of function called number times, in seconds per call."""
+    return min(timeit.repeat(function, number=number, repeat=repeat)) / number
+
+
+def bench_scorer(quick):
+    """Times Scorer scoring 1000 seeded rolls in each category, the rolls scored into a fresh board every time."""
+    rng = random.Random(0)
+    rolls = [[rng.randint(1, 6) for _ in range(5)] for _ in range(1000)]
+    board = ScoreKeeper()
+    results = {}
+    for category in CATEGORIES:
+        index = CATEGORIES.index(category)
+
+        def score_all():
+            for roll in rolls:
+                Scorer(roll, board).score_roll(category)
+                board.scores.clear(index)
+
+        per_roll = best_of(score_all, 1, 3 if quick else 7) / len(rolls)
+        results[f"scorer/{category}"] = (per_roll * 1e9, "ns")
+    return results
+
+
+def bench_board(quick):
+    """Times end_of_game_score and score_bonus on 1000 randomly filled boards."""
+    rng = random.Random(0)
+    boards = []
+    for _ in range(1000):
+        board = ScoreKeeper()
+        for category in rng.sample(CATEGORIES, rng.randrange(len(CATEGORIES) + 1)):
+            board.score_board_dict[category] = rng.randrange(31)
+        boards.append(board)
+    number = 5 if quick else 50
+    final = best_of(lambda: [board.end_of_game_score() for board in boards], number) / len(boards)
+    bonus = best_of(lambda: [board.score_bonus() for board in boards], number) / len(boards)
+    return {"board/end_of_game_score": (final * 1e9, "ns"), "board/score_bonus": (bonus * 1e9, "ns")}
+
+
+def bench_rules(quick):
+    """Times looking up the score of 1000 seeded rolls in every category, and Scorer scoring them into a fresh board, under
+    each rules variant."""
+    rng = random.Random(0)
+    rolls = [[rng.randint(1, 6) for _ in range(5)] for _ in range(1000)]
+    results = {}
+    for name in RULES:
+        rules = get_rules(name)
+        board = ScoreKeeper(rules)
+        categories = rules.categories
+        lookups = len(rolls) * len(categories)
+
+        def look_up():
+            for roll in rolls:
+                for category in categories:
+                    rules.score(roll, category)
+
+        def score_all():
+            for roll in rolls:
+                for index, category in enumerate(categories):
+                    Scorer(roll, board).score_roll(category)
+                    board.scores.clear(index)
+                board.scores.yahtzee_bonus = 0
+
+        repeat = 3 if quick else 7
+        results[f"rules/{name}/score"] = (best_of(look_up, 1, repeat) / lookups * 1e9, "ns")
+        results[f"rules/{name}/score_roll"] = (best_of(score_all, 1, repeat) / lookups * 1e9, "ns")
+    return results
+
+
+def bench_highscores(quick):
+    """Grows a store to each size and times storing a two player game's scores and reading the top 10 the way the game window
+    does, opening the store for each call, and reading a player's statistics with percentiles and the leaderboard."""
+    sizes = (1_000, 10_000, 100_000) if quick else (1_000, 10_000, 100_000, 1_000_000)
+    rng = random.Random(0)
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "highscores.db")
+        stored = 0
+        for size in sizes:
+            with HighScores(path, None) as highscores:
+                highscores.add_many((f"player{n % 100}", rng.randrange(75, 400)) for n in range(size - stored))
+            stored = size
+            store_times = []
+            top_times = []
+            stats_times = []
+            for _ in range(20):
+                start = time.perf_counter()
+                with HighScores(path, None) as highscores:
+                    highscores.add_many(
+                        [("bench1", rng.randrange(75, 400), True, 0), ("bench2", rng.randrange(75, 400), False, 100)]
+                    )
+                store_times.append(time.perf_counter() - start)
+                start = time.perf_counter()
+                with HighScores(path, None) as highscores:
+                    highscores.top(10)
+                top_times.append(time.perf_counter() - start)
+                start = time.perf_counter()
+                with HighScores(path, None) as highscores:
+                    player = highscores.stats("player0")
+                    for percent in (10, 25, 50, 75, 90):
+                        player.percentile(percent)
+                    highscores.leaderboard()
+                stats_times.append(time.perf_counter() - start)
+                stored += 2
+            results[f"highscores/store/{size}"] = (statistics.median(store_times) * 1e6, "us")
+            results[f"highscores/top10/{size}"] = (statistics.median(top_times) * 1e6, "us")
+            results[f"highscores/stats/{size}"] = (statistics.median(stats_times) * 1e6, "us")
+    return results
+
+
+RENDER_PROBE = """
+import json, os, sys, tempfile, time, tkinter
+animate = sys.argv[1] == "1"
+
+def probe(self, n=0):
+    y = sys.modules["yahtzee"].start
+    game = y.game
+    game.animate_rolls = animate
+    root = self.winfo_toplevel()
+    while not game.canvas.winfo_viewable():
+        root.update()
+    next(child for child in game.canvas.winfo_children() if child.cget("text") == "One Player").invoke()
+    y.event_log.path = os.devnull
+    y.autosave.path = os.path.join(tempfile.mkdtemp(), "autosave.bin")
+    y.name_form.delete(0, "end")
+    y.name_form.insert(0, "bench")
+    drawn = []
+    roll_drawn = y.roll_drawn
+    y.roll_drawn = lambda player: (drawn.append(True), roll_drawn(player))
+    y.submit_name(None)
+    latencies = []
+    while len(latencies) < 24:
+        while not drawn:
+            root.update()
+        drawn.clear()
+        if y.match.state == "rolled":
+            start = time.perf_counter()
+            game.roll_button.invoke()
+            while not drawn:
+                root.update()
+            root.update_idletasks()
+            latencies.append(time.perf_counter() - start)
+            continue
+        y.match.score(y.match.current_player.open_categories()[0])
+    print(json.dumps(latencies))
+    y.autosave.clear()
+    os.rmdir(os.path.dirname(y.autosave.path))
+    root.destroy()
+
+tkinter.Misc.mainloop = probe
+sys.argv = ["yahtzee.py"]
+import yahtzee
+"""
+
+
+def bench_render(quick):
+    """Plays twelve turns of a game in the game window under a virtual X server, clicking roll after each drawn roll, and times
+    each click until the dice are drawn and the window has redrawn, with the roll animation off and on. The game is not finished,
+    so nothing is written to the high scores, its event log goes to os.devnull and its autosave to a temporary directory removed
+    afterwards, so the next launch does not offer to resume it."""
+    from bench_startup import start_display
+
+    try:
+        server = start_display()
+    except RuntimeError as error:
+        print(f"render skipped: {error}")
+        return {}
+    results = {}
+    try:
+        for animate in (False, True):
+            output = subprocess.run(
+                [sys.executable, "-c", RENDER_PROBE, "1" if animate else "0"],
+                cwd=ROOT,
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout
+            latencies = sorted(json.loads(output.splitlines()[-1]))
+            name = "animated" if animate else "static"
+            results[f"render/{name}/p50"] = (statistics.median(latencies) * 1e3, "ms")
+            results[f"render/{name}/max"] = (latencies[-1] * 1e3, "ms")
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+    return results
+
+
+BENCHMARKS = {
+    "scorer": bench_scorer,
+    "board": bench_board,
+    "rules": bench_rules,
+    "highscores": bench_highscores,
+    "render": bench_render,
+}
+
+
+def commit():
+    """Returns the short hash of the checked out commit, with + appended when the tree has uncommitted changes."""
+    try:
+        head = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True)
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT, capture_output=True, text=True)
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return head.stdout.strip() + ("+" if dirty.stdout.strip() else "")
+
+
+def compare(results, baseline_path):
+    """Prints each result next to the same result in a saved run, flagging results more than 10% slower."""
+    with open(baseline_path) as baseline_file:
+        baseline = json.load(baseline_file)
+    print(f"\ncompared to {baseline['commit']} ({baseline['timestamp']})")
+    for name, (value, unit) in results.items():
+        if name not in baseline["results"]:
+            continue
+        old = baseline["results"][name][0]
+        ratio = value / old if old else float("inf")
+        flag = "  REGRESSION" if ratio > REGRESSION else ""
+        print(f"{name:<32}{old:12.2f} -> {value:12.2f} {unit:<3}{ratio:7.2f}x{flag}")
+
+
+def main():
+    """Runs the selected benchmarks, prints and saves the results and compares them to a saved run when asked."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument("--quick", action="store_true", help="fewer repeats and at most 100k high scores")
+    parser.add_argument("--compare", default=None, help="saved results JSON to compare against")
+    parser.add_argument("--output", default=None, help="results path, benchmarks/results/<commit>-<time>.json by default")
+    args = parser.parse_args()
+    results = {}
+    for name in args.only:
+        start = time.perf_counter()
+        measured = BENCHMARKS[name](args.quick)
+        for key, (value, unit) in measured.items():
+            print(f"{key:<32}{value:12.2f} {unit}")
+        print(f"{name} done in {time.perf_counter() - start:.1f}s")
+        results.update(measured)
+    record = {
+        "commit": commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": {
+            "node": platform.node(),
+            "processor": platform.processor() or platform.machine(),
+            "cpus": os.cpu_count(),
+            "python": platform.python_version(),
+        },
+        "quick": args.quick,
+        "results": {name: [value, unit] for name, (value, unit) in results.items()},
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"{record['commit']}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as output_file:
+        json.dump(record, output_file, indent=2)
+    print(f"saved {output}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
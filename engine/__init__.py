@@ -0,0 +1,8 @@
+"""Headless Yahtzee engine. Holds the scoring, score keeping and turn logic used by the tkinter front-end
+so that rolls can be scored and turns advanced without a display."""
+
+from engine.scoring import Scorer, CATEGORIES, UPPER_CATEGORIES, BONUS_CATEGORIES
+from engine.scoreboard import ScoreKeeper
+from engine.turn import TurnTaker
+from engine.game import Game, IllegalMoveError
+from engine.rules import RULES, Rules, get_rules
@@ -0,0 +1,61 @@
+"""NumPy batch scoring. Scores millions of rolls at once from face-count histograms with no Python level loop per roll.
+Import this module explicitly with `from engine import batch`, the engine package does not import NumPy on its own."""
+
+import numpy as np
+
+from engine.categories import CATEGORIES
+
+FACES = np.arange(1, 7, dtype=np.int16)
+YAHTZEE_BONUS = 100
+UNSCORED = -1
+
+
+def face_counts(dice):
+    """Expects an (N, 5) integer array of dice faces. Returns an (N, 6) int16 array with the count of each face per roll."""
+    dice = np.asarray(dice)
+    if dice.ndim != 2 or dice.shape[1] != 5:
+        raise ValueError(f"expected an (N, 5) array of dice, got shape {dice.shape}")
+    if dice.size and (dice.min() < 1 or dice.max() > 6):
+        raise ValueError("dice faces must be between 1 and 6")
+    rows = len(dice)
+    offsets = (dice - 1) + 6 * np.arange(rows)[:, None]
+    return np.bincount(offsets.ravel(), minlength=6 * rows).reshape(rows, 6).astype(np.int16)
+
+
+def score_counts(counts):
+    """Expects an (N, 6) array of face counts. Returns an (N, 13) int16 score matrix with columns in CATEGORIES order."""
+    counts = np.asarray(counts, dtype=np.int16)
+    if counts.ndim != 2 or counts.shape[1] != 6:
+        raise ValueError(f"expected an (N, 6) array of face counts, got shape {counts.shape}")
+    scores = np.zeros((len(counts), len(CATEGORIES)), dtype=np.int16)
+    upper = counts * FACES
+    scores[:, :6] = upper
+    total = upper.sum(axis=1, dtype=np.int16)
+    most = counts.max(axis=1)
+    present = counts > 0
+    scores[:, 6] = np.where(most >= 3, total, 0)
+    scores[:, 7] = np.where(most >= 4, total, 0)
+    scores[:, 8] = np.where((counts == 3).any(axis=1) & (counts == 2).any(axis=1), 25, 0)
+    runs_of_four = present[:, :3] & present[:, 1:4] & present[:, 2:5] & present[:, 3:6]
+    scores[:, 9] = np.where(runs_of_four.any(axis=1), 30, 0)
+    runs_of_five = runs_of_four[:, :2] & present[:, 4:6]
+    scores[:, 10] = np.where(runs_of_five.any(axis=1), 40, 0)
+    scores[:, 11] = np.where(most == 5, 50, 0)
+    scores[:, 12] = total
+    return scores
+
+
+def score_dice(dice):
+    """Expects an (N, 5) integer array of dice faces. Returns the (N, 13) score matrix of score_counts."""
+    return score_counts(face_counts(dice))
+
+
+def yahtzee_bonus(counts, yahtzee_box):
+    """Expects an (N, 6) array of face counts and an (N,) array holding each board's yahtzee category score, UNSCORED (-1) where
+    the category is still empty. Applies the rule from Scorer.score_roll: a Yahtzee rolled on a board that already scored a
+    non-zero yahtzee earns the bonus. Returns an (N,) int16 array of 0 or YAHTZEE_BONUS."""
+    counts = np.asarray(counts)
+    yahtzee_box = np.asarray(yahtzee_box)
+    return np.where(
+        (counts.max(axis=1) == 5) & (yahtzee_box > 0), YAHTZEE_BONUS, 0
+    ).astype(np.int16)
@@ -0,0 +1,154 @@
+"""Compact score board for holding millions of boards in memory. Scores live in a bytearray of one byte per category next to
+a bitmask of the filled categories and running upper and total sums, so the bonus, final score and solver state are O(1) reads.
+A board follows the categories and bonuses of its engine.rules variant.
+BoardView presents a board as the score_board_dict the game window and Scorer have always used."""
+
+from engine.categories import NUM_UPPER
+from engine.rules import get_rules
+
+
+class Board:
+    """One player's scores. Bit i of filled is set once rules.categories[i] is scored, scores[i] then holds its points."""
+
+    __slots__ = ("rules", "scores", "filled", "upper", "total", "yahtzee_bonus")
+
+    def __init__(self, rules=None):
+        """Expects the Rules of the variant played, the default variant when None. Starts with every category open and every sum at zero."""
+        self.rules = rules or get_rules()
+        self.scores = bytearray(self.rules.num_categories)
+        self.filled = 0
+        self.upper = 0
+        self.total = 0
+        self.yahtzee_bonus = 0
+
+    def is_open(self, index):
+        """Expects a category index. Returns True if the category has not been scored."""
+        return not self.filled >> index & 1
+
+    def get(self, index):
+        """Expects a category index. Returns its score, or None if it has not been scored."""
+        return self.scores[index] if self.filled >> index & 1 else None
+
+    def score(self, index, points):
+        """Expects an open category index and its points. Records the score and updates the running sums."""
+        if self.filled >> index & 1:
+            raise ValueError(f"{self.rules.categories[index]} has already been scored")
+        self.scores[index] = points
+        self.filled |= 1 << index
+        self.total += points
+        if index < NUM_UPPER:
+            self.upper += points
+
+    def clear(self, index):
+        """Expects a category index. Makes the category open again and takes its points off the running sums."""
+        if self.filled >> index & 1:
+            points = self.scores[index]
+            self.total -= points
+            if index < NUM_UPPER:
+                self.upper -= points
+            self.scores[index] = 0
+            self.filled &= ~(1 << index)
+
+    def restore(self, scores, filled, yahtzee_bonus):
+        """Expects the points of every category, 0 for open ones, the bitmask of the filled categories and the yahtzee bonus
+        points. Replaces the board's scores with them in place and recomputes the running sums."""
+        self.scores[:] = scores
+        self.filled = filled
+        self.total = sum(self.scores)
+        self.upper = sum(self.scores[:NUM_UPPER])
+        self.yahtzee_bonus = yahtzee_bonus
+
+    def open_categories(self):
+        """Returns the indices of the categories not scored yet, in board order."""
+        return [index for index in range(self.rules.num_categories) if not self.filled >> index & 1]
+
+    @property
+    def upper_bonus(self):
+        """The rules' upper bonus once the upper section adds up to 63 or more, otherwise 0."""
+        return self.rules.upper_bonus if self.upper >= self.rules.upper_bonus_threshold else 0
+
+    def final_score(self):
+        """Returns the category scores plus the upper and yahtzee bonuses."""
+        return self.total + self.upper_bonus + self.yahtzee_bonus
+
+    def state(self):
+        """Returns the (mask, upper, yahtzee_scored) state engine.solver indexes its value table with. yahtzee_scored is
+        only set when the five of a kind box holds points and the rules pay a bonus for further ones."""
+        rules = self.rules
+        return (
+            self.filled,
+            min(self.upper, rules.upper_bonus_threshold),
+            1 if rules.yahtzee_bonus and self.filled >> rules.yahtzee & 1 and self.scores[rules.yahtzee] else 0,
+        )
+
+    def copy(self):
+        """Returns an independent copy of the board."""
+        board = Board.__new__(Board)
+        board.rules = self.rules
+        board.scores = bytearray(self.scores)
+        board.filled = self.filled
+        board.upper = self.upper
+        board.total = self.total
+        board.yahtzee_bonus = self.yahtzee_bonus
+        return board
+
+
+class BoardView:
+    """Dict view of a Board keyed like the original score_board_dict: each category name of the board's rules maps to its score
+    or None, "upper bonus" to the current upper bonus and "yahtzee bonus" to the yahtzee bonus points. Writes go to the board."""
+
+    __slots__ = ("board",)
+
+    def __init__(self, board):
+        """Expects the Board to view."""
+        self.board = board
+
+    def __getitem__(self, key):
+        index = self.board.rules.category_index.get(key)
+        if index is not None:
+            return self.board.get(index)
+        if key == "upper bonus":
+            return self.board.upper_bonus
+        if key == "yahtzee bonus":
+            return self.board.yahtzee_bonus
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        index = self.board.rules.category_index.get(key)
+        if index is not None:
+            self.board.clear(index)
+            if value is not None:
+                self.board.score(index, value)
+        elif key == "yahtzee bonus":
+            self.board.yahtzee_bonus = value
+        elif key == "upper bonus":
+            raise KeyError("the upper bonus is computed from the upper section")
+        else:
+            raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        return key in self.board.rules.keys
+
+    def __iter__(self):
+        return iter(self.board.rules.keys)
+
+    def __len__(self):
+        return len(self.board.rules.keys)
+
+    def keys(self):
+        return self.board.rules.keys
+
+    def values(self):
+        return [self[key] for key in self.board.rules.keys]
+
+    def items(self):
+        return [(key, self[key]) for key in self.board.rules.keys]
+
+    def __repr__(self):
+        return repr(dict(self.items()))
@@ -0,0 +1,25 @@
+"""Category names shared by the scoring, score keeping and lookup table modules."""
+
+CATEGORIES = (
+    "ones",
+    "twos",
+    "threes",
+    "fours",
+    "fives",
+    "sixes",
+    "three of a kind",
+    "four of a kind",
+    "full house",
+    "small straight",
+    "large straight",
+    "yahtzee",
+    "chance",
+)
+UPPER_CATEGORIES = CATEGORIES[:6]
+BONUS_CATEGORIES = ("upper bonus", "yahtzee bonus")
+NUM_CATEGORIES = len(CATEGORIES)
+NUM_UPPER = len(UPPER_CATEGORIES)
+YAHTZEE = CATEGORIES.index("yahtzee")
+UPPER_BONUS_THRESHOLD = 63
+UPPER_BONUS = 35
+YAHTZEE_BONUS = 100
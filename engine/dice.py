@@ -0,0 +1,136 @@
+"""Dice sources. A turn asks its source for the faces of the dice it rolls with roll(count), so the same turn rules can roll
+from the shared random module, from a fast buffered generator, from a stream seeded for one game or from a recorded stream:
+
+    RandomDice    one randint call per die on a random.Random or the random module, how turns have always rolled
+    BufferedDice  faces cut from large blocks of random bytes, one randbytes call and one bytes.translate per block
+    ReplayDice    the faces fed to it in order, for replaying a recorded game
+
+game_dice gives the source a game is played with from a seed and a game number, so a game rolls the same dice however the
+games of a run are spread over processes.
+"""
+
+import random
+import sys
+
+BLOCK_SIZE = 1 << 16
+GAME_BLOCK_SIZE = 256
+
+# Bytes below 252 map to a face uniformly, the 4 bytes above are dropped so no face is more likely than another
+_FACE_OF_BYTE = bytes(byte % 6 + 1 if byte < 252 else 0 for byte in range(256))
+_DROPPED_BYTES = bytes(range(252, 256))
+
+
+class DiceSource:
+    """Base class of dice sources."""
+
+    def roll(self, count):
+        """Expects a number of dice. Returns a list of that many faces from 1 to 6."""
+        raise NotImplementedError
+
+
+class RandomDice(DiceSource):
+    """Rolls each die with randint on a random.Random, or on the shared random module when none is given."""
+
+    def __init__(self, rng=random):
+        """Expects a random.Random or the random module."""
+        self.rng = rng
+
+    def roll(self, count):
+        """Expects a number of dice. Returns a list of that many faces, one randint call each."""
+        randint = self.rng.randint
+        return [randint(1, 6) for _ in range(count)]
+
+
+class BufferedDice(DiceSource):
+    """Rolls from blocks of pre-generated faces. A block of block_size random bytes is turned into faces at C speed, so a
+    roll is a slice of the buffer and the generator is only called once per ~65000 dice."""
+
+    def __init__(self, seed=None, block_size=BLOCK_SIZE):
+        """Expects a seed for the generator, any value random.Random takes, unseeded when None, and the number of random
+        bytes generated at a time."""
+        self.rng = random.Random(seed)
+        self.block_size = block_size
+        self.buffer = b""
+        self.position = 0
+
+    def refill(self, count):
+        """Expects the number of faces needed. Generates blocks until at least count faces are buffered, keeping the ones not
+        rolled yet at the front."""
+        faces = self.buffer[self.position :]
+        while len(faces) < count:
+            faces += self.rng.randbytes(max(self.block_size, count)).translate(_FACE_OF_BYTE, _DROPPED_BYTES)
+        self.buffer = faces
+        self.position = 0
+
+    def roll(self, count):
+        """Expects a number of dice. Returns a list of the next count buffered faces, refilling the buffer when it runs out."""
+        end = self.position + count
+        if end > len(self.buffer):
+            self.refill(count)
+            end = count
+        faces = list(self.buffer[self.position : end])
+        self.position = end
+        return faces
+
+    def faces(self, count):
+        """Expects a number of dice. Returns that many faces as bytes, for rolling in bulk without building lists."""
+        if self.position + count > len(self.buffer):
+            self.refill(count)
+        faces = self.buffer[self.position : self.position + count]
+        self.position += count
+        return faces
+
+
+class ReplayDice(DiceSource):
+    """Rolls the faces fed to it, in the order they were fed."""
+
+    def __init__(self, faces=()):
+        """Expects the recorded faces to start with, more can be fed later."""
+        self.faces = list(faces)
+        self.position = 0
+
+    def feed(self, faces):
+        """Expects recorded faces. Appends them to the faces still to roll."""
+        del self.faces[: self.position]
+        self.position = 0
+        self.faces.extend(faces)
+
+    def roll(self, count):
+        """Returns the next count recorded faces. Raises ValueError when fewer than count are left."""
+        end = self.position + count
+        if end > len(self.faces):
+            raise ValueError(f"the recorded stream has {len(self.faces) - self.position} dice left, {count} were rolled")
+        faces = self.faces[self.position : end]
+        self.position = end
+        return faces
+
+
+def as_dice(source):
+    """Expects a DiceSource, a random.Random or the random module. Returns a DiceSource, wrapping the generators in RandomDice."""
+    if isinstance(source, DiceSource):
+        return source
+    return RandomDice(source)
+
+
+def game_dice(seed, game, buffered=True):
+    """Expects a seed and a game number. Returns the source that game rolls with, a BufferedDice generating GAME_BLOCK_SIZE
+    bytes at a time, about as many dice as a solitaire game rolls, or when buffered is False a RandomDice on its own
+    random.Random, seeded from both."""
+    if buffered:
+        return BufferedDice(f"{seed}/{game}", GAME_BLOCK_SIZE)
+    return RandomDice(random.Random(f"{seed}/{game}"))
+
+
+def configure(argv=None):
+    """Expects a command line argument list, sys.argv when None. Removes --seed N or --seed=N from it and returns N, None
+    without the option."""
+    argv = sys.argv if argv is None else argv
+    for position, argument in enumerate(list(argv[1:]), start=1):
+        if argument.startswith("--seed="):
+            del argv[position]
+            return argument.partition("=")[2]
+        if argument == "--seed" and position + 1 < len(argv):
+            seed = argv[position + 1]
+            del argv[position : position + 2]
+            return seed
+    return None
@@ -0,0 +1,271 @@
+"""Compact append-only binary log of every roll, hold and category choice in a game, and a streaming reader that replays
+logged games through the engine.
+
+The file starts with an 8 byte header, MAGIC and the FORMAT_VERSION byte, and is followed by records whose first byte holds
+the record kind in the top 3 bits and a 5 bit argument below it:
+
+    GAME   argument: player count   then per player a length byte and the UTF-8 name
+    ROLL   argument: held mask      then the 5 dice of the roll result as a little endian u16, 3 bits per die
+    SCORE  argument: category index then the points scored as one byte
+    END    argument: player count   then each player's final score as a little endian u16
+    RULES  argument: rules code     nothing more, written before GAME when a game is not played by the default rules
+
+The held mask has bit i set when die i of the previous roll result was held for this roll, so a turn of three rolls takes
+11 bytes. Records are buffered and by default written with one unbuffered write at the end of every turn. A game whose END record never
+made it to disk, because the window was closed mid game, is skipped by the reader.
+"""
+
+import struct
+from collections import namedtuple
+from itertools import product
+
+from engine.dice import ReplayDice
+from engine.game import Game
+from engine.rules import DEFAULT_RULES, get_rules, get_rules_by_code
+from engine.scoreboard import ScoreKeeper
+from engine.turn import TurnTaker
+
+MAGIC = b"YAHTLOG"
+FORMAT_VERSION = 1
+HEADER = MAGIC + bytes([FORMAT_VERSION])
+
+GAME = 1
+ROLL = 2
+SCORE = 3
+END = 4
+RULES = 5
+
+_U16 = struct.Struct("<H")
+
+LoggedGame = namedtuple("LoggedGame", ["names", "records", "final_scores", "rules"])
+
+
+class LogFormatError(ValueError):
+    """Raised when a file is not an event log of this FORMAT_VERSION, or a logged game does not replay to its recorded scores."""
+
+
+def pack_dice(dice):
+    """Expects 5 dice. Returns them packed 3 bits per die, the first die in the lowest bits."""
+    a, b, c, d, e = dice
+    return a | b << 3 | c << 6 | d << 9 | e << 12
+
+
+_DICE = {}
+
+
+def unpack_table():
+    """Returns the dict of packed dice to dice tuples the reader decodes rolls with, building it on first use."""
+    if not _DICE:
+        _DICE.update((pack_dice(dice), dice) for dice in product(range(1, 7), repeat=5))
+    return _DICE
+
+
+class EventLog:
+    """Appends games to a binary event log. listen attaches the log to a Game before it starts, after which every event of the
+    game is recorded as it is passed on to the game's own listener. The file is opened on the first game and kept open until
+    close, so one log can record any number of games."""
+
+    def __init__(self, path, buffer_size=0):
+        """Expects the path of the log file, created with its header if it does not exist, and how many bytes to buffer
+        before writing. The default writes at the end of every turn, simulations logging many games can buffer more."""
+        self.path = path
+        self.buffer_size = buffer_size
+        self.file = None
+        self.buffer = bytearray()
+        self.players = []
+        self.rules = None
+        self.held = 0
+
+    def open(self):
+        """Opens the log for appending if it is not open yet."""
+        if self.file is None:
+            self.file = open(self.path, "ab", buffering=0)
+            if self.file.tell() == 0:
+                self.file.write(HEADER)
+
+    def listen(self, match):
+        """Expects a Game that has not started. Records its players, names cut to 255 bytes of UTF-8 on a character boundary,
+        and wraps its listener so every event is logged first."""
+        self.open()
+        self.players = list(match.players)
+        self.held = 0
+        self.rules = self.players[0].board.rules
+        if self.rules.name != DEFAULT_RULES:
+            self.buffer.append(RULES << 5 | self.rules.code)
+        self.buffer.append(GAME << 5 | len(self.players))
+        for player in self.players:
+            name = getattr(player, "name", "").encode()[:255].decode(errors="ignore").encode()
+            self.buffer.append(len(name))
+            self.buffer += name
+        forward = match.listener
+        if forward is None:
+            match.listener = self.record
+            return
+
+        def listener(event, player, **details):
+            self.record(event, player, **details)
+            forward(event, player, **details)
+
+        match.listener = listener
+
+    def record(self, event, player, **details):
+        """Game listener. Expects an event name, the player it concerns and the event details. Writes the buffered records
+        to the file once a category is scored with at least buffer_size bytes buffered."""
+        if event == "held":
+            self.held ^= 1 << details["index"]
+            return
+        if event == "rolled":
+            a, b, c, d, e = player.roll_result
+            packed = a | b << 3 | c << 6 | d << 9 | e << 12
+            self.buffer += bytes((ROLL << 5 | self.held, packed & 255, packed >> 8))
+            self.held = 0
+            return
+        if event == "scored":
+            self.buffer.append(SCORE << 5 | self.rules.category_index[details["category"]])
+            self.buffer.append(details["score"])
+            self.held = 0
+        elif event == "game over":
+            self.buffer.append(END << 5 | len(self.players))
+            for logged in self.players:
+                self.buffer += _U16.pack(logged.board.scores.final_score())
+        else:
+            return
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        """Writes the buffered records with a single write."""
+        if self.buffer and self.file is not None:
+            self.file.write(self.buffer)
+            self.buffer.clear()
+
+    def close(self):
+        """Writes anything buffered and closes the file."""
+        if self.file is not None:
+            self.flush()
+            self.file.close()
+            self.file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_records(path, chunk_size=1 << 16):
+    """Expects the path of an event log. Yields its records in order, reading chunk_size bytes at a time:
+    (RULES, rules code), (GAME, names), (ROLL, held mask, dice), (SCORE, category index, points) and (END, final scores).
+    Stops at a record cut short at the end of the file."""
+    dice_table = unpack_table()
+    with open(path, "rb") as log_file:
+        if log_file.read(len(HEADER)) != HEADER:
+            raise LogFormatError(f"{path} is not a version {FORMAT_VERSION} event log")
+        buffer = b""
+        position = 0
+        while True:
+            chunk = log_file.read(chunk_size)
+            if not chunk:
+                return
+            buffer = buffer[position:] + chunk
+            position = 0
+            end = len(buffer)
+            while position < end:
+                kind = buffer[position] >> 5
+                argument = buffer[position] & 31
+                if kind == ROLL:
+                    if position + 3 > end:
+                        break
+                    yield ROLL, argument, dice_table[buffer[position + 1] | buffer[position + 2] << 8]
+                    position += 3
+                elif kind == SCORE:
+                    if position + 2 > end:
+                        break
+                    yield SCORE, argument, buffer[position + 1]
+                    position += 2
+                elif kind == END:
+                    size = 1 + 2 * argument
+                    if position + size > end:
+                        break
+                    yield END, struct.unpack_from(f"<{argument}H", buffer, position + 1)
+                    position += size
+                elif kind == GAME:
+                    names = []
+                    cursor = position + 1
+                    for _ in range(argument):
+                        if cursor >= end or cursor + 1 + buffer[cursor] > end:
+                            break
+                        names.append(buffer[cursor + 1 : cursor + 1 + buffer[cursor]].decode(errors="replace"))
+                        cursor += 1 + buffer[cursor]
+                    if len(names) < argument:
+                        break
+                    yield GAME, names
+                    position = cursor
+                elif kind == RULES:
+                    yield RULES, argument
+                    position += 1
+                else:
+                    raise LogFormatError(f"unknown record kind {kind} in {path}")
+
+
+def read_games(path):
+    """Expects the path of an event log. Yields a LoggedGame for every complete game in it, holding the game's ROLL and SCORE
+    records and the Rules it was played by, without keeping more than one game in memory."""
+    names = None
+    rules = announced = None
+    records = []
+    for record in read_records(path):
+        if record[0] == RULES:
+            try:
+                announced = get_rules_by_code(record[1])
+            except ValueError as error:
+                raise LogFormatError(f"{error} in {path}") from None
+        elif record[0] == GAME:
+            names = record[1]
+            rules, announced = announced or get_rules(), None
+            records = []
+        elif record[0] == END:
+            if names is not None:
+                yield LoggedGame(names, records, record[1], rules)
+            names = None
+        elif names is not None:
+            records.append(record)
+
+
+def replay_game(logged, observe=None):
+    """Expects a LoggedGame and optionally a function called as observe(match, record) before each record is replayed, while
+    the Game's current player still holds the roll and board the logged choice was made on. Plays the game again through a Game,
+    rolling the logged dice, holding the logged dice and scoring the logged categories. Returns the players' boards.
+    Raises LogFormatError if a roll, a score or a final score differs from the log."""
+    dice = ReplayDice()
+    players = [TurnTaker(ScoreKeeper(logged.rules), dice) for _ in logged.names]
+    match = Game(players)
+    match.start()
+    for record in logged.records:
+        player = match.current_player
+        if observe is not None:
+            observe(match, record)
+        if record[0] == ROLL:
+            _, held, rolled = record
+            for index in range(player.num_dice):
+                if held >> index & 1:
+                    match.hold(index)
+            dice.feed(rolled[len(player.kept_dice) :])
+            match.roll()
+            if tuple(player.roll_result) != rolled:
+                raise LogFormatError(f"replayed roll {player.roll_result} does not match logged roll {list(rolled)}")
+        else:
+            _, category, points = record
+            name = logged.rules.categories[category]
+            if match.score(name) != points:
+                raise LogFormatError(f"replayed {name} score does not match logged score {points}")
+    final_scores = tuple(player.board.scores.final_score() for player in players)
+    if match.state != Game.GAME_OVER or final_scores != tuple(logged.final_scores):
+        raise LogFormatError(f"replayed final scores {final_scores} do not match logged scores {tuple(logged.final_scores)}")
+    return [player.board for player in players]
+
+
+def replay(path):
+    """Expects the path of an event log. Yields (names, boards) for every complete game in it, replayed through the engine."""
+    for logged in read_games(path):
+        yield logged.names, replay_game(logged)
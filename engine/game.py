@@ -0,0 +1,111 @@
+"""Event-driven game state machine. A game moves through explicit states as its actions are called, never waits for input
+itself and reports every change to a listener, so the same rules drive the game window from Tk callbacks and headless play."""
+
+
+class IllegalMoveError(ValueError):
+    """Raised when an action is not allowed in the game's current state."""
+
+
+class Game:
+    """Takes turns between players until each has scored every category. A player is a TurnTaker with its own board.
+
+    States:
+        TURN_START  the current player has not rolled yet this turn
+        ROLLED      dice are on the table and rolls remain, the player may hold dice, roll again or score
+        MUST_SCORE  no rolls remain, the player must score a category
+        GAME_OVER   every player has scored every category
+
+    The listener is called as listener(event, player, **details) for the events "turn started", "rolled" (rolling: the indices
+    of the dice just rolled), "held" (index, held), "scored" (category, score) and "game over"."""
+
+    TURN_START = "turn start"
+    ROLLED = "rolled"
+    MUST_SCORE = "must score"
+    GAME_OVER = "game over"
+
+    def __init__(self, players, listener=None):
+        """Expects a list of TurnTaker players in turn order and an optional listener."""
+        self.players = list(players)
+        self.listener = listener
+        self.current = 0
+        self.state = None
+
+    @property
+    def current_player(self):
+        """The player whose turn it is."""
+        return self.players[self.current]
+
+    def start(self):
+        """Starts the first player's first turn."""
+        self.current = 0
+        self.begin_turn()
+
+    def can_roll(self):
+        """Returns True if roll is allowed in the current state."""
+        return self.state in (Game.TURN_START, Game.ROLLED)
+
+    def roll(self):
+        """Rolls the dice the current player is not holding. Moves to ROLLED, or MUST_SCORE after the last roll."""
+        if not self.can_roll():
+            raise IllegalMoveError(f"cannot roll in state {self.state!r}")
+        player = self.current_player
+        kept_count = len(player.kept_dice)
+        player.roll()
+        self.state = Game.ROLLED if player.can_roll() else Game.MUST_SCORE
+        self.emit("rolled", rolling=range(kept_count, player.num_dice))
+
+    def hold(self, index):
+        """Expects a die index. Toggles whether the current player holds that die. Returns True if the die is held after the call."""
+        if self.state != Game.ROLLED:
+            raise IllegalMoveError(f"cannot hold dice in state {self.state!r}")
+        held = self.current_player.keepers(index)
+        self.emit("held", index=index, held=held)
+        return held
+
+    def score(self, category):
+        """Expects the name of a category the current player has not scored, and that the joker rule of the player's rules
+        allows for the roll. Scores the roll into it and passes the turn on,
+        moving to TURN_START for the next player or GAME_OVER after the last turn. Returns the score."""
+        if self.state not in (Game.ROLLED, Game.MUST_SCORE):
+            raise IllegalMoveError(f"cannot score in state {self.state!r}")
+        player = self.current_player
+        board = player.board
+        if board.score_board_dict.get(category, 0) is not None:
+            raise IllegalMoveError(f"{category!r} is not an open category")
+        if board.rules.joker and category not in board.playable_categories(player.roll_result):
+            raise IllegalMoveError(f"the joker rule does not allow scoring {category!r}")
+        score = player.score_category(category)
+        self.emit("scored", category=category, score=score)
+        if self.current == len(self.players) - 1 and player.turn_count >= board.rules.num_categories:
+            self.state = Game.GAME_OVER
+            self.emit("game over")
+        else:
+            self.current = (self.current + 1) % len(self.players)
+            self.begin_turn()
+        return score
+
+    def resume(self, current, state):
+        """Expects the index of the player whose turn it is and the state a saved game was in, the players' boards and turns
+        already restored. Continues the game from there: emits "turn started" at TURN_START, otherwise "rolled" with no dice
+        rolling and a "held" event for every die the player holds."""
+        if state not in (Game.TURN_START, Game.ROLLED, Game.MUST_SCORE):
+            raise IllegalMoveError(f"cannot resume a game in state {state!r}")
+        self.current = current
+        if state == Game.TURN_START:
+            self.begin_turn()
+            return
+        self.state = state
+        player = self.current_player
+        self.emit("rolled", rolling=range(0))
+        for index in sorted(player.kept_dice):
+            self.emit("held", index=index, held=True)
+
+    def begin_turn(self):
+        """Moves to TURN_START for the current player."""
+        self.state = Game.TURN_START
+        self.emit("turn started")
+
+    def emit(self, event, **details):
+        """Passes an event about the current player to the listener."""
+        if self.listener is not None:
+            self.listener(event, self.current_player, **details)
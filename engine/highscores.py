@@ -0,0 +1,288 @@
+"""High score store backed by a local SQLite database with an index on score, so recording a game and reading the top scores
+stay O(log n) however many games have been played. Scores from the old highscores.json file are migrated the first time
+the store is opened next to it, and a meta row written in the same transaction keeps them from being imported twice if the
+process dies before the file is renamed.
+
+Every player name also has a row of running aggregates, updated in the same transaction as its scores: games, total, best,
+worst, bonus counts and a histogram of the scores. Scores are whole numbers below 1600, so the histogram is an exact
+streaming quantile sketch a few hundred counters long, and a player's mean, percentiles and bonus rates, or a leaderboard
+over every player, are read without going back over the scores.
+
+Print the leaderboard, or one player's statistics, from the repository root with:
+    python -m engine.highscores [--database PATH] [--by mean|best|games] [NAME]
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+from array import array
+
+DEFAULT_DB_PATH = "highscores.db"
+LEGACY_JSON_PATH = "highscores.json"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    score INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS scores_by_score ON scores (score DESC, id);
+CREATE TABLE IF NOT EXISTS player_stats (
+    name TEXT PRIMARY KEY,
+    games INTEGER NOT NULL,
+    total INTEGER NOT NULL,
+    best INTEGER NOT NULL,
+    worst INTEGER NOT NULL,
+    tracked_games INTEGER NOT NULL,
+    upper_bonuses INTEGER NOT NULL,
+    yahtzee_bonus_games INTEGER NOT NULL,
+    histogram BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+STATS_VERSION = 1
+JSON_MIGRATED_KEY = "json migrated"
+LEADERBOARD_ORDER = {
+    "mean": "CAST(total AS REAL) / games DESC",
+    "best": "best DESC",
+    "games": "games DESC",
+}
+PERCENTILES = (10, 25, 50, 75, 90)
+
+
+class PlayerStats:
+    """Running aggregates of one player's games. tracked_games counts the games recorded with their bonuses, the ones the
+    bonus rates are out of, and histogram[score] the games that ended on score."""
+
+    FIELDS = ("name", "games", "total", "best", "worst", "tracked_games", "upper_bonuses", "yahtzee_bonus_games")
+
+    def __init__(
+        self,
+        name,
+        games=0,
+        total=0,
+        best=None,
+        worst=None,
+        tracked_games=0,
+        upper_bonuses=0,
+        yahtzee_bonus_games=0,
+        histogram=None,
+    ):
+        """Expects the aggregates of a player_stats row, an empty record for the name by default."""
+        self.name = name
+        self.games = games
+        self.total = total
+        self.best = best
+        self.worst = worst
+        self.tracked_games = tracked_games
+        self.upper_bonuses = upper_bonuses
+        self.yahtzee_bonus_games = yahtzee_bonus_games
+        self.histogram = histogram if histogram is not None else array("I")
+
+    @classmethod
+    def from_row(cls, row):
+        """Expects a player_stats row. Returns its PlayerStats."""
+        histogram = array("I")
+        histogram.frombytes(row[-1])
+        return cls(*row[:-1], histogram)
+
+    def row(self):
+        """Returns the player_stats row of the aggregates."""
+        return tuple(getattr(self, field) for field in self.FIELDS) + (self.histogram.tobytes(),)
+
+    def add(self, score, upper_bonus=None, yahtzee_bonus=None):
+        """Expects a final score and, when known, whether the game reached the upper bonus and how many yahtzee bonus points
+        it scored. Adds the game to the aggregates."""
+        self.games += 1
+        self.total += score
+        self.best = score if self.best is None else max(self.best, score)
+        self.worst = score if self.worst is None else min(self.worst, score)
+        if upper_bonus is not None:
+            self.tracked_games += 1
+            self.upper_bonuses += bool(upper_bonus)
+            self.yahtzee_bonus_games += bool(yahtzee_bonus)
+        if score >= len(self.histogram):
+            self.histogram.extend([0] * (score + 1 - len(self.histogram)))
+        self.histogram[score] += 1
+
+    @property
+    def mean(self):
+        """Mean final score, None before the first game."""
+        return self.total / self.games if self.games else None
+
+    def percentile(self, percent):
+        """Expects a percentage. Returns the lowest score at least that percent of the games ended on or below, None before
+        the first game."""
+        if not self.games:
+            return None
+        needed = percent / 100 * self.games
+        seen = 0
+        for score, count in enumerate(self.histogram):
+            seen += count
+            if count and seen >= needed:
+                return score
+        return self.best
+
+    @property
+    def upper_bonus_rate(self):
+        """Fraction of the tracked games that reached the upper bonus, None without tracked games."""
+        return self.upper_bonuses / self.tracked_games if self.tracked_games else None
+
+    @property
+    def yahtzee_bonus_rate(self):
+        """Fraction of the tracked games with at least one yahtzee bonus, None without tracked games."""
+        return self.yahtzee_bonus_games / self.tracked_games if self.tracked_games else None
+
+    def __repr__(self):
+        return f"PlayerStats({self.name!r}, games={self.games}, mean={self.mean}, best={self.best})"
+
+
+class HighScores:
+    """Append-only log of (name, score) pairs. Ties in top are ordered by which score was recorded first."""
+
+    def __init__(self, path=DEFAULT_DB_PATH, legacy_json_path=LEGACY_JSON_PATH):
+        """Expects the database path and the path of a highscores.json file to migrate. Opens or creates the database
+        and imports the JSON file if it exists, renaming it to end in .migrated once its scores are committed. A file left
+        behind by a migration that committed but was cut short before the rename is only renamed."""
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        if self.connection.execute("PRAGMA user_version").fetchone()[0] < STATS_VERSION:
+            self.backfill_stats()
+        if legacy_json_path and os.path.exists(legacy_json_path):
+            self.migrate_json(legacy_json_path)
+
+    def backfill_stats(self):
+        """Builds the player_stats rows of a database written before they existed from its scores, once. The bonuses of
+        those games were not recorded, so they do not count towards the bonus rates."""
+        stats = {}
+        for name, score in self.connection.execute("SELECT name, score FROM scores ORDER BY id"):
+            if name not in stats:
+                stats[name] = PlayerStats(name)
+            stats[name].add(score)
+        with self.connection:
+            self.save_stats(stats.values())
+            self.connection.execute(f"PRAGMA user_version = {STATS_VERSION}")
+
+    def migrate_json(self, json_path):
+        """Expects the path of a highscores.json file written by the old store. Appends its scores in file order, unless the
+        meta table records that the file at this path was, and renames the file. The scores and the meta row are committed
+        together."""
+        source = os.path.abspath(json_path)
+        migrated = self.connection.execute(
+            "SELECT 1 FROM meta WHERE key = ? AND value = ?", (JSON_MIGRATED_KEY, source)
+        ).fetchone()
+        if migrated is None:
+            with open(json_path) as f:
+                json_data = json.load(f)
+            with self.connection:
+                self.insert_many((entry["name"], entry["score"]) for entry in json_data["player_scores"])
+                self.connection.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (JSON_MIGRATED_KEY, source))
+        os.replace(json_path, f"{json_path}.migrated")
+
+    def add(self, name, score, upper_bonus=None, yahtzee_bonus=None):
+        """Expects a player name, a final score and, when known, whether the game reached the upper bonus and its yahtzee
+        bonus points. Records the score."""
+        self.add_many([(name, score, upper_bonus, yahtzee_bonus)])
+
+    def add_many(self, entries):
+        """Expects an iterable of (name, score) pairs, or of (name, score, upper bonus reached, yahtzee bonus points) tuples.
+        Records the scores and updates the players' aggregates in one transaction, reading and writing each player's row once."""
+        with self.connection:
+            self.insert_many(entries)
+
+    def insert_many(self, entries):
+        """Same as add_many inside the caller's transaction, which commits it."""
+        scores = []
+        stats = {}
+        for name, score, *bonuses in entries:
+            scores.append((name, score))
+            if name not in stats:
+                stats[name] = self.stats(name)
+            stats[name].add(score, *bonuses)
+        self.connection.executemany("INSERT INTO scores (name, score) VALUES (?, ?)", scores)
+        self.save_stats(stats.values())
+
+    def save_stats(self, stats):
+        """Expects PlayerStats. Writes their rows."""
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO player_stats VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (player.row() for player in stats),
+        )
+
+    def stats(self, name):
+        """Expects a player name. Returns the PlayerStats of the name, with no games if it has never been recorded."""
+        row = self.connection.execute("SELECT * FROM player_stats WHERE name = ?", (name,)).fetchone()
+        return PlayerStats(name) if row is None else PlayerStats.from_row(row)
+
+    def leaderboard(self, by="mean", count=10, min_games=1):
+        """Expects the aggregate to rank by, one of LEADERBOARD_ORDER, the number of players and the games a player needs to
+        be ranked. Returns the PlayerStats of the count best players, best first."""
+        rows = self.connection.execute(
+            f"SELECT * FROM player_stats WHERE games >= ? ORDER BY {LEADERBOARD_ORDER[by]}, name LIMIT ?",
+            (min_games, count),
+        )
+        return [PlayerStats.from_row(row) for row in rows]
+
+    def top(self, count=10):
+        """Returns a list of the count highest (name, score) pairs, highest first."""
+        return self.connection.execute(
+            "SELECT name, score FROM scores ORDER BY score DESC, id LIMIT ?", (count,)
+        ).fetchall()
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+
+    def close(self):
+        """Closes the database connection."""
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def format_rate(rate):
+    """Returns a bonus rate as a percentage, or - when no game tracked it."""
+    return "-" if rate is None else f"{rate:.1%}"
+
+
+def main(argv=None):
+    """Command line entry point. Prints the leaderboard, or the statistics of one player."""
+    parser = argparse.ArgumentParser(description="Prints the players' statistics from the high score store.")
+    parser.add_argument("name", nargs="?", default=None, help="player to show, the leaderboard when left out")
+    parser.add_argument("--database", default=DEFAULT_DB_PATH)
+    parser.add_argument("--by", choices=sorted(LEADERBOARD_ORDER), default="mean")
+    parser.add_argument("--count", type=int, default=10)
+    parser.add_argument("--min-games", type=int, default=1)
+    args = parser.parse_args(argv)
+    with HighScores(args.database, None) as highscores:
+        if args.name is not None:
+            player = highscores.stats(args.name)
+            if not player.games:
+                parser.exit(1, f"no games recorded for {args.name}\n")
+            print(f"{player.name}: {player.games} games, mean {player.mean:.1f}, best {player.best}, worst {player.worst}")
+            print("percentiles " + ", ".join(f"p{percent} {player.percentile(percent)}" for percent in PERCENTILES))
+            print(
+                f"upper bonus {format_rate(player.upper_bonus_rate)}, yahtzee bonus {format_rate(player.yahtzee_bonus_rate)}"
+                f" of {player.tracked_games} games with bonuses recorded"
+            )
+            return
+        print(f"{'':>3} {'name':<16}{'games':>8}{'mean':>8}{'best':>6}{'median':>8}{'upper':>8}{'yahtzee':>9}")
+        for rank, player in enumerate(highscores.leaderboard(args.by, args.count, args.min_games), start=1):
+            print(
+                f"{rank:>2}. {player.name:<16}{player.games:>8}{player.mean:>8.1f}{player.best:>6}{player.percentile(50):>8}"
+                f"{format_rate(player.upper_bonus_rate):>8}{format_rate(player.yahtzee_bonus_rate):>9}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""Hold decision optimizer. Ranks the 32 ways to hold dice before a reroll by expected value, using the sparse reroll
+transition tables of engine.transitions in dense NumPy form.
+
+Without a value table the expected value is the best score this turn can still make, bonuses included. Given the table from
+engine.solver it is the expected final score with optimal play, so the ranking also accounts for the categories left open.
+The per-board vectors are kept in LRU caches, so ranking the holds of a board already seen costs a few dozen dict lookups.
+An optimizer plays one engine.rules variant, whose table it must be given."""
+
+from functools import lru_cache
+
+import numpy as np
+
+from engine import table, transitions
+from engine.rules import NUM_UPPER, get_rules
+from engine.solver import score_matrix
+
+_SUBSET_KEEPS = np.array(transitions.SUBSET_KEEPS)
+_TRANSITION = transitions.transition_matrix()
+
+
+def sorted_subset(roll_result, kept):
+    """Expects a roll result in any order and a collection of its indices. Returns the bitmask of the same dice as positions
+    in the sorted roll, the subset numbering used by transitions.SUBSET_KEEPS."""
+    order = sorted(range(len(roll_result)), key=roll_result.__getitem__)
+    return sum(1 << position for position, index in enumerate(order) if index in kept)
+
+
+class HoldOptimizer:
+    """Ranks holds and categories for a board. Each board state is reduced to (mask, upper, yahtzee_scored) and its final roll
+    values and per-hold expected values are cached, cache_info reports how often the caches were hit."""
+
+    def __init__(self, values=None, cache_size=8192, rules=None):
+        """Expects an optional value table from engine.solver.load_table, the number of board states to keep per cache and
+        the Rules the table was solved for, the default variant when None."""
+        self.values = values
+        self.rules = rules or get_rules()
+        self.scores = score_matrix(self.rules.scores).astype(np.float64)
+        self.joker_scores = None
+        if self.rules.joker:
+            self.joker_scores = score_matrix(self.rules.joker_scores).astype(np.float64)
+        self.is_yahtzee = self.scores[:, self.rules.yahtzee] > 0
+        self.final_roll_values = lru_cache(maxsize=cache_size)(self._final_roll_values)
+        self.keep_values = lru_cache(maxsize=cache_size)(self._keep_values)
+        self.subset_values = lru_cache(maxsize=cache_size * 4)(self._subset_values)
+
+    def _category_values(self, state):
+        """Expects a board state. Returns a dict of open category index to the (252,) value of scoring each roll there:
+        the score, the upper bonus if it is reached and, with a value table, the expected value of the state it leads to.
+        Under the joker rule the Yahtzee rolls score their joker points and are worth -inf where the rule forbids them."""
+        mask, upper, yahtzee_scored = state
+        rules = self.rules
+        threshold = rules.upper_bonus_threshold
+        all_scores = self.scores
+        forbidden = None
+        if rules.joker and mask >> rules.yahtzee & 1:
+            all_scores = self.joker_scores
+            forbidden = {}
+            for roll, face in rules.yahtzee_rolls:
+                allowed = rules.joker_categories(mask, face)
+                for category in range(rules.num_categories):
+                    if category not in allowed:
+                        forbidden.setdefault(category, []).append(roll)
+        category_values = {}
+        for category in range(rules.num_categories):
+            if mask >> category & 1:
+                continue
+            scores = all_scores[:, category]
+            if category < NUM_UPPER:
+                raised = np.minimum(upper + scores, threshold).astype(np.int64)
+                gained = scores + np.where((upper < threshold) & (raised >= threshold), rules.upper_bonus, 0)
+                future = 0 if self.values is None else self.values[mask | 1 << category, raised, yahtzee_scored]
+            elif category == rules.yahtzee and rules.yahtzee_bonus:
+                gained = scores
+                future = (
+                    0
+                    if self.values is None
+                    else self.values[mask | 1 << category, upper, (scores > 0).astype(np.int64)]
+                )
+            else:
+                gained = scores
+                future = 0 if self.values is None else self.values[mask | 1 << category, upper, yahtzee_scored]
+            value = gained + future
+            if forbidden is not None and category in forbidden:
+                value = np.array(value, dtype=np.float64)
+                value[forbidden[category]] = -np.inf
+            category_values[category] = value
+        return category_values
+
+    def _final_roll_values(self, state):
+        """Expects a board state. Returns the (252,) value of ending the turn on each roll: the best open category value
+        plus the Yahtzee bonus when the yahtzee category already holds 50."""
+        best = np.max(np.stack(list(self._category_values(state).values())), axis=0)
+        if state[2]:
+            best = best + np.where(self.is_yahtzee, self.rules.yahtzee_bonus, 0)
+        return best
+
+    def _keep_values(self, state, rerolls):
+        """Expects a board state and the rolls left after the current one. Returns the (462,) expected value of each hold."""
+        rolled = self.final_roll_values(state)
+        for _ in range(rerolls - 1):
+            rolled = (_TRANSITION @ rolled)[_SUBSET_KEEPS].max(axis=1)
+        return (_TRANSITION @ rolled).tolist()
+
+    def _subset_values(self, state, rerolls, roll):
+        """Expects a board state, the rolls left and a sorted roll. Returns the expected value of each of the 32 sorted subsets."""
+        keep_values = self.keep_values(state, rerolls)
+        return tuple(keep_values[keep] for keep in transitions.SUBSET_KEEPS[table.roll_index(roll)])
+
+    def rank_holds(self, roll_result, num_rolls, board, state=None):
+        """Expects the current roll result, the rolls remaining and a board, plus the board's state if already known.
+        Returns a list of (expected value, kept indices) pairs for all 32 subsets of roll_result indices, best first.
+        A hold's value is that of rerolling the other dice and playing the num_rolls - 1 rerolls left after that optimally, so
+        holding all five dice is the value of keeping the roll with those rerolls still to use, which on the last reroll is
+        the value of scoring the roll as it is."""
+        if num_rolls < 1:
+            raise ValueError("no rolls remaining to hold dice for")
+        state = state or board.scores.state()
+        order = sorted(range(len(roll_result)), key=roll_result.__getitem__)
+        values = self.subset_values(state, num_rolls, tuple(roll_result[index] for index in order))
+        ranked = []
+        for subset in range(32):
+            kept = frozenset(order[position] for position in range(5) if subset >> position & 1)
+            ranked.append((values[subset], kept))
+        ranked.sort(key=lambda pair: -pair[0])
+        return ranked
+
+    def best_hold(self, roll_result, num_rolls, board):
+        """Returns the set of roll_result indices with the highest expected value to hold."""
+        return set(self.rank_holds(roll_result, num_rolls, board)[0][1])
+
+    def rank_categories(self, roll_result, board):
+        """Expects a final roll result and a board. Returns a list of (value, category name) pairs for every open category,
+        best first, where value is the category value used for ranking holds."""
+        state = board.scores.state()
+        roll = table.roll_index(roll_result)
+        ranked = [
+            (float(category_values[roll]), self.rules.categories[category])
+            for category, category_values in self._category_values(state).items()
+            if category_values[roll] > -np.inf
+        ]
+        ranked.sort(key=lambda pair: -pair[0])
+        return ranked
+
+    def cache_info(self):
+        """Returns a dict of cache name to functools CacheInfo with hits, misses and size of each cache."""
+        return {
+            "final_roll_values": self.final_roll_values.cache_info(),
+            "keep_values": self.keep_values.cache_info(),
+            "subset_values": self.subset_values.cache_info(),
+        }
+
+    def hit_rate(self):
+        """Returns the fraction of cache lookups that were hits across every cache."""
+        infos = self.cache_info().values()
+        lookups = sum(info.hits + info.misses for info in infos)
+        return sum(info.hits for info in infos) / lookups if lookups else 0.0
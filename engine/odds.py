@@ -0,0 +1,53 @@
+"""Exact per-category odds for the rest of a turn. For every hold and number of rolls left, the tables give the probability
+of ending the turn with a non-zero score in each category and the expected points scored there, when the held dice are kept,
+the others rerolled and any later rerolls are played to make that one category as likely, or as valuable, as possible.
+
+The odds depend only on the dice, not on the board, so they are built once from the reroll transition tables of
+engine.transitions: two matrix products per roll left for all 13 categories at once. Building takes a few milliseconds and
+imports NumPy, so the game window builds them in a background thread; after that a lookup is a single row read.
+Bonuses are not included, expected points are the category's own score. Each engine.rules variant has its own tables, and
+joker points are not counted."""
+
+import numpy as np
+
+from engine import table, transitions
+from engine.rules import get_rules
+
+MAX_REROLLS = 2
+
+_SUBSET_KEEPS = np.array(transitions.SUBSET_KEEPS)
+
+
+class TurnOdds:
+    """Odds of every category for every hold. chance[rerolls] and expected[rerolls] are (462, categories) arrays indexed by the
+    hold's index in transitions.KEEPS, for 1 up to MAX_REROLLS rolls left."""
+
+    def __init__(self, rules=None):
+        """Expects the Rules to score by, the default variant when None. Builds the tables for every number of rolls left, the
+        chance and expected point columns side by side."""
+        self.rules = rules or get_rules()
+        categories = self.rules.num_categories
+        scores = np.frombuffer(self.rules.scores, dtype=np.uint8).reshape(len(table.ROLLS), -1).astype(np.float64)
+        transition = transitions.transition_matrix()
+        final = np.hstack([(scores > 0).astype(np.float64), scores])
+        self.chance = {}
+        self.expected = {}
+        rolled = final
+        for rerolls in range(1, MAX_REROLLS + 1):
+            keep_values = transition @ rolled
+            self.chance[rerolls] = keep_values[:, :categories]
+            self.expected[rerolls] = keep_values[:, categories:]
+            rolled = keep_values[_SUBSET_KEEPS].max(axis=1)
+
+    def lookup(self, held_dice, rerolls):
+        """Expects the faces of the held dice and the rolls left, at least one. Returns a dict of category name to
+        (probability of a non-zero score, expected points) when the other dice are rerolled."""
+        if not 1 <= rerolls <= MAX_REROLLS:
+            raise ValueError(f"odds are only known for 1 to {MAX_REROLLS} rolls left, not {rerolls}")
+        keep = transitions.keep_index(held_dice)
+        return dict(
+            zip(
+                self.rules.categories,
+                zip(self.chance[rerolls][keep].tolist(), self.expected[rerolls][keep].tolist()),
+            )
+        )
@@ -0,0 +1,88 @@
+"""Computer opponents. An Opponent decides a computer player's moves with the engine.strategies strategy of its strength:
+
+    easy    greedy     scores whatever pays most now
+    medium  heuristic  plays like a careful person would
+    hard    optimal    plays the engine.solver value table, once the table is loaded
+
+Deciding never touches the game: decide works on a copy of the roll and the board, so it can run on a worker while the
+game window keeps drawing, and quick_move gives the cheap fallback move to play when a decision runs over its time budget
+or the strength's table is not loaded yet. A decision running on a worker can be called off with a threading.Event: decide
+checks it before each strategy call, so a call off waits for at most the one strategy call already running.
+"""
+
+import random
+from collections import namedtuple
+
+from engine.strategies import STRATEGIES, OptimalStrategy
+
+STRENGTHS = {"easy": "greedy", "medium": "heuristic", "hard": "optimal"}
+DEFAULT_STRENGTH = "medium"
+FALLBACK_STRATEGY = "heuristic"
+DEFAULT_TIME_BUDGET = 0.5
+
+# keep: the set of roll_result indices to hold before rolling again, or None when the move scores category
+Move = namedtuple("Move", ["keep", "category"])
+
+
+class DecisionCancelled(Exception):
+    """Raised by Opponent.decide when its cancelled event is set before the decision is made."""
+
+
+class Opponent:
+    """Decides the moves of one computer player."""
+
+    def __init__(self, strength=DEFAULT_STRENGTH, time_budget=DEFAULT_TIME_BUDGET, seed=None):
+        """Expects a strength of STRENGTHS, the seconds a decision may take before the fallback move is played and a seed
+        for the strategies' random choices, unseeded when None."""
+        if strength not in STRENGTHS:
+            raise ValueError(f"unknown strength {strength!r}, expected one of {', '.join(STRENGTHS)}")
+        self.strength = strength
+        self.time_budget = time_budget
+        rng = random.Random(seed)
+        self.strategy = STRATEGIES[STRENGTHS[strength]]()
+        self.strategy.start_game(rng)
+        self.fallback = STRATEGIES[FALLBACK_STRATEGY]()
+        self.fallback.start_game(rng)
+
+    @property
+    def needs_table(self):
+        """True when the strength plays from the engine.solver value table."""
+        return isinstance(self.strategy, OptimalStrategy)
+
+    @property
+    def ready(self):
+        """True once the strategy can decide without loading anything, always for strengths that need no table."""
+        return not self.needs_table or self.strategy.optimizer is not None
+
+    def use_optimizer(self, optimizer):
+        """Expects an engine.holds HoldOptimizer for the rules played. Hands it to a strategy that plays from the value table."""
+        if self.needs_table:
+            self.strategy.optimizer = optimizer
+
+    def decide(self, roll_result, num_rolls, board, strategy=None, cancelled=None):
+        """Expects the roll result, the rolls remaining and a ScoreKeeper board the caller will not change meanwhile, the
+        strategy to decide with, the strength's when None, and a threading.Event set once the decision is no longer wanted,
+        or None. Returns the Move: the dice to hold while rolls remain and the strategy does not keep all of them, otherwise
+        the category to score. Raises DecisionCancelled when cancelled is set before a strategy call; a strategy call already
+        running is not interrupted."""
+        strategy = strategy or self.strategy
+        if num_rolls > 0:
+            self._check(cancelled)
+            keep = strategy.choose_keep(roll_result, num_rolls, board)
+            if len(keep) < len(roll_result):
+                return Move(set(keep), None)
+        self._check(cancelled)
+        return Move(None, strategy.choose_category(roll_result, board))
+
+    @staticmethod
+    def _check(cancelled):
+        """Raises DecisionCancelled when the cancelled event is set."""
+        if cancelled is not None and cancelled.is_set():
+            raise DecisionCancelled("the decision was called off")
+
+    def quick_move(self, roll_result, num_rolls, board):
+        """Same as decide with the fallback strategy, which takes microseconds."""
+        return self.decide(roll_result, num_rolls, board, self.fallback)
+
+    def __repr__(self):
+        return f"Opponent({self.strength!r})"
@@ -0,0 +1,342 @@
+"""Decision quality of recorded games. Replays every game of an event log through the engine and measures each choice a
+player made against the best choice of the optimal solitaire strategy: the dice held before every reroll, holding all five
+when a turn ended early, and the category every turn was scored in. The regret of a choice is the expected final score the
+best choice would have kept minus the expected final score of the choice made, from the engine.solver value table of the
+rules the game was played by, so a player who always plays optimally has no regret. In games of more than one player the
+choices are still measured against solitaire play, which maximises the expected score rather than the chance of winning.
+
+Games are analysed in chunks on a process pool and streamed back in log order into a columnar output directory, one raw
+little endian array file per column of COLUMNS plus schema.json, which holds the row count, the column types, the player
+names the player column indexes and the rules the rules column codes:
+
+    game        u4  position of the game in the log
+    player      u2  index of the player's name in schema["players"]
+    seat        u1  turn order position of the player in the game
+    turn        u1  turn of the player's game the choice was made in, from 0
+    kind        u1  HOLD or CATEGORY
+    rolls_left  u1  rolls the player had left when choosing
+    dice        u2  the roll chosen on, packed 3 bits per die as in engine.eventlog
+    choice      u1  held dice mask, bit i for die i, or category index
+    best        u1  the same for the best choice
+    value       f4  expected final points still to come after the choice made
+    best_value  f4  the same for the best choice
+    regret      f4  best_value - value
+    rules       u1  engine.rules code of the game's rules
+
+Run from the repository root with:
+    python -m engine.regret games.log [--output regret] [--workers N] [--top 10]
+"""
+
+import argparse
+import json
+import os
+import time
+from multiprocessing import Pool
+
+import numpy as np
+
+from engine import solver
+from engine.eventlog import ROLL, pack_dice, read_games, replay_game, unpack_table
+from engine.holds import HoldOptimizer, sorted_subset
+from engine.rules import get_rules_by_code
+
+SCHEMA_VERSION = 1
+HOLD = 0
+CATEGORY = 1
+OPTIMAL_TOLERANCE = 1e-3
+
+COLUMNS = (
+    ("game", "<u4"),
+    ("player", "<u2"),
+    ("seat", "u1"),
+    ("turn", "u1"),
+    ("kind", "u1"),
+    ("rolls_left", "u1"),
+    ("dice", "<u2"),
+    ("choice", "u1"),
+    ("best", "u1"),
+    ("value", "<f4"),
+    ("best_value", "<f4"),
+    ("regret", "<f4"),
+    ("rules", "u1"),
+)
+
+_optimizers = {}
+
+
+def optimizer_for(rules):
+    """Expects Rules. Returns this process's HoldOptimizer on the rules' value table, loading it on first use. The table is
+    indexed through a plain ndarray view of the memory map, which skips the memmap subclass's per lookup overhead."""
+    optimizer = _optimizers.get(rules.name)
+    if optimizer is None:
+        values = np.asarray(solver.load_table(rules=rules))
+        optimizer = _optimizers[rules.name] = HoldOptimizer(values, rules=rules)
+    return optimizer
+
+
+def hold_decision(optimizer, roll_result, num_rolls, board, held):
+    """Expects a HoldOptimizer, a roll result, the rolls left, the board and the mask of the dice held for the next roll,
+    31 when the turn ended on this roll. Returns (best mask, value of the hold, value of the best hold)."""
+    order = sorted(range(len(roll_result)), key=roll_result.__getitem__)
+    values = optimizer.subset_values(board.scores.state(), num_rolls, tuple(roll_result[index] for index in order))
+    best = max(range(32), key=values.__getitem__)
+    chosen = sorted_subset(roll_result, [index for index in range(len(roll_result)) if held >> index & 1])
+    best_mask = sum(1 << order[position] for position in range(len(order)) if best >> position & 1)
+    return best_mask, values[chosen], values[best]
+
+
+def category_decision(optimizer, roll_result, board, category):
+    """Expects a HoldOptimizer, a final roll result, the board and the index of the category it was scored in.
+    Returns (best category index, value of the category, value of the best category)."""
+    ranked = optimizer.rank_categories(roll_result, board)
+    index = optimizer.rules.category_index
+    chosen = next(value for value, name in ranked if index[name] == category)
+    return index[ranked[0][1]], chosen, ranked[0][0]
+
+
+def analyze_game(logged):
+    """Expects a LoggedGame. Replays it and returns one (seat, turn, kind, rolls_left, dice, choice, best, value, best_value)
+    row per choice, in the order they were made."""
+    optimizer = optimizer_for(logged.rules)
+    rows = []
+
+    def observe(match, record):
+        player = match.current_player
+        roll_result = player.roll_result
+        if not roll_result:
+            return
+        board = player.board
+        dice = pack_dice(roll_result)
+        if record[0] == ROLL or player.num_rolls:
+            held = record[1] if record[0] == ROLL else 31
+            best, value, best_value = hold_decision(optimizer, roll_result, player.num_rolls, board, held)
+            rows.append((match.current, player.turn_count, HOLD, player.num_rolls, dice, held, best, value, best_value))
+        if record[0] != ROLL:
+            best, value, best_value = category_decision(optimizer, roll_result, board, record[1])
+            rows.append((match.current, player.turn_count, CATEGORY, player.num_rolls, dice, record[1], best, value, best_value))
+
+    replay_game(logged, observe)
+    return rows
+
+
+def _analyze_chunk(chunk):
+    """Analyses a chunk of (game number, LoggedGame) in a worker. Returns (game number, names, rules code, rows) per game."""
+    return [(number, logged.names, logged.rules.code, analyze_game(logged)) for number, logged in chunk]
+
+
+class ColumnWriter:
+    """Appends rows to one array file per column of COLUMNS in a directory and writes schema.json when closed."""
+
+    def __init__(self, directory):
+        """Expects the output directory, created if missing. Existing column files in it are replaced."""
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.files = {name: open(os.path.join(directory, f"{name}.bin"), "wb") for name, _ in COLUMNS}
+        self.rows = 0
+
+    def write(self, columns):
+        """Expects a dict of column name to a sequence of values, every column of COLUMNS with the same length."""
+        for name, dtype in COLUMNS:
+            np.asarray(columns[name], dtype=dtype).tofile(self.files[name])
+        self.rows += len(columns["game"])
+
+    def close(self, **schema):
+        """Expects the extra schema entries. Closes the column files and writes schema.json with the row count and column types."""
+        for column_file in self.files.values():
+            column_file.close()
+        schema = {"version": SCHEMA_VERSION, "rows": self.rows, "columns": dict(COLUMNS), **schema}
+        with open(os.path.join(self.directory, "schema.json"), "w") as schema_file:
+            json.dump(schema, schema_file, indent=1)
+        return schema
+
+
+def load_columns(directory):
+    """Expects an output directory of analyze. Returns (schema, dict of column name to NumPy array)."""
+    with open(os.path.join(directory, "schema.json")) as schema_file:
+        schema = json.load(schema_file)
+    if schema.get("version") != SCHEMA_VERSION:
+        raise ValueError(f"{directory} holds version {schema.get('version')} regret columns, expected {SCHEMA_VERSION}")
+    columns = {
+        name: np.fromfile(os.path.join(directory, f"{name}.bin"), dtype=dtype, count=schema["rows"])
+        for name, dtype in schema["columns"].items()
+    }
+    return schema, columns
+
+
+def _numbered_games(path):
+    """Yields (game number, LoggedGame) for every complete game of the log, making sure the value table of each rules
+    variant exists before its first game is handed to a worker."""
+    ensured = set()
+    for number, logged in enumerate(read_games(path)):
+        if logged.rules.name not in ensured:
+            solver.ensure_table(rules=logged.rules)
+            ensured.add(logged.rules.name)
+        yield number, logged
+
+
+def analyze(path, output, workers=None, chunk_size=20, progress=None):
+    """Expects the path of an event log, the output directory, a worker count (every core when None) and how many games to
+    send a worker at a time. Analyses every game, writing the rows in log order as chunks come back, and calls
+    progress(games, rows) after every chunk when given. Returns the schema written. With workers=1 the games are
+    analysed in this process."""
+    workers = workers or os.cpu_count()
+    games = _numbered_games(path)
+    chunks = iter(lambda: [game for _, game in zip(range(chunk_size), games)], [])
+    writer = ColumnWriter(output)
+    players = {}
+    rules = {}
+    count = 0
+    pool = Pool(workers) if workers > 1 else None
+    try:
+        for results in pool.imap(_analyze_chunk, chunks) if pool else map(_analyze_chunk, chunks):
+            columns = {name: [] for name, _ in COLUMNS}
+            for number, names, code, rows in results:
+                count += 1
+                rules[code] = get_rules_by_code(code).name
+                ids = [players.setdefault(name, len(players)) for name in names]
+                for seat, turn, kind, rolls_left, dice, choice, best, value, best_value in rows:
+                    for name, item in (
+                        ("game", number),
+                        ("player", ids[seat]),
+                        ("seat", seat),
+                        ("turn", turn),
+                        ("kind", kind),
+                        ("rolls_left", rolls_left),
+                        ("dice", dice),
+                        ("choice", choice),
+                        ("best", best),
+                        ("value", value),
+                        ("best_value", best_value),
+                        ("regret", max(best_value - value, 0.0)),
+                        ("rules", code),
+                    ):
+                        columns[name].append(item)
+            writer.write(columns)
+            if progress:
+                progress(count, writer.rows)
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+    return writer.close(
+        source=os.path.abspath(path),
+        games=count,
+        players=sorted(players, key=players.get),
+        rules={str(code): name for code, name in sorted(rules.items())},
+    )
+
+
+def player_summary(schema, columns):
+    """Returns one (name, games, choices, regret per game, hold regret per game, category regret per game, optimal share)
+    tuple per player, least regret per game first."""
+    player = columns["player"].astype(np.int64)
+    regret = columns["regret"].astype(np.float64)
+    count = len(schema["players"])
+    games = np.bincount(np.unique(columns["game"].astype(np.int64) << 16 | player) & 0xFFFF, minlength=count)
+    choices = np.bincount(player, minlength=count)
+    total = np.bincount(player, regret, count)
+    holds = np.bincount(player, np.where(columns["kind"] == HOLD, regret, 0), count)
+    optimal = np.bincount(player, regret < OPTIMAL_TOLERANCE, count)
+    summary = [
+        (name, int(games[index]), int(choices[index]), total[index] / games[index], holds[index] / games[index],
+         (total[index] - holds[index]) / games[index], optimal[index] / choices[index])
+        for index, name in enumerate(schema["players"])
+        if choices[index]
+    ]
+    return sorted(summary, key=lambda row: row[3])
+
+
+def turn_summary(schema, columns):
+    """Returns one (turn, regret per player game, hold regret, category regret, worst regret) tuple per turn number, from 1.
+    Each turn's regret is per player game that reached it, so the turns only Yatzy has are not averaged over 13 turn games."""
+    player_game = columns["game"].astype(np.int64) << 16 | columns["player"]
+    turn = columns["turn"].astype(np.int64)
+    regret = columns["regret"].astype(np.float64)
+    holds = columns["kind"] == HOLD
+    summary = []
+    for number in range(int(turn.max()) + 1 if len(turn) else 0):
+        selected = turn == number
+        player_games = max(len(np.unique(player_game[selected])), 1)
+        turn_regret = regret[selected]
+        hold_regret = turn_regret[holds[selected]].sum()
+        summary.append((
+            number + 1,
+            turn_regret.sum() / player_games,
+            hold_regret / player_games,
+            (turn_regret.sum() - hold_regret) / player_games,
+            float(turn_regret.max()) if len(turn_regret) else 0.0,
+        ))
+    return summary
+
+
+def describe_choice(kind, dice, choice, rules):
+    """Expects a row's kind, roll, choice and Rules. Returns the choice in words."""
+    if kind == CATEGORY:
+        return rules.categories[choice]
+    kept = [str(die) for index, die in enumerate(dice) if choice >> index & 1]
+    return f"hold {' '.join(kept)}" if kept else "hold nothing"
+
+
+def worst_blunders(schema, columns, count=10):
+    """Returns the count choices with the most regret, worst first, as (regret, game, name, turn, rolls left, dice, choice,
+    best choice) tuples with the choices in words."""
+    order = np.argsort(-columns["regret"], kind="stable")[:count]
+    dice_table = unpack_table()
+    blunders = []
+    for row in order:
+        rules = get_rules_by_code(int(columns["rules"][row]))
+        kind = int(columns["kind"][row])
+        dice = dice_table[int(columns["dice"][row])]
+        blunders.append((
+            float(columns["regret"][row]),
+            int(columns["game"][row]),
+            schema["players"][int(columns["player"][row])],
+            int(columns["turn"][row]) + 1,
+            int(columns["rolls_left"][row]),
+            dice,
+            describe_choice(kind, dice, int(columns["choice"][row]), rules),
+            describe_choice(kind, dice, int(columns["best"][row]), rules),
+        ))
+    return blunders
+
+
+def format_summary(schema, columns, top=10):
+    """Returns the per player, per turn and worst blunder summaries as a table of lines."""
+    lines = [f"{schema['games']} games, {schema['rows']} choices, regret in expected points lost", ""]
+    lines.append(f"{'player':<16}{'games':>6}{'choices':>9}{'per game':>10}{'holds':>8}{'scoring':>9}{'optimal':>9}")
+    for name, games, choices, per_game, holds, categories, optimal in player_summary(schema, columns):
+        lines.append(f"{name[:15]:<16}{games:6d}{choices:9d}{per_game:10.2f}{holds:8.2f}{categories:9.2f}{optimal:9.1%}")
+    lines += ["", f"{'turn':>4}{'regret':>9}{'holds':>8}{'scoring':>9}{'worst':>8}"]
+    for turn, per_game, holds, categories, worst in turn_summary(schema, columns):
+        lines.append(f"{turn:4d}{per_game:9.2f}{holds:8.2f}{categories:9.2f}{worst:8.2f}")
+    lines += ["", "worst blunders"]
+    for regret, game, name, turn, rolls_left, dice, choice, best in worst_blunders(schema, columns, top):
+        lines.append(
+            f"{regret:7.2f}  game {game} {name[:15]} turn {turn}, {rolls_left} rolls left, "
+            f"{list(dice)}: {choice} instead of {best}"
+        )
+    return lines
+
+
+def main(argv=None):
+    """Command line entry point. Analyses an event log into the output directory and prints the summaries."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("log", help="event log to analyse")
+    parser.add_argument("--output", default="regret", help="directory to write the columns to")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes, every core by default")
+    parser.add_argument("--top", type=int, default=10, help="worst blunders to list")
+    args = parser.parse_args(argv)
+    start = time.perf_counter()
+    schema = analyze(
+        args.log,
+        args.output,
+        args.workers,
+        progress=lambda games, rows: print(f"\r{games} games, {rows} choices", end="", flush=True),
+    )
+    elapsed = time.perf_counter() - start
+    print(f"\r{schema['games']} games analysed in {elapsed:.1f}s, {schema['rows'] / max(elapsed, 1e-9):.0f} choices/s")
+    print("\n".join(format_summary(*load_columns(args.output), args.top)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+"""Registry of rule variants. Each variant is compiled once, on its first lookup, into a flat score table over the 252 sorted
+five-dice rolls like the one in engine.table, together with its bonus and joker rules, so scoring a roll under any variant is
+a table lookup and importing the engine compiles nothing. Variants scored like standard Yahtzee reuse engine.table's scores.
+Variants are looked up by name with get_rules:
+
+    yahtzee       standard Yahtzee. 35 upper bonus at 63 and 100 for every further Yahtzee once the yahtzee box holds 50,
+                  which may be scored in any open box at its normal points
+    forced-joker  standard Yahtzee with the forced joker rule. Once the yahtzee box is filled a further Yahtzee must be
+                  scored in its own upper box if that is open, otherwise in an open lower box where full house, small and
+                  large straight count as made, and only when the lower section is full in another upper box
+    yatzy         Scandinavian Yatzy. One pair and two pairs, kinds scored as the matching dice only, the 1-5 and 2-6
+                  straights worth 15 and 20, full house worth the dice, 50 upper bonus at 63 and no bonus for further Yatzys
+"""
+
+import sys
+
+from engine import table
+from engine.categories import BONUS_CATEGORIES, NUM_UPPER, UPPER_BONUS, UPPER_BONUS_THRESHOLD, YAHTZEE_BONUS
+from engine.table import ROLLS, _FACE_BITS, face_counts
+
+DEFAULT_RULES = "yahtzee"
+
+
+def upper(face):
+    """Returns a category scoring the dice showing face."""
+    return lambda counts, total: face * counts[face - 1]
+
+
+def total_if_kind(size):
+    """Returns a category scoring the total of the dice when at least size of them match."""
+    return lambda counts, total: total if max(counts) >= size else 0
+
+
+def matching_dice(size):
+    """Returns a category scoring size dice of the highest face that has at least size of them."""
+    return lambda counts, total: max((face * size for face in range(1, 7) if counts[face - 1] >= size), default=0)
+
+
+def two_pairs(counts, total):
+    """Scores the two highest different faces that each show at least twice, two dice of each."""
+    pairs = [face for face in range(6, 0, -1) if counts[face - 1] >= 2]
+    return 2 * (pairs[0] + pairs[1]) if len(pairs) >= 2 else 0
+
+
+def is_full_house(counts):
+    """Returns True when the counts are three of one face and two of another."""
+    return sorted(counts)[-2:] == [2, 3]
+
+
+def fixed_if(test, points):
+    """Returns a category scoring points when test(counts) is true."""
+    return lambda counts, total: points if test(counts) else 0
+
+
+def run_of(length):
+    """Returns a test for length faces in a row."""
+    return lambda counts: any(
+        all(counts[face - 1] for face in range(start, start + length)) for start in range(1, 8 - length)
+    )
+
+
+def exact_faces(faces):
+    """Returns a test for the five dice showing exactly faces."""
+    return lambda counts: all(counts[face - 1] == (face in faces) for face in range(1, 7))
+
+
+def chance(counts, total):
+    """Scores the total of the dice."""
+    return total
+
+
+UPPER = tuple((name, upper(face)) for face, name in enumerate(("ones", "twos", "threes", "fours", "fives", "sixes"), start=1))
+
+
+class Rules:
+    """A compiled rule variant. categories lists the category names in board order, the NUM_UPPER upper ones first, and
+    scores holds the points of every roll in every category, row by row in engine.table.ROLLS order. With a joker rule,
+    joker_scores holds the same rows with the joker points of the Yahtzee rolls. The score tables are only built by compile,
+    which get_rules and get_rules_by_code call before handing a variant out."""
+
+    def __init__(self, name, title, categories, yahtzee, upper_bonus=UPPER_BONUS, yahtzee_bonus=0, joker=None):
+        """Expects the variant's name and display title, (name, points function) pairs for its categories, the name of its
+        five of a kind category, the upper bonus, the bonus for every further five of a kind and, for the forced joker rule,
+        a dict of the lower categories that count as made on a joker to their points. A points function takes the six face
+        counts and the total of a roll. Categories scored exactly like engine.table's are not compiled again."""
+        self.name = name
+        self.title = title
+        self.code = None
+        self.categories = tuple(category for category, _ in categories)
+        self.num_categories = len(self.categories)
+        self.upper_categories = self.categories[:NUM_UPPER]
+        self.keys = self.categories + BONUS_CATEGORIES
+        self.category_index = {category: index for index, category in enumerate(self.categories)}
+        self.yahtzee = self.category_index[yahtzee]
+        self.upper_bonus = upper_bonus
+        self.upper_bonus_threshold = UPPER_BONUS_THRESHOLD
+        self.yahtzee_bonus = yahtzee_bonus
+        self.joker = joker is not None
+        self._definitions = categories
+        self._joker_points = joker
+        self.scores = None
+        self.joker_scores = None
+        self.yahtzee_rolls = None
+        self._row_offset = None
+        self._category_offset = {**self.category_index, **{index: index for index in range(self.num_categories)}}
+
+    def compile(self):
+        """Builds the score tables the first time it is called. Returns the Rules."""
+        if self.scores is not None:
+            return self
+        if self._definitions is STANDARD_CATEGORIES:
+            scores = table.SCORES
+            self._row_offset = table._ROW_OFFSET
+        else:
+            scores = bytes(points(face_counts(roll), sum(roll)) for roll in ROLLS for _, points in self._definitions)
+            self._row_offset = {
+                sum(_FACE_BITS[die] for die in roll): index * self.num_categories for index, roll in enumerate(ROLLS)
+            }
+        self.yahtzee_rolls = tuple((index, roll[0]) for index, roll in enumerate(ROLLS) if len(set(roll)) == 1)
+        if self._joker_points is not None:
+            joker_scores = bytearray(scores)
+            for index, _ in self.yahtzee_rolls:
+                for category, points in self._joker_points.items():
+                    joker_scores[index * self.num_categories + self.category_index[category]] = points
+            self.joker_scores = bytes(joker_scores)
+        self.scores = scores
+        return self
+
+    def row(self, roll):
+        """Expects a roll of five dice faces in any order. Returns the offset of its row in scores."""
+        a, b, c, d, e = roll
+        return self._row_offset[_FACE_BITS[a] + _FACE_BITS[b] + _FACE_BITS[c] + _FACE_BITS[d] + _FACE_BITS[e]]
+
+    def score(self, roll, category):
+        """Expects a roll of five dice faces in any order and a category name or index. Returns the score of the roll there."""
+        return self.scores[self.row(roll) + self._category_offset[category]]
+
+    def is_yahtzee(self, roll):
+        """Returns True when all five dice match."""
+        return self.scores[self.row(roll) + self.yahtzee] != 0
+
+    def is_joker(self, board, roll):
+        """Expects a Board and a roll. Returns True when the joker rule applies: the roll is a Yahtzee and the Board's five of
+        a kind box has been filled."""
+        return self.joker and not board.is_open(self.yahtzee) and self.is_yahtzee(roll)
+
+    def points(self, board, roll):
+        """Expects a Board and a roll. Returns the points of the roll in every category as a bytes slice, the joker points
+        when the joker rule applies."""
+        offset = self.row(roll)
+        scores = self.joker_scores if self.is_joker(board, roll) else self.scores
+        return scores[offset : offset + self.num_categories]
+
+    def joker_categories(self, filled, face):
+        """Expects the bitmask of filled categories and the face of a joker roll. Returns the indices of the categories the
+        roll may be scored in: its own upper box when open, otherwise the open lower boxes, otherwise the open upper boxes."""
+        if not filled >> face - 1 & 1:
+            return [face - 1]
+        open_categories = [index for index in range(self.num_categories) if not filled >> index & 1]
+        lower = [index for index in open_categories if index >= NUM_UPPER]
+        return lower or open_categories
+
+    def playable(self, board, roll):
+        """Expects a Board and a roll. Returns the indices of the categories the roll may be scored in."""
+        if self.is_joker(board, roll):
+            return self.joker_categories(board.filled, roll[0])
+        return board.open_categories()
+
+    def score_roll(self, board, roll, category):
+        """Expects a Board, a roll and a category name or index. Adds the bonus for a further five of a kind, then scores the
+        roll into the category if it is open. Returns the points scored, or None if the category was already filled."""
+        index = self._category_offset[category]
+        offset = self.row(roll)
+        if self.scores[offset + self.yahtzee] and board.get(self.yahtzee):
+            board.yahtzee_bonus += self.yahtzee_bonus
+        if not board.is_open(index):
+            return None
+        scores = self.joker_scores if self.is_joker(board, roll) else self.scores
+        points = scores[offset + index]
+        board.score(index, points)
+        return points
+
+    def __reduce__(self):
+        return get_rules, (self.name,)
+
+    def __repr__(self):
+        return f"get_rules({self.name!r})"
+
+
+RULES = {}
+
+
+def register(rules):
+    """Expects a Rules. Adds it to RULES under its name and gives it the next code, the number event logs record it by.
+    The variant is compiled on its first lookup."""
+    rules.code = len(RULES)
+    RULES[rules.name] = rules
+    return rules
+
+
+def get_rules(name=None):
+    """Expects the name of a registered variant, DEFAULT_RULES when None. Returns its Rules. Raises ValueError for an unknown name."""
+    try:
+        rules = RULES[name or DEFAULT_RULES]
+    except KeyError:
+        raise ValueError(f"unknown rules {name!r}, choose from {', '.join(RULES)}") from None
+    return rules.compile()
+
+
+def get_rules_by_code(code):
+    """Expects the code of a registered variant. Returns its Rules. Raises ValueError for an unknown code."""
+    for rules in RULES.values():
+        if rules.code == code:
+            return rules.compile()
+    raise ValueError(f"unknown rules code {code}")
+
+
+def configure(argv=None):
+    """Expects a command line argument list, sys.argv when None. Removes --rules NAME or --rules=NAME from it and returns that
+    variant's Rules, the default variant without the option."""
+    argv = sys.argv if argv is None else argv
+    name = None
+    for position, argument in enumerate(list(argv[1:]), start=1):
+        if argument.startswith("--rules="):
+            name = argument.partition("=")[2]
+            del argv[position]
+            break
+        if argument == "--rules" and position + 1 < len(argv):
+            name = argv[position + 1]
+            del argv[position : position + 2]
+            break
+    return get_rules(name)
+
+
+STANDARD_CATEGORIES = UPPER + (
+    ("three of a kind", total_if_kind(3)),
+    ("four of a kind", total_if_kind(4)),
+    ("full house", fixed_if(is_full_house, 25)),
+    ("small straight", fixed_if(run_of(4), 30)),
+    ("large straight", fixed_if(run_of(5), 40)),
+    ("yahtzee", fixed_if(lambda counts: max(counts) == 5, 50)),
+    ("chance", chance),
+)
+
+STANDARD = register(Rules("yahtzee", "Yahtzee", STANDARD_CATEGORIES, "yahtzee", yahtzee_bonus=YAHTZEE_BONUS))
+FORCED_JOKER = register(
+    Rules(
+        "forced-joker",
+        "Yahtzee",
+        STANDARD_CATEGORIES,
+        "yahtzee",
+        yahtzee_bonus=YAHTZEE_BONUS,
+        joker={"full house": 25, "small straight": 30, "large straight": 40},
+    )
+)
+YATZY = register(
+    Rules(
+        "yatzy",
+        "Yatzy",
+        UPPER
+        + (
+            ("one pair", matching_dice(2)),
+            ("two pairs", two_pairs),
+            ("three of a kind", matching_dice(3)),
+            ("four of a kind", matching_dice(4)),
+            ("small straight", fixed_if(exact_faces({1, 2, 3, 4, 5}), 15)),
+            ("large straight", fixed_if(exact_faces({2, 3, 4, 5, 6}), 20)),
+            ("full house", lambda counts, total: total if is_full_house(counts) else 0),
+            ("chance", chance),
+            ("yatzy", fixed_if(lambda counts: max(counts) == 5, 50)),
+        ),
+        "yatzy",
+        upper_bonus=50,
+    )
+)
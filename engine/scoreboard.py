@@ -0,0 +1,43 @@
+from engine.board import Board, BoardView
+
+
+class ScoreKeeper:
+    """This is the class for keeping track of the active scores and the formulation of what the categories are.
+    It keeps the scores in a compact Board, so the upper score bonus and end of game score are read from running sums.
+    The categories and bonuses are those of the engine.rules variant it is created with"""
+
+    def __init__(self, rules=None):
+        """Expects the Rules of the variant played, the default variant when None. Initializes the ScoreKeeper class with an
+        empty Board, the score_board_dict view of it for each scoring category defaulted to None as well as the
+        scord_board_upper_list tuple"""
+        self.scores = Board(rules)
+        self.rules = self.scores.rules
+        self.score_board_dict = BoardView(self.scores)
+        self.scord_board_upper_list = self.rules.upper_categories
+
+    def open_categories(self):
+        """Returns the list of categories that have not been scored yet, in board order."""
+        return [self.rules.categories[index] for index in self.scores.open_categories()]
+
+    def playable_categories(self, roll_result):
+        """Expects a roll result. Returns the list of categories it may be scored in, in board order: the open ones,
+        narrowed down by the joker rule of variants that have one."""
+        return [self.rules.categories[index] for index in self.rules.playable(self.scores, roll_result)]
+
+    def score_bonus(self):
+        """Returns the upper bonus of the rules or 0 points, kept up to date by the Board as upper categories are scored"""
+        return self.scores.upper_bonus
+
+    def copy(self):
+        """Returns an engine ScoreKeeper on an independent copy of the board, for working out moves away from the game."""
+        board = ScoreKeeper.__new__(ScoreKeeper)
+        board.scores = self.scores.copy()
+        board.rules = self.rules
+        board.score_board_dict = BoardView(board.scores)
+        board.scord_board_upper_list = self.scord_board_upper_list
+        return board
+
+    def end_of_game_score(self):
+        """Computes the end of game score including bonus"""
+        self.score_final = self.scores.final_score()
+        return self.score_final
@@ -0,0 +1,81 @@
+from engine.categories import CATEGORIES, UPPER_CATEGORIES, BONUS_CATEGORIES
+
+
+class Scorer:
+    """Takes a roll result and defines functions for detecting and scoring roll results. Each scoring category reads the compiled
+    tables of the board's engine.rules variant to either award points or grant 0 points if a roll does not meet the requirements,
+    or if the variant has no such category. The roll result is never modified. score_roll scores with the same tables, so it works
+    for every variant"""
+
+    singles = {
+        "ones": 1,
+        "twos": 2,
+        "threes": 3,
+        "fours": 4,
+        "fives": 5,
+        "sixes": 6,
+    }
+
+    def __init__(self, roll_result, score_board):
+        """Takes the roll result and the board to be used as a class parameter. The singles dict is built once for the class,
+        not per Scorer"""
+        self.roll_result = roll_result
+        self.score_board = score_board
+
+    def score_roll(self, user_category_selection):
+        """Expects user_category_selection and assigns it as a Scorer class variable.
+        Has the board's rules apply the bonus for a further yahtzee when the yahtzee category already holds one, then score
+        the roll into the category if it has not been scored before, at its joker points where the rules have a joker rule.
+        Returns the score written to the board, or None if the category was already scored."""
+        self.user_category_selection = user_category_selection
+        board = self.score_board.scores
+        return board.rules.score_roll(board, self.roll_result, user_category_selection)
+
+    def category_score(self, category):
+        """Expects a category name. Returns the score of the roll result there under the board's rules, 0 when the rules have
+        no such category"""
+        rules = self.score_board.scores.rules
+        if category not in rules.categories:
+            return 0
+        return rules.score(self.roll_result, category)
+
+    def single_die_score(self):
+        """Parses singles dict then looks up the singles score of the roll result"""
+        if self.user_category_selection in self.singles:
+            score = self.category_score(self.user_category_selection)
+        else:
+            score = 0
+        return score
+
+    def three_of_a_kind(self):
+        """Looks up the score for at least three dice the same"""
+        return self.category_score("three of a kind")
+
+    def four_of_a_kind(self):
+        """Looks up the score for at least four dice the same"""
+        return self.category_score("four of a kind")
+
+    def full_house(self):
+        """Looks up the score for three of one number and two of another"""
+        return self.category_score("full house")
+
+    def small_straight(self):
+        """Looks up the score for four sequential dice"""
+        return self.category_score("small straight")
+
+    def large_straight(self):
+        """Looks up the score for five sequential dice"""
+        return self.category_score("large straight")
+
+    def yathzee(self):
+        """Looks up the score for all five dice the same, in the board's rules' five of a kind category"""
+        rules = self.score_board.scores.rules
+        return rules.score(self.roll_result, rules.yahtzee)
+
+    def is_yahtzee(self):
+        """Function used to check if any given roll is a Yahtzee(all five dice are the same)."""
+        return self.score_board.scores.rules.is_yahtzee(self.roll_result)
+
+    def chance(self):
+        """Looks up the sum of the roll result"""
+        return self.category_score("chance")
@@ -0,0 +1,271 @@
+"""Asyncio game server hosting many tables of networked players from one process.
+
+Clients connect over TCP, or a Unix socket, and exchange JSON objects one per line. A client sends
+    {"op": "join", "name": "Ann", "seats": 2}     sits at the next table for that many players, starting it once it is full
+    {"op": "roll"}                                rolls the dice not held
+    {"op": "hold", "index": 2}                    toggles holding a die
+    {"op": "score", "category": "full house"}     scores the roll and ends the turn
+and receives every event at its table as {"event": ..., "table": ..., "seat": ...} with the event's details:
+"joined", "started" (names), "turn started", "rolled" (dice, rolls_left), "held" (index, held), "scored" (category, score),
+"timed out", "left" and "game over" (scores), plus {"event": "error", "message": ...} for a request that was refused.
+
+Each table drives an engine Game, so the turn rules are the ones of the game window, and keeps nothing else but its seats
+and the timer of the current turn. A player who does not score within the turn timeout, or who has left the table, has the
+turn finished for them: the dice are rolled if they have not been and the roll is scored in its best paying open category.
+
+Run from the repository root with:
+    python -m engine.server [--host 127.0.0.1] [--port 8765 | --unix PATH] [--seats 2] [--turn-timeout 60]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+
+from engine.game import Game, IllegalMoveError
+from engine.scoreboard import ScoreKeeper
+from engine.strategies import GreedyStrategy
+from engine.turn import TurnTaker
+
+MAX_SEATS = 8
+MAX_LINE = 4096
+_autoplay = GreedyStrategy()
+
+
+class Seat:
+    """A player at a table: the name, the stream writer of the connection, None once it has left, and the engine player."""
+
+    __slots__ = ("table", "index", "name", "writer", "player")
+
+    def __init__(self, table, index, name, writer):
+        self.table = table
+        self.index = index
+        self.name = name
+        self.writer = writer
+        self.player = None
+
+
+class Table:
+    """One game between the seats joined to it. Created waiting for players and started by the server once full."""
+
+    __slots__ = ("server", "number", "size", "seats", "match", "timer", "rng")
+
+    def __init__(self, server, number, size, rng):
+        """Expects the server, the table number, the number of seats and the random.Random the table rolls with."""
+        self.server = server
+        self.number = number
+        self.size = size
+        self.seats = []
+        self.match = None
+        self.timer = None
+        self.rng = rng
+
+    def broadcast(self, event, seat=None, **details):
+        """Sends an event about a seat to every seat still connected."""
+        line = json.dumps({"event": event, "table": self.number, "seat": seat, **details}).encode() + b"\n"
+        for other in self.seats:
+            if other.writer is not None:
+                other.writer.write(line)
+
+    def start(self):
+        """Creates the Game for the seats in join order and starts the first turn."""
+        for seat in self.seats:
+            seat.player = TurnTaker(ScoreKeeper(), self.rng)
+        self.broadcast("started", names=[seat.name for seat in self.seats])
+        self.match = Game([seat.player for seat in self.seats], self.handle_event)
+        self.match.start()
+
+    @property
+    def current_seat(self):
+        """The seat whose turn it is."""
+        return self.seats[self.match.current]
+
+    def handle_event(self, event, player, **details):
+        """Listener of the Game. Passes the event on to every seat and looks after the turn timer."""
+        seat = self.match.current
+        if event == "rolled":
+            details = {"dice": player.roll_result, "rolls_left": player.num_rolls}
+        elif event == "game over":
+            details = {"scores": [other.player.board.scores.final_score() for other in self.seats]}
+        self.broadcast(event, seat, **details)
+        if event == "turn started":
+            self.cancel_timer()
+            if self.current_seat.writer is None:
+                self.timer = self.server.loop.call_soon(self.finish_turn)
+            else:
+                self.timer = self.server.loop.call_later(self.server.turn_timeout, self.turn_timed_out)
+        elif event == "game over":
+            self.cancel_timer()
+            self.server.close_table(self)
+
+    def cancel_timer(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+    def act(self, seat, message):
+        """Expects the seat a request came from and the request. Rolls, holds or scores for the seat if it is its turn.
+        Raises IllegalMoveError for a request the game does not allow."""
+        if self.match is None or self.match.state == Game.GAME_OVER:
+            raise IllegalMoveError("the game is not being played")
+        if seat is not self.current_seat:
+            raise IllegalMoveError("it is not your turn")
+        op = message["op"]
+        if op == "roll":
+            self.match.roll()
+        elif op == "hold":
+            index = message["index"]
+            if not isinstance(index, int) or not 0 <= index < len(seat.player.roll_result):
+                raise IllegalMoveError(f"no die at index {index!r}")
+            self.match.hold(index)
+        elif op == "score":
+            self.match.score(message["category"])
+        else:
+            raise IllegalMoveError(f"unknown op {op!r}")
+
+    def turn_timed_out(self):
+        """Timer callback. Finishes the turn of a player who ran out of time."""
+        self.timer = None
+        self.broadcast("timed out", self.match.current)
+        self.finish_turn()
+
+    def finish_turn(self):
+        """Rolls for the current player if they have not rolled yet and scores the roll in its best paying open category."""
+        self.timer = None
+        if self.match.state == Game.GAME_OVER:
+            return
+        if self.match.state == Game.TURN_START:
+            self.match.roll()
+        player = self.match.current_player
+        self.match.score(_autoplay.choose_category(player.roll_result, player.board))
+
+    def leave(self, seat):
+        """Expects a seat whose connection closed. Tells the table, and finishes the seat's turns for it from now on."""
+        seat.writer = None
+        self.broadcast("left", seat.index)
+        if self.match is None:
+            self.seats.remove(seat)
+            for index, other in enumerate(self.seats):
+                other.index = index
+            if not self.seats:
+                self.server.close_table(self)
+        elif all(other.writer is None for other in self.seats):
+            self.cancel_timer()
+            self.server.close_table(self)
+        elif self.match.state != Game.GAME_OVER and self.current_seat is seat:
+            self.cancel_timer()
+            self.timer = self.server.loop.call_soon(self.finish_turn)
+
+
+class GameServer:
+    """Accepts connections and seats them at tables. Tables waiting for players are kept per table size."""
+
+    def __init__(self, seats=2, turn_timeout=60.0, seed=None):
+        """Expects the default seats per table, the seconds a player has for each turn and an optional seed,
+        which makes table n roll the same dice every time the server is started."""
+        self.default_seats = seats
+        self.turn_timeout = turn_timeout
+        self.seed = seed
+        self.tables = {}
+        self.waiting = {}
+        self.table_count = 0
+        self.loop = None
+
+    def table_rng(self, number):
+        """Returns the random.Random of table number, seeded from the server seed when there is one."""
+        return random.Random() if self.seed is None else random.Random(f"{self.seed}/{number}")
+
+    def join(self, name, size, writer):
+        """Seats a player at the waiting table of that size, opening one if there is none. Returns the Seat."""
+        table = self.waiting.get(size)
+        if table is None:
+            self.table_count += 1
+            table = Table(self, self.table_count, size, self.table_rng(self.table_count))
+            self.tables[table.number] = table
+            self.waiting[size] = table
+        seat = Seat(table, len(table.seats), name, writer)
+        table.seats.append(seat)
+        table.broadcast("joined", seat.index, name=name)
+        if len(table.seats) == size:
+            del self.waiting[size]
+            table.start()
+        return seat
+
+    def close_table(self, table):
+        """Forgets a finished or abandoned table."""
+        self.tables.pop(table.number, None)
+        if self.waiting.get(table.size) is table:
+            del self.waiting[table.size]
+
+    async def handle_connection(self, reader, writer):
+        """Serves one connection until it closes, answering refused requests with an error event."""
+        seat = None
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ConnectionError, ValueError):
+                    break
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                    if message["op"] == "join":
+                        if seat is not None:
+                            raise IllegalMoveError("already at a table")
+                        size = message.get("seats", self.default_seats)
+                        if not isinstance(size, int) or not 1 <= size <= MAX_SEATS:
+                            raise IllegalMoveError(f"a table seats 1 to {MAX_SEATS} players")
+                        seat = self.join(str(message.get("name", ""))[:32], size, writer)
+                    elif seat is None:
+                        raise IllegalMoveError("join a table first")
+                    else:
+                        seat.table.act(seat, message)
+                except (ValueError, KeyError, TypeError, AttributeError) as error:
+                    writer.write(json.dumps({"event": "error", "message": str(error)}).encode() + b"\n")
+                try:
+                    await writer.drain()
+                except ConnectionError:
+                    break
+        finally:
+            if seat is not None:
+                seat.table.leave(seat)
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=8765, unix_path=None, ready=None):
+        """Listens on host and port, or on unix_path when given, until cancelled. Calls ready(server) once listening."""
+        self.loop = asyncio.get_running_loop()
+        if unix_path:
+            server = await asyncio.start_unix_server(self.handle_connection, unix_path, limit=MAX_LINE)
+        else:
+            server = await asyncio.start_server(self.handle_connection, host, port, limit=MAX_LINE, backlog=4096)
+        if ready is not None:
+            ready(server)
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv=None):
+    """Command line entry point. Runs the server until interrupted."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765, help="0 picks a free port")
+    parser.add_argument("--unix", default=None, help="listen on this Unix socket path instead of TCP")
+    parser.add_argument("--seats", type=int, default=2, help="players per table when a join does not say")
+    parser.add_argument("--turn-timeout", type=float, default=60.0, help="seconds a player has for each turn")
+    parser.add_argument("--seed", default=None)
+    args = parser.parse_args(argv)
+    server = GameServer(args.seats, args.turn_timeout, args.seed)
+
+    def ready(listening):
+        name = listening.sockets[0].getsockname()
+        print(f"serving on {name[0]}:{name[1]}" if isinstance(name, tuple) else f"serving on {name}", flush=True)
+
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.unix, ready))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""Parallel Monte Carlo simulation of whole solitaire games.
+
+Every game is played headlessly with the same turn rules as the game window and its own random.Random seeded from the
+simulation seed and the game number, so results do not depend on how the games are spread across worker processes. The
+dice come from that Random too, or with --dice buffered from an engine.dice BufferedDice seeded the same way.
+Games are played in chunks on a process pool and streamed back in order, only one chunk per worker is held in memory.
+
+Run from the repository root with:
+    python -m engine.simulate --strategy greedy --games 100000 [--rules NAME] [--dice buffered] [--workers N] [--seed S]
+"""
+
+import argparse
+import math
+import os
+import random
+import time
+from collections import namedtuple
+from multiprocessing import Pool
+
+from engine.dice import game_dice
+from engine.game import Game
+from engine.rules import RULES, get_rules
+from engine.scoreboard import ScoreKeeper
+from engine.strategies import STRATEGIES
+from engine.turn import TurnTaker
+
+GameResult = namedtuple("GameResult", ["score", "upper_bonus", "yahtzee_bonuses"])
+
+
+def game_rng(seed, game):
+    """Expects the simulation seed and a game number. Returns the random.Random that game is played with."""
+    return random.Random(f"{seed}/{game}")
+
+
+def play_turn(match, strategy):
+    """Expects a Game at the start of a turn and the strategy of its current player. Plays the turn the way the game window does:
+    roll, hold the dice the strategy keeps and roll again while rolls remain, then score the category the strategy picks."""
+    turn = match.current_player
+    match.roll()
+    while match.state == Game.ROLLED:
+        kept = strategy.choose_keep(turn.roll_result, turn.num_rolls, turn.board)
+        if len(kept) == turn.num_dice:
+            break
+        for index in kept:
+            match.hold(index)
+        match.roll()
+    return match.score(strategy.choose_category(turn.roll_result, turn.board))
+
+
+def play_game(strategy, rng, rules=None, dice=None):
+    """Expects a strategy, a random.Random, the Rules to play by, the default variant when None, and the engine.dice source to
+    roll with, rng when None. Plays the turns of one solitaire game and returns its GameResult."""
+    board = ScoreKeeper(rules)
+    turn = TurnTaker(board, dice or rng)
+    match = Game([turn])
+    strategy.start_game(rng)
+    match.start()
+    while match.state != Game.GAME_OVER:
+        play_turn(match, strategy)
+    scores = board.scores
+    return GameResult(
+        scores.final_score(),
+        scores.upper_bonus > 0,
+        scores.yahtzee_bonus // scores.rules.yahtzee_bonus if scores.rules.yahtzee_bonus else 0,
+    )
+
+
+def _play_chunk(job):
+    """Plays games start to stop of a simulation in a worker. Returns their results in game order."""
+    strategy, seed, start, stop, rules, buffered = job
+    return [
+        play_game(strategy, game_rng(seed, game), rules, game_dice(seed, game) if buffered else None)
+        for game in range(start, stop)
+    ]
+
+
+def simulate(strategy, n_games, workers=None, seed=0, chunk_size=500, rules=None, buffered=False):
+    """Expects a strategy, a number of games, a worker count (every core when None), a seed, the Rules to play by, the
+    default variant when None, and whether to roll from buffered dice. Plays the games across a process pool and yields one
+    GameResult per game in game order. With workers=1 the games are played in this process."""
+    jobs = (
+        (strategy, seed, start, min(start + chunk_size, n_games), rules, buffered)
+        for start in range(0, n_games, chunk_size)
+    )
+    workers = workers or os.cpu_count()
+    if workers == 1:
+        for job in jobs:
+            yield from _play_chunk(job)
+        return
+    with Pool(workers) as pool:
+        for results in pool.imap(_play_chunk, jobs):
+            yield from results
+
+
+class Summary:
+    """Running totals over a stream of GameResult, kept in constant memory."""
+
+    def __init__(self):
+        """Starts every total at zero."""
+        self.games = 0
+        self.mean = 0.0
+        self._squares = 0.0
+        self.best = None
+        self.worst = None
+        self.upper_bonus_hits = 0
+        self.yahtzee_bonuses = 0
+
+    def add(self, result):
+        """Expects a GameResult. Updates the totals with Welford's running mean and variance."""
+        self.games += 1
+        delta = result.score - self.mean
+        self.mean += delta / self.games
+        self._squares += delta * (result.score - self.mean)
+        self.best = result.score if self.best is None else max(self.best, result.score)
+        self.worst = result.score if self.worst is None else min(self.worst, result.score)
+        self.upper_bonus_hits += result.upper_bonus
+        self.yahtzee_bonuses += result.yahtzee_bonuses
+
+    @property
+    def stdev(self):
+        """Sample standard deviation of the scores."""
+        return math.sqrt(self._squares / (self.games - 1)) if self.games > 1 else 0.0
+
+    def __str__(self):
+        return (
+            f"{self.games} games: mean {self.mean:.2f} (sd {self.stdev:.2f}), best {self.best}, worst {self.worst}, "
+            f"upper bonus {self.upper_bonus_hits / max(self.games, 1):.1%}, "
+            f"yahtzee bonuses {self.yahtzee_bonuses / max(self.games, 1):.3f} per game"
+        )
+
+
+def summarize(results):
+    """Expects an iterable of GameResult. Returns their Summary."""
+    summary = Summary()
+    for result in results:
+        summary.add(result)
+    return summary
+
+
+def main(argv=None):
+    """Command line entry point. Simulates games and prints the summary and throughput."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--strategy", choices=sorted(STRATEGIES), default="greedy")
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes, every core by default")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--rules", choices=list(RULES), default=None, help="rules variant, standard Yahtzee by default")
+    parser.add_argument("--dice", choices=("random", "buffered"), default="random", help="dice source, randint per die by default")
+    args = parser.parse_args(argv)
+    workers = args.workers or os.cpu_count()
+    start = time.perf_counter()
+    summary = summarize(
+        simulate(
+            STRATEGIES[args.strategy](),
+            args.games,
+            workers,
+            args.seed,
+            rules=get_rules(args.rules),
+            buffered=args.dice == "buffered",
+        )
+    )
+    elapsed = time.perf_counter() - start
+    print(summary)
+    print(f"{args.games / elapsed:.0f} games/s on {workers} workers, {args.games / elapsed / workers:.0f} games/s per worker")
+
+
+if __name__ == "__main__":
+    main()
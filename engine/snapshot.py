@@ -0,0 +1,204 @@
+"""Fixed-size bit-packed snapshots of players mid game, and an autosave that keeps the snapshot of a game in progress on disk.
+
+A player packs into PLAYER_SIZE bytes, as one little endian integer with the fields below from the lowest bit up:
+
+    filled         15 bits  bit i set once category i is scored
+    scores         15 x 6   the points of category i, 0 while it is open
+    bonuses         4 bits  the number of yahtzee bonuses scored
+    turn count      4 bits  turns played
+    rolls left      2 bits
+    held dice       5 bits  bit i set while die i is held
+    roll result    15 bits  3 bits per die, die 0 lowest, all zero before the first roll of a turn
+    rules code      5 bits  the engine.rules variant played
+
+A saved game is the 8 byte HEADER, the player count, the current player and the game state as one byte each, then every
+player's snapshot followed by a length byte, the UTF-8 name and a byte for who plays it: 0 for a person, otherwise one more
+than the position of the computer's strength in engine.opponent.STRENGTHS. Saves write a temporary file and rename it over the last
+save, so a process killed mid write leaves the previous save whole.
+"""
+
+import os
+from collections import namedtuple
+
+from engine.game import Game
+from engine.opponent import STRENGTHS
+from engine.rules import get_rules_by_code
+
+MAGIC = b"YAHTSAV"
+SNAPSHOT_VERSION = 2
+HEADER = MAGIC + bytes([SNAPSHOT_VERSION])
+DEFAULT_AUTOSAVE_PATH = "autosave.bin"
+
+MAX_CATEGORIES = 15
+SCORE_BITS = 6
+TURN_OFFSET = MAX_CATEGORIES * (1 + SCORE_BITS)
+PLAYER_SIZE = 18
+STATE_CODES = {Game.TURN_START: 0, Game.ROLLED: 1, Game.MUST_SCORE: 2}
+STATES = {code: state for state, code in STATE_CODES.items()}
+STRENGTH_CODES = {strength: code for code, strength in enumerate(STRENGTHS, start=1)}
+CODE_STRENGTHS = {code: strength for strength, code in STRENGTH_CODES.items()}
+
+# strengths holds each player's computer strength, None for people
+SavedGame = namedtuple("SavedGame", ["rules", "names", "players", "current", "state", "strengths"])
+
+
+class SnapshotError(ValueError):
+    """Raised when a file is not a saved game of this SNAPSHOT_VERSION, or a snapshot does not fit the player it is restored to."""
+
+
+def pack_player(turn):
+    """Expects a TurnTaker. Returns the PLAYER_SIZE byte snapshot of its board and turn."""
+    board = turn.board.scores
+    rules = board.rules
+    bits = board.filled
+    shift = MAX_CATEGORIES
+    for points in board.scores:
+        bits |= points << shift
+        shift += SCORE_BITS
+    dice = 0
+    for position, face in enumerate(turn.roll_result):
+        dice |= face << 3 * position
+    held = 0
+    for index in turn.kept_dice:
+        held |= 1 << index
+    bonuses = board.yahtzee_bonus // rules.yahtzee_bonus if rules.yahtzee_bonus else 0
+    bits |= (bonuses | turn.turn_count << 4 | turn.num_rolls << 8 | held << 10 | dice << 15 | rules.code << 30) << TURN_OFFSET
+    return bits.to_bytes(PLAYER_SIZE, "little")
+
+
+def snapshot_rules(snapshot):
+    """Expects a player snapshot. Returns the Rules it was played by."""
+    return get_rules_by_code(int.from_bytes(snapshot, "little") >> TURN_OFFSET + 30 & 31)
+
+
+def unpack_player(snapshot, turn):
+    """Expects a player snapshot and a TurnTaker whose board has the same rules. Restores the board and the turn to the
+    snapshot in place. Raises SnapshotError when the rules differ."""
+    bits = int.from_bytes(snapshot, "little")
+    board = turn.board.scores
+    rules = board.rules
+    fields = bits >> TURN_OFFSET
+    if fields >> 30 & 31 != rules.code:
+        raise SnapshotError(f"the snapshot was not played by {rules.name} rules")
+    board.restore(
+        [bits >> MAX_CATEGORIES + SCORE_BITS * index & 63 for index in range(rules.num_categories)],
+        bits & (1 << rules.num_categories) - 1,
+        (fields & 15) * rules.yahtzee_bonus,
+    )
+    turn.turn_count = fields >> 4 & 15
+    turn.num_rolls = fields >> 8 & 3
+    dice = fields >> 15 & 0x7FFF
+    turn.roll_result = [dice >> 3 * position & 7 for position in range(turn.num_dice)] if dice else []
+    turn.kept_dice = {index for index in range(turn.num_dice) if fields >> 10 + index & 1}
+
+
+def pack_game(match):
+    """Expects a Game in progress. Returns the bytes of its save. Names longer than 255 bytes of UTF-8 are cut short on a
+    character boundary."""
+    data = bytearray(HEADER)
+    data += bytes((len(match.players), match.current, STATE_CODES[match.state]))
+    for player in match.players:
+        data += pack_player(player)
+        name = getattr(player, "name", "").encode()[:255].decode(errors="ignore").encode()
+        data.append(len(name))
+        data += name
+        opponent = getattr(player, "opponent", None)
+        data.append(0 if opponent is None else STRENGTH_CODES[opponent.strength])
+    return bytes(data)
+
+
+def unpack_game(data):
+    """Expects the bytes of a save. Returns its SavedGame. Raises SnapshotError if they are not a save of this version or
+    are corrupt."""
+    if data[: len(HEADER)] != HEADER or len(data) < len(HEADER) + 3:
+        raise SnapshotError(f"not a version {SNAPSHOT_VERSION} saved game")
+    count, current, state = data[len(HEADER) : len(HEADER) + 3]
+    if state not in STATES or not current < count:
+        raise SnapshotError("the saved game state is corrupt")
+    position = len(HEADER) + 3
+    names = []
+    players = []
+    strengths = []
+    for _ in range(count):
+        end = position + PLAYER_SIZE
+        if end >= len(data) or end + 2 + data[end] > len(data):
+            raise SnapshotError("the saved game is cut short")
+        players.append(data[position:end])
+        try:
+            names.append(data[end + 1 : end + 1 + data[end]].decode())
+        except UnicodeDecodeError:
+            raise SnapshotError("the saved game has a corrupt player name") from None
+        position = end + 1 + data[end]
+        if data[position] and data[position] not in CODE_STRENGTHS:
+            raise SnapshotError("the saved game has an unknown computer strength")
+        strengths.append(CODE_STRENGTHS.get(data[position]))
+        position += 1
+    try:
+        rules = snapshot_rules(players[0])
+    except ValueError as error:
+        raise SnapshotError(str(error)) from None
+    return SavedGame(rules, names, players, current, STATES[state], strengths)
+
+
+def write_atomic(path, data):
+    """Expects a path and bytes. Writes the bytes to a temporary file next to path and renames it over path."""
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(data)
+    os.replace(temporary, path)
+
+
+class Autosave:
+    """Keeps the save of a game in progress at path. listen attaches it to a Game, after which the game is saved at the start
+    of every turn and after every roll and hold, before the game's own listener hears of it, and the save is removed when
+    the game is over."""
+
+    def __init__(self, path=DEFAULT_AUTOSAVE_PATH):
+        """Expects the path of the save file."""
+        self.path = path
+        self.match = None
+
+    def listen(self, match):
+        """Expects a Game. Wraps its listener so the game is saved first."""
+        self.match = match
+        forward = match.listener
+        if forward is None:
+            match.listener = self.record
+            return
+
+        def listener(event, player, **details):
+            self.record(event, player, **details)
+            forward(event, player, **details)
+
+        match.listener = listener
+
+    def record(self, event, player, **details):
+        """Game listener. Saves the game on "turn started", "rolled" and "held" and clears the save on "game over"."""
+        if event == "game over":
+            self.clear()
+        elif event in ("turn started", "rolled", "held"):
+            write_atomic(self.path, pack_game(self.match))
+
+    def load(self):
+        """Returns the SavedGame at path, or None when there is none. A save that cannot be read is removed."""
+        try:
+            with open(self.path, "rb") as f:
+                return unpack_game(f.read())
+        except FileNotFoundError:
+            return None
+        except SnapshotError:
+            self.clear()
+            return None
+
+    def restore(self, saved, players):
+        """Expects a SavedGame and new TurnTakers for its players, in the same order, with boards of its rules. Restores each
+        player to its snapshot."""
+        for snapshot, player in zip(saved.players, players):
+            unpack_player(snapshot, player)
+
+    def clear(self):
+        """Removes the save."""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
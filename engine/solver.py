@@ -0,0 +1,322 @@
+"""Exact dynamic programming solver for optimal solitaire play.
+
+A state is the mask of filled categories, the upper section sum capped at 63 and whether the yahtzee category holds 50.
+The solver computes the expected score still to come from every one of the 2**13 * 64 * 2 states, working from full boards
+back to the empty one, and writes the values as float32 to a binary file behind a small versioned header. The file is
+opened with a read-only memory map, so loading is instant and every process reading it shares the same page cache pages.
+
+Every engine.rules variant has its own table, named after it, with 2**15 masks for the 15 categories of Yatzy. The header
+records the variant, so a table is never used for the wrong rules.
+
+Solve from the repository root with:
+    python -m engine.solver [--rules NAME] [--workers N] [--output PATH]
+"""
+
+import argparse
+import math
+import os
+import struct
+import sys
+import time
+from collections import namedtuple
+from multiprocessing import Pool
+
+import numpy as np
+
+from engine import table, transitions
+from engine.rules import NUM_UPPER, get_rules
+
+TABLE_VERSION = 2
+MAGIC = b"YAHTZEV\0"
+HEADER = struct.Struct("<8sIIII16s")
+HEADER_SIZE = 64
+DEFAULT_TABLE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "expected_values.bin"
+)
+
+# a kind of float32 table solved mask by mask: what it is called in errors, and the magic, version and struct of its header,
+# which packs the magic, the version, every dimension of the table and the rules name
+TableFormat = namedtuple("TableFormat", ["description", "magic", "version", "header"])
+VALUE_TABLE = TableFormat("an expected value table", MAGIC, TABLE_VERSION, HEADER)
+
+UPPER_STATES = 64
+NUM_MASKS = 1 << get_rules().num_categories
+SHAPE = (NUM_MASKS, UPPER_STATES, 2)
+FULL_MASK = NUM_MASKS - 1
+
+
+class StaleTableError(ValueError):
+    """Raised when a table file was written by a different TABLE_VERSION, for other rules or does not have the expected shape."""
+
+
+def shape(rules):
+    """Expects a Rules. Returns the (masks, 64, 2) shape of its value table."""
+    return (1 << rules.num_categories, UPPER_STATES, 2)
+
+
+def table_path(rules):
+    """Expects a Rules. Returns the default path of its value table, DEFAULT_TABLE_PATH for the default variant."""
+    if rules is get_rules():
+        return DEFAULT_TABLE_PATH
+    root, extension = os.path.splitext(DEFAULT_TABLE_PATH)
+    return f"{root}-{rules.name}{extension}"
+
+
+def board_state(score_board_dict, rules=None):
+    """Expects a ScoreKeeper score_board_dict and its Rules, the default variant when None. Returns the (mask, upper,
+    yahtzee_scored) state of the board, with bit i of mask set when the rules' category i has been scored.
+    A ScoreKeeper's Board gives the same state from board.scores.state()."""
+    rules = rules or get_rules()
+    mask = 0
+    for index, category in enumerate(rules.categories):
+        if score_board_dict[category] is not None:
+            mask |= 1 << index
+    upper = sum(score_board_dict[category] or 0 for category in rules.upper_categories)
+    return (
+        mask,
+        min(upper, rules.upper_bonus_threshold),
+        int(bool(rules.yahtzee_bonus and score_board_dict[rules.categories[rules.yahtzee]])),
+    )
+
+
+def score_matrix(scores):
+    """Expects a flat score table of a Rules. Returns it as a (252, categories) int64 array."""
+    return np.frombuffer(scores, dtype=np.uint8).reshape(len(table.ROLLS), -1).astype(np.int64)
+
+
+def _turn_arrays(rules=None):
+    """Expects a Rules, the default variant when None. Builds the NumPy views of its score tables and of the transition tables
+    used by every solve_mask call."""
+    rules = rules or get_rules()
+    scores = score_matrix(rules.scores)
+    transition = transitions.transition_matrix()
+    upper = np.arange(UPPER_STATES)[:, None]
+    threshold = rules.upper_bonus_threshold
+    upper_scores = {}
+    for category in range(NUM_UPPER):
+        raised = upper + scores[:, category]
+        upper_scores[category] = (
+            np.minimum(raised, threshold),
+            scores[:, category] + np.where((upper < threshold) & (raised >= threshold), rules.upper_bonus, 0),
+        )
+    return {
+        "rules": rules,
+        "scores": scores,
+        "joker_scores": None if rules.joker_scores is None else score_matrix(rules.joker_scores),
+        "transition_t": np.ascontiguousarray(transition.T),
+        "first_roll": transition[transitions.EMPTY_KEEP],
+        "subset_keeps": np.array(transitions.SUBSET_KEEPS),
+        "is_yahtzee": scores[:, rules.yahtzee] > 0,
+        "upper_scores": upper_scores,
+    }
+
+
+def forbidden_rolls(rules, mask):
+    """Expects a Rules and a mask. Returns a (categories, 252) array that is True where the joker rule forbids scoring the
+    roll in the category on a turn from the mask, or None when the joker rule does not apply."""
+    if not rules.joker or not mask >> rules.yahtzee & 1:
+        return None
+    forbidden = np.zeros((rules.num_categories, len(table.ROLLS)), dtype=bool)
+    for roll, face in rules.yahtzee_rolls:
+        forbidden[:, roll] = True
+        forbidden[rules.joker_categories(mask, face), roll] = False
+    return forbidden
+
+
+def mask_scores(mask, arrays):
+    """Expects a mask and the arrays from _turn_arrays. Returns the (252, categories) scores of the rolls for a turn from the
+    mask and the forbidden_rolls of the mask."""
+    forbidden = forbidden_rolls(arrays["rules"], mask)
+    if forbidden is None:
+        return arrays["scores"], None
+    return arrays["joker_scores"], forbidden
+
+
+def turn_values(mask, values, arrays):
+    """Expects a mask with at least one open category, the (masks, 64, 2) value table filled in for every mask with more
+    categories scored, and the arrays from _turn_arrays. Returns the (64, 2, 252) value of each final roll: the best category
+    score plus bonuses plus the expected value of the state it leads to."""
+    rules = arrays["rules"]
+    scores, forbidden = mask_scores(mask, arrays)
+    best = np.full((UPPER_STATES, 2, len(table.ROLLS)), -np.inf)
+    for category in range(rules.num_categories):
+        if mask >> category & 1:
+            continue
+        after = values[mask | 1 << category]
+        if category < NUM_UPPER:
+            raised, gained = arrays["upper_scores"][category]
+            total = gained[:, None, :] + after[raised].transpose(0, 2, 1)
+        elif category == rules.yahtzee:
+            scored = (scores[:, category] > 0) & bool(rules.yahtzee_bonus)
+            total = (scores[:, category] + after[:, scored.astype(np.int64)])[:, None, :]
+        else:
+            total = scores[:, category] + after[:, :, None]
+        if forbidden is not None:
+            total = np.where(forbidden[category], -np.inf, total)
+        np.maximum(best, total, out=best)
+    best[:, 1, arrays["is_yahtzee"]] += rules.yahtzee_bonus
+    return best
+
+
+def solve_mask(mask, values, arrays):
+    """Expects a mask, the value table and the arrays from _turn_arrays. Returns the (64, 2) expected score still to come
+    at the start of a turn for every upper sum and yahtzee state of the mask, playing the three rolls optimally."""
+    final = turn_values(mask, values, arrays).reshape(UPPER_STATES * 2, -1)
+    rolled = final
+    for _ in range(2):
+        keep_values = rolled @ arrays["transition_t"]
+        rolled = keep_values[:, arrays["subset_keeps"]].max(axis=2)
+    return (rolled @ arrays["first_roll"]).reshape(UPPER_STATES, 2)
+
+
+_worker = {}
+
+
+def _init_worker(path, table_shape, name, build_arrays, solve_mask):
+    """Pool initializer. Opens the table being solved for writing and builds the kernel's turn arrays of the named rules once
+    per worker process."""
+    _worker["table"] = np.memmap(path, dtype=np.float32, mode="r+", offset=HEADER_SIZE, shape=table_shape)
+    _worker["arrays"] = build_arrays(get_rules(name))
+    _worker["solve_mask"] = solve_mask
+
+
+def _solve_chunk(masks):
+    """Solves a chunk of masks of the same level in a worker and writes them into the shared table. Returns the chunk size."""
+    values = _worker["table"]
+    for mask in masks:
+        values[mask] = _worker["solve_mask"](mask, values, _worker["arrays"])
+    return len(masks)
+
+
+def write_header(path, table_format, table_shape, rules):
+    """Expects a path, a TableFormat, the shape of the table and the Rules it is solved for. Creates the table file at path
+    with the format's header and a zeroed float32 body."""
+    with open(path, "wb") as f:
+        f.write(
+            table_format.header.pack(table_format.magic, table_format.version, *table_shape, rules.name.encode()).ljust(
+                HEADER_SIZE, b"\0"
+            )
+        )
+        f.truncate(HEADER_SIZE + np.dtype(np.float32).itemsize * math.prod(table_shape))
+
+
+def open_table(path, table_format, table_shape, rules):
+    """Expects the path of a solved table, its TableFormat, the shape it should have and the Rules it should be solved for.
+    Checks the header and returns a read-only float32 memory map. Raises StaleTableError if the file was written by a
+    different version of the format, for other rules or has another shape."""
+    header_struct = table_format.header
+    with open(path, "rb") as f:
+        header = f.read(header_struct.size)
+    if len(header) < header_struct.size or header[: len(table_format.magic)] != table_format.magic:
+        raise StaleTableError(f"{path} is not {table_format.description}")
+    magic, version, *stored_shape, name = header_struct.unpack(header)
+    if version != table_format.version:
+        raise StaleTableError(f"{path} has version {version}, expected {table_format.version}")
+    name = name.rstrip(b"\0").decode()
+    if name != rules.name or tuple(stored_shape) != table_shape:
+        raise StaleTableError(f"{path} was solved for {name} rules, expected {rules.name}")
+    return np.memmap(path, dtype=np.float32, mode="r", offset=HEADER_SIZE, shape=table_shape)
+
+
+def print_progress(done, total, elapsed):
+    """Default progress callback. Prints the number of solved masks and the elapsed time on one updating line."""
+    sys.stderr.write(f"\rsolved {done}/{total} masks in {elapsed:.0f}s")
+    if done == total:
+        sys.stderr.write("\n")
+    sys.stderr.flush()
+
+
+def solve_levels(path, table_format, table_shape, rules, build_arrays, solve_mask, workers, progress, chunk_size):
+    """Expects an output path, a TableFormat, the (masks, ...) shape of the table, the Rules to solve, the kernel and the
+    solve options. The kernel is a picklable build_arrays(rules), called once per worker, and a solve_mask(mask, table,
+    arrays) returning the table entry of a mask from the entries of the masks with more categories scored. Solves every mask
+    level by level from the full board back, the masks of one level in parallel chunks, into a temporary file that replaces
+    path once complete."""
+    num_masks = table_shape[0]
+    temporary = f"{path}.{os.getpid()}.tmp"
+    write_header(temporary, table_format, table_shape, rules)
+    levels = [[] for _ in range(rules.num_categories + 1)]
+    for mask in range(num_masks):
+        levels[bin(mask).count("1")].append(mask)
+    start = time.perf_counter()
+    done = len(levels[-1])
+    try:
+        initargs = (temporary, table_shape, rules.name, build_arrays, solve_mask)
+        with Pool(workers or os.cpu_count(), _init_worker, initargs) as pool:
+            for level in reversed(levels[:-1]):
+                chunks = [level[i : i + chunk_size] for i in range(0, len(level), chunk_size)]
+                for solved in pool.imap_unordered(_solve_chunk, chunks):
+                    done += solved
+                    if progress:
+                        progress(done, num_masks, time.perf_counter() - start)
+        os.replace(temporary, path)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+
+
+def solve(path=None, workers=None, progress=print_progress, chunk_size=16, rules=None):
+    """Expects an output path (the rules' table_path when None), a worker count (every core when None), a progress callback
+    taking (done, total, elapsed seconds) and the Rules to solve, the default variant when None. Solves the table with
+    solve_levels. Returns the loaded table."""
+    rules = rules or get_rules()
+    path = path or table_path(rules)
+    solve_levels(path, VALUE_TABLE, shape(rules), rules, _turn_arrays, solve_mask, workers, progress, chunk_size)
+    return load_table(path, rules)
+
+
+def table_rules(path):
+    """Expects the path of a file. Returns the name of the rules its value table header records, None when the file is missing
+    or is not a value table."""
+    try:
+        with open(path, "rb") as f:
+            header = f.read(HEADER.size)
+    except FileNotFoundError:
+        return None
+    if len(header) < HEADER.size or header[: len(MAGIC)] != MAGIC:
+        return None
+    return HEADER.unpack(header)[-1].rstrip(b"\0").decode(errors="replace")
+
+
+def load_table(path=None, rules=None):
+    """Expects the path of a solved table (the rules' table_path when None) and the Rules it was solved for, the default
+    variant when None. Checks the header and returns a read-only (masks, 64, 2) float32 memory map. Raises StaleTableError if
+    the file was written by a different TABLE_VERSION, for other rules or has another shape."""
+    rules = rules or get_rules()
+    return open_table(path or table_path(rules), VALUE_TABLE, shape(rules), rules)
+
+
+def ensure_table(path=None, workers=None, progress=print_progress, rules=None):
+    """Returns the table of rules at path, solving it first when the file is missing or stale."""
+    try:
+        return load_table(path, rules)
+    except (FileNotFoundError, StaleTableError):
+        return solve(path, workers, progress, rules=rules)
+
+
+def expected_score(values, score_board_dict, rules=None):
+    """Expects a loaded table, a ScoreKeeper score_board_dict and the Rules the table was solved for, the default variant when
+    None. Returns the expected final score of the board with optimal play: the points already on the board plus the expected
+    points still to come."""
+    rules = rules or get_rules()
+    mask, upper, yahtzee_scored = board_state(score_board_dict, rules)
+    scored = sum(score_board_dict[category] or 0 for category in rules.categories)
+    scored += score_board_dict["yahtzee bonus"]
+    if upper >= rules.upper_bonus_threshold:
+        scored += rules.upper_bonus
+    return scored + float(values[mask, upper, yahtzee_scored])
+
+
+def main(argv=None):
+    """Command line entry point. Solves the table and prints the expected score of a new game."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rules", default=None, help="rules variant to solve, standard Yahtzee by default")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes, every core by default")
+    parser.add_argument("--output", default=None, help="table file to write, named after the rules by default")
+    args = parser.parse_args(argv)
+    values = solve(args.output, args.workers, rules=get_rules(args.rules))
+    print(f"expected score of a new game: {values[0, 0, 0]:.4f}")
+
+
+if __name__ == "__main__":
+    main()
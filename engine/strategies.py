@@ -0,0 +1,194 @@
+"""Strategies for headless play. A strategy chooses which dice to hold between rolls and which category to score at the end of a
+turn, given the same roll result, roll count and board that a player sees in the game window."""
+
+import random
+
+from engine import table
+
+
+class Strategy:
+    """Base class for strategies. start_game is called with the game's random.Random before the first turn so that strategies
+    making random choices stay reproducible per game."""
+
+    name = "strategy"
+
+    def __init__(self):
+        """Gives the strategy an unseeded random.Random until start_game is called."""
+        self.rng = random.Random()
+
+    def start_game(self, rng):
+        """Expects the random.Random of the game about to be played."""
+        self.rng = rng
+
+    def choose_keep(self, roll_result, num_rolls, board):
+        """Expects the current roll result, the rolls remaining and the board. Returns the set of roll_result indices to hold.
+        Holding all five dice ends the turn early."""
+        raise NotImplementedError
+
+    def choose_category(self, roll_result, board):
+        """Expects the final roll result and the board. Returns the name of an open category to score."""
+        raise NotImplementedError
+
+    def __repr__(self):
+        return f"{type(self).__name__}()"
+
+
+class RandomStrategy(Strategy):
+    """Holds a random subset of the dice and scores a random category the roll may be scored in."""
+
+    name = "random"
+
+    def choose_keep(self, roll_result, num_rolls, board):
+        """Returns a random subset of the roll_result indices."""
+        return {index for index in range(len(roll_result)) if self.rng.random() < 0.5}
+
+    def choose_category(self, roll_result, board):
+        """Returns a random playable category, one of the open ones the joker rule of the variant allows."""
+        return self.rng.choice(board.playable_categories(roll_result))
+
+
+class GreedyStrategy(Strategy):
+    """Scores whichever open category pays the most for the roll right now, and between rolls holds the dice of the most common
+    face, or every die when the roll already fills an open straight or full house."""
+
+    name = "greedy"
+    made_hands = ("large straight", "small straight", "full house", "yahtzee", "yatzy")
+
+    def choose_keep(self, roll_result, num_rolls, board):
+        """Returns every index when the roll already scores an open made hand, otherwise the indices of the most common face,
+        the higher face winning ties."""
+        open_categories = board.open_categories()
+        for category in self.made_hands:
+            if category in open_categories and board.rules.score(roll_result, category):
+                return set(range(len(roll_result)))
+        counts = table.face_counts(roll_result)
+        face = max(range(6, 0, -1), key=lambda face: counts[face - 1])
+        return {index for index, die in enumerate(roll_result) if die == face}
+
+    def choose_category(self, roll_result, board):
+        """Returns the playable category with the highest score for the roll, the first in board order winning ties."""
+        scores = board.rules.points(board.scores, roll_result)
+        return max(
+            board.playable_categories(roll_result),
+            key=lambda category: scores[board.rules.category_index[category]],
+        )
+
+
+class HeuristicStrategy(GreedyStrategy):
+    """Plays like a careful person would without tables: keeps four card straights while a straight is open, otherwise keeps the
+    most common face, and scores the category whose points beat its usual par by the most, counting the upper bonus when the
+    score reaches it. Rolls that score nothing are dumped into the category worth the least to give up."""
+
+    name = "heuristic"
+    par = {
+        "ones": 3,
+        "twos": 6,
+        "threes": 9,
+        "fours": 12,
+        "fives": 15,
+        "sixes": 18,
+        "three of a kind": 17,
+        "four of a kind": 10,
+        "full house": 18,
+        "small straight": 20,
+        "large straight": 22,
+        "yahtzee": 12,
+        "chance": 22,
+        "one pair": 9,
+        "two pairs": 15,
+        "yatzy": 12,
+    }
+    variant_par = {
+        "yatzy": {
+            "three of a kind": 10,
+            "four of a kind": 8,
+            "full house": 12,
+            "small straight": 8,
+            "large straight": 10,
+        },
+    }
+    runs = ((1, 2, 3, 4), (2, 3, 4, 5), (3, 4, 5, 6))
+
+    def choose_keep(self, roll_result, num_rolls, board):
+        """Returns every index when the roll already scores an open made hand, the indices of a run of four while a straight
+        is open, otherwise the indices of the most common face, preferring faces whose upper category is still open."""
+        open_categories = board.open_categories()
+        for category in self.made_hands:
+            if category in open_categories and board.rules.score(roll_result, category):
+                return set(range(len(roll_result)))
+        counts = table.face_counts(roll_result)
+        if max(counts) < 3 and (
+            "small straight" in open_categories or "large straight" in open_categories
+        ):
+            for run in reversed(self.runs):
+                if all(counts[face - 1] for face in run):
+                    return {roll_result.index(face) for face in run}
+        upper_open = [category in open_categories for category in board.rules.upper_categories]
+        face = max(
+            range(6, 0, -1),
+            key=lambda face: (counts[face - 1] + upper_open[face - 1] * 0.5, face),
+        )
+        return {index for index, die in enumerate(roll_result) if die == face}
+
+    def choose_category(self, roll_result, board):
+        """Returns the playable category with the most points over par, the first in board order winning ties. Categories
+        scored differently by the rules variant have their par from variant_par."""
+        rules = board.rules
+        scores = rules.points(board.scores, roll_result)
+        upper = board.scores.upper
+        par = {**self.par, **self.variant_par.get(rules.name, {})}
+
+        def value(category):
+            index = rules.category_index[category]
+            points = scores[index] - par[category]
+            if index < len(rules.upper_categories) and upper < rules.upper_bonus_threshold <= upper + scores[index]:
+                points += rules.upper_bonus
+            return points
+
+        return max(board.playable_categories(roll_result), key=value)
+
+
+class OptimalStrategy(Strategy):
+    """Plays the optimal solitaire strategy from the engine.solver value table, ranking holds and categories with a HoldOptimizer.
+    The table is loaded, or solved if missing, the first time a decision is needed, so the strategy pickles without it."""
+
+    name = "optimal"
+
+    def __init__(self, table_path=None):
+        """Expects the path of the value table, the rules variant's engine.solver.table_path when None. A table solved for other
+        rules than a game's is left alone and the game's rules use their own table_path."""
+        super().__init__()
+        self.table_path = table_path
+        self.optimizer = None
+
+    def get_optimizer(self, rules=None):
+        """Expects the Rules of the game, the default variant when None. Returns the HoldOptimizer for them, loading their
+        value table on first use."""
+        if self.optimizer is None or rules is not None and self.optimizer.rules is not rules:
+            from engine import solver
+            from engine.holds import HoldOptimizer
+            from engine.rules import get_rules
+
+            rules = rules or get_rules()
+            path = self.table_path
+            if path is None or solver.table_rules(path) not in (None, rules.name):
+                path = solver.table_path(rules)
+            self.optimizer = HoldOptimizer(solver.ensure_table(path, rules=rules), rules=rules)
+        return self.optimizer
+
+    def choose_keep(self, roll_result, num_rolls, board):
+        """Returns the hold with the highest expected final score."""
+        return self.get_optimizer(board.rules).best_hold(roll_result, num_rolls, board)
+
+    def choose_category(self, roll_result, board):
+        """Returns the playable category with the highest expected final score."""
+        return self.get_optimizer(board.rules).rank_categories(roll_result, board)[0][1]
+
+    def __getstate__(self):
+        return {**self.__dict__, "optimizer": None}
+
+
+STRATEGIES = {
+    strategy.name: strategy
+    for strategy in (RandomStrategy, GreedyStrategy, HeuristicStrategy, OptimalStrategy)
+}
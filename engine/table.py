@@ -0,0 +1,78 @@
+"""Score lookup table built once at import. There are only 252 distinct sorted five-dice outcomes, so every roll is reduced
+to a canonical index and the 13 category scores for that index are read from a flat bytes object."""
+
+from itertools import combinations_with_replacement
+
+from engine.categories import CATEGORIES
+
+CATEGORY_INDEX = {category: index for index, category in enumerate(CATEGORIES)}
+NUM_CATEGORIES = len(CATEGORIES)
+
+# Each face adds one to its own 3 bit counter, so the sum over a roll is a key that ignores dice order.
+_FACE_BITS = (0, 1, 1 << 3, 1 << 6, 1 << 9, 1 << 12, 1 << 15)
+
+ROLLS = tuple(combinations_with_replacement(range(1, 7), 5))
+
+
+def face_counts(roll):
+    """Expects a roll of dice faces. Returns a list of six counts, one per face."""
+    counts = [0] * 6
+    for die in roll:
+        counts[die - 1] += 1
+    return counts
+
+
+def category_scores(roll):
+    """Expects a roll of five dice faces. Returns a tuple with the score of the roll in each of the 13 categories, in CATEGORIES order."""
+    counts = face_counts(roll)
+    total = sum(roll)
+    faces = {face for face, count in enumerate(counts, start=1) if count}
+    most = max(counts)
+    return (
+        *(face * count for face, count in enumerate(counts, start=1)),
+        total if most >= 3 else 0,
+        total if most >= 4 else 0,
+        25 if sorted(counts)[-2:] == [2, 3] else 0,
+        30 if any({start, start + 1, start + 2, start + 3} <= faces for start in (1, 2, 3)) else 0,
+        40 if faces in ({1, 2, 3, 4, 5}, {2, 3, 4, 5, 6}) else 0,
+        50 if most == 5 else 0,
+        total,
+    )
+
+
+ROLL_INDEX = {
+    sum(_FACE_BITS[die] for die in roll): index for index, roll in enumerate(ROLLS)
+}
+_ROW_OFFSET = {key: index * NUM_CATEGORIES for key, index in ROLL_INDEX.items()}
+_CATEGORY_OFFSET = {**CATEGORY_INDEX, **{index: index for index in range(NUM_CATEGORIES)}}
+SCORES = bytes(score for roll in ROLLS for score in category_scores(roll))
+
+
+def face_key(dice):
+    """Expects up to five dice faces in any order. Returns an integer key that is the same for every ordering of the dice."""
+    return sum(map(_FACE_BITS.__getitem__, dice))
+
+
+def roll_index(roll):
+    """Expects a roll of five dice faces in any order. Returns the canonical index of the roll in ROLLS without modifying it."""
+    a, b, c, d, e = roll
+    return ROLL_INDEX[
+        _FACE_BITS[a] + _FACE_BITS[b] + _FACE_BITS[c] + _FACE_BITS[d] + _FACE_BITS[e]
+    ]
+
+
+def score(roll, category):
+    """Expects a roll of five dice faces in any order and a category name or index. Returns the score of the roll in that category."""
+    a, b, c, d, e = roll
+    return SCORES[
+        _ROW_OFFSET[
+            _FACE_BITS[a] + _FACE_BITS[b] + _FACE_BITS[c] + _FACE_BITS[d] + _FACE_BITS[e]
+        ]
+        + _CATEGORY_OFFSET[category]
+    ]
+
+
+def scores(roll):
+    """Expects a roll of five dice faces in any order. Returns the 13 category scores of the roll as a bytes slice."""
+    offset = roll_index(roll) * NUM_CATEGORIES
+    return SCORES[offset : offset + NUM_CATEGORIES]
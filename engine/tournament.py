@@ -0,0 +1,347 @@
+"""Tournaments between strategies playing head-to-head games on a process pool.
+
+Every match is one Game of two or more players taking turns with the same rules as the game window, each player driven by a
+registered strategy. Matches are scheduled round robin, every group of entrants meeting the same number of times, or Swiss,
+each round grouping entrants with similar standings. Every match is played with its own random.Random seeded from the
+tournament seed and the match number, so results do not depend on the worker count. Results are appended to a JSON lines file
+as they come in and a tournament started again with the same file picks up after the last recorded match.
+
+Ratings are fitted to every pairwise outcome with a Bradley-Terry model on the Elo scale, centred on 1500.
+
+Run from the repository root with:
+    python -m engine.tournament --entrants greedy random heuristic optimal --games 1000 [--format swiss --rounds 500]
+        [--seats 2] [--workers N] [--seed S] [--results tournament.jsonl]
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import time
+from itertools import combinations
+from multiprocessing import Pool
+
+from engine.game import Game
+from engine.scoreboard import ScoreKeeper
+from engine.simulate import play_turn
+from engine.strategies import STRATEGIES
+from engine.turn import TurnTaker
+
+FORMATS = ("round-robin", "swiss")
+ELO_SCALE = 400 / math.log(10)
+ELO_CENTRE = 1500
+
+
+def match_rng(seed, match):
+    """Expects the tournament seed and a match number. Returns the random.Random that match is played with."""
+    return random.Random(f"{seed}/{match}")
+
+
+def play_match(strategies, rng):
+    """Expects the strategies of the players in turn order and a random.Random. Plays one game between them, all rolls coming
+    from rng, and returns the final scores in the same order."""
+    players = [TurnTaker(ScoreKeeper(), rng) for _ in strategies]
+    seats = dict(zip(map(id, players), strategies))
+    for strategy in strategies:
+        strategy.start_game(rng)
+    match = Game(players)
+    match.start()
+    while match.state != Game.GAME_OVER:
+        play_turn(match, seats[id(match.current_player)])
+    return [player.board.scores.final_score() for player in players]
+
+
+_entrants = None
+
+
+def _init_worker(entrants):
+    """Pool initializer. Keeps the entrant strategies in the worker, so table backed strategies load their tables once."""
+    global _entrants
+    _entrants = entrants
+
+
+def _play_chunk(job):
+    """Plays a chunk of (match, round, names) in a worker. Returns their result records in match order."""
+    seed, chunk = job
+    return [
+        {
+            "match": match,
+            "round": round_number,
+            "players": list(names),
+            "scores": play_match([_entrants[name] for name in names], match_rng(seed, match)),
+        }
+        for match, round_number, names in chunk
+    ]
+
+
+def pairwise(names, scores):
+    """Expects the players of a match and their scores. Yields (winner, loser, draw) for every pair of players,
+    draw being True when they scored the same."""
+    for (first, first_score), (second, second_score) in combinations(zip(names, scores), 2):
+        if first_score >= second_score:
+            yield first, second, first_score == second_score
+        else:
+            yield second, first, False
+
+
+class Ratings:
+    """Pairwise win counts of a tournament and the Bradley-Terry ratings fitted to them.
+
+    Each pair of entrants starts with one virtual draw, which keeps an entrant that never wins or never loses at a finite
+    rating. The confidence interval of a rating is 1.96 standard errors from the diagonal of the Fisher information, so it
+    treats the other ratings as known."""
+
+    def __init__(self, names):
+        """Expects the entrant names."""
+        self.names = list(names)
+        self.wins = {(first, second): 0.0 for first in self.names for second in self.names if first != second}
+        self.points = dict.fromkeys(self.names, 0.0)
+        self.matches = dict.fromkeys(self.names, 0)
+
+    def add(self, record):
+        """Expects a match result record. Counts its pairwise wins, draws counting half to each side, and match points,
+        a player earning one point per opponent beaten shared out over the number of opponents."""
+        names, scores = record["players"], record["scores"]
+        share = 1 / max(len(names) - 1, 1)
+        for name in names:
+            self.matches[name] += 1
+        for winner, loser, draw in pairwise(names, scores):
+            if draw:
+                self.wins[winner, loser] += 0.5
+                self.wins[loser, winner] += 0.5
+                self.points[winner] += share / 2
+                self.points[loser] += share / 2
+            else:
+                self.wins[winner, loser] += 1
+                self.points[winner] += share
+
+    def standings(self):
+        """Returns the entrant names by match points, best first, ties in name order."""
+        return sorted(self.names, key=lambda name: (-self.points[name], name))
+
+    def fit(self, tolerance=1e-10, max_iterations=10000):
+        """Fits the Bradley-Terry strengths with Hunter's MM iteration. Returns a list of (name, rating, interval, matches)
+        for every entrant, best first, rating and interval on the Elo scale."""
+        games = {
+            pair: self.wins[pair] + self.wins[pair[::-1]] + 1 for pair in self.wins
+        }
+        won = {
+            name: sum(self.wins[name, other] + 0.5 for other in self.names if other != name)
+            for name in self.names
+        }
+        strength = dict.fromkeys(self.names, 1.0)
+        for _ in range(max_iterations):
+            updated = {
+                name: won[name]
+                / sum(
+                    games[name, other] / (strength[name] + strength[other])
+                    for other in self.names
+                    if other != name
+                )
+                for name in self.names
+            }
+            centre = math.exp(sum(map(math.log, updated.values())) / len(updated))
+            updated = {name: value / centre for name, value in updated.items()}
+            change = max(abs(math.log(updated[name] / strength[name])) for name in self.names)
+            strength = updated
+            if change < tolerance:
+                break
+        table = []
+        for name in self.names:
+            information = sum(
+                games[name, other]
+                * strength[name]
+                * strength[other]
+                / (strength[name] + strength[other]) ** 2
+                for other in self.names
+                if other != name
+            )
+            table.append(
+                (
+                    name,
+                    ELO_CENTRE + ELO_SCALE * math.log(strength[name]),
+                    1.96 * ELO_SCALE / math.sqrt(information) if information else math.inf,
+                    self.matches[name],
+                )
+            )
+        table.sort(key=lambda row: -row[1])
+        return table
+
+
+class Tournament:
+    """A tournament between registered strategies. Register entrants by name, then run it to play every scheduled match,
+    skipping the ones already in the results file.
+
+    A round robin plays every group of seats entrants games times, rotating who goes first. A Swiss tournament plays rounds
+    rounds, each grouping the entrants seats at a time in order of standing and playing games matches at every table;
+    when the entrants do not divide into the tables the ones with the most matches, lowest placed first, sit the round out."""
+
+    def __init__(self, seed=0, tournament_format="round-robin", seats=2, games=1, rounds=1, results_path=None):
+        """Expects the seed, the format, the players per match, the matches per group (per table per round for Swiss),
+        the Swiss round count and the path of the results file, None to keep results in memory only."""
+        if tournament_format not in FORMATS:
+            raise ValueError(f"unknown tournament format {tournament_format!r}")
+        if seats < 2:
+            raise ValueError("a match needs at least two players")
+        self.seed = seed
+        self.format = tournament_format
+        self.seats = seats
+        self.games = games
+        self.rounds = rounds
+        self.results_path = results_path
+        self.entrants = {}
+        self.results = []
+
+    def register(self, name, strategy):
+        """Expects a unique entrant name and the Strategy that plays for it."""
+        if name in self.entrants:
+            raise ValueError(f"{name!r} is already registered")
+        self.entrants[name] = strategy
+
+    def settings(self):
+        """Returns the settings a results file is checked against before it is resumed."""
+        return {
+            "seed": self.seed,
+            "format": self.format,
+            "seats": self.seats,
+            "games": self.games,
+            "rounds": self.rounds,
+            "entrants": sorted(self.entrants),
+        }
+
+    def load_results(self):
+        """Reads the results file, if there is one, into self.results and truncates a partly written last line.
+        Raises ValueError if the file was written by a tournament with different settings."""
+        self.results = []
+        if not self.results_path or not os.path.exists(self.results_path):
+            return
+        with open(self.results_path, "rb+") as results_file:
+            header = results_file.readline()
+            if json.loads(header) != self.settings():
+                raise ValueError(f"{self.results_path} holds a tournament with different settings")
+            good = results_file.tell()
+            for line in results_file:
+                if not line.endswith(b"\n"):
+                    break
+                self.results.append(json.loads(line))
+                good += len(line)
+            results_file.truncate(good)
+
+    def schedule_round(self, round_number, ratings):
+        """Expects a round number and the Ratings so far. Returns the seat orders of the round's matches."""
+        names = sorted(self.entrants)
+        if self.format == "round-robin":
+            groups = list(combinations(names, self.seats))
+            return [
+                group[game % self.seats :] + group[: game % self.seats]
+                for game in range(self.games)
+                for group in groups
+            ]
+        standings = ratings.standings()
+        sitting_out = len(standings) % self.seats
+        if sitting_out:
+            byes = sorted(
+                reversed(standings), key=lambda name: -ratings.matches[name]
+            )[:sitting_out]
+            standings = [name for name in standings if name not in byes]
+        tables = [
+            tuple(standings[start : start + self.seats])
+            for start in range(0, len(standings) - self.seats + 1, self.seats)
+        ]
+        return [
+            table[(round_number + game) % self.seats :] + table[: (round_number + game) % self.seats]
+            for table in tables
+            for game in range(self.games)
+        ]
+
+    def run(self, workers=None, chunk_size=50, progress=None):
+        """Plays every match not already recorded across workers processes, every core when None, appending each result to
+        the results file in match order. Calls progress(done, ratings) after every chunk when given. Returns the Ratings."""
+        if len(self.entrants) < self.seats:
+            raise ValueError(f"{self.seats} seat matches need at least {self.seats} entrants")
+        self.load_results()
+        ratings = Ratings(sorted(self.entrants))
+        workers = workers or os.cpu_count()
+        results_file = None
+        if self.results_path:
+            new_file = not os.path.exists(self.results_path)
+            results_file = open(self.results_path, "a")
+            if new_file:
+                results_file.write(json.dumps(self.settings()) + "\n")
+        pool = Pool(workers, _init_worker, (self.entrants,)) if workers > 1 else None
+        if pool is None:
+            _init_worker(self.entrants)
+        try:
+            match = 0
+            round_count = 1 if self.format == "round-robin" else self.rounds
+            for round_number in range(round_count):
+                matches = [
+                    (number, round_number, names)
+                    for number, names in enumerate(self.schedule_round(round_number, ratings), start=match)
+                ]
+                match += len(matches)
+                for record in self.results[matches[0][0] : match] if matches else ():
+                    ratings.add(record)
+                pending = [entry for entry in matches if entry[0] >= len(self.results)]
+                jobs = (
+                    (self.seed, pending[start : start + chunk_size])
+                    for start in range(0, len(pending), chunk_size)
+                )
+                chunks = pool.imap(_play_chunk, jobs) if pool else map(_play_chunk, jobs)
+                for records in chunks:
+                    for record in records:
+                        ratings.add(record)
+                        self.results.append(record)
+                        if results_file:
+                            results_file.write(json.dumps(record) + "\n")
+                    if results_file:
+                        results_file.flush()
+                    if progress:
+                        progress(len(self.results), ratings)
+        finally:
+            if pool:
+                pool.close()
+                pool.join()
+            if results_file:
+                results_file.close()
+        return ratings
+
+
+def format_ratings(ratings):
+    """Expects Ratings. Returns the fitted ratings as a table of lines, best first."""
+    lines = [f"{'entrant':<12}{'rating':>8}{'95% ci':>10}{'matches':>9}{'points':>9}"]
+    for name, rating, interval, matches in ratings.fit():
+        lines.append(f"{name:<12}{rating:8.0f}{'±':>4}{interval:<6.0f}{matches:9d}{ratings.points[name]:9.1f}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    """Command line entry point. Registers the named strategies, runs the tournament and prints the ratings."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--entrants", nargs="+", choices=sorted(STRATEGIES), default=["greedy", "heuristic", "random"])
+    parser.add_argument("--format", choices=FORMATS, default="round-robin")
+    parser.add_argument("--seats", type=int, default=2, help="players per match")
+    parser.add_argument("--games", type=int, default=100, help="matches per group, or per table each Swiss round")
+    parser.add_argument("--rounds", type=int, default=10, help="rounds of a Swiss tournament")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes, every core by default")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--results", default=None, help="JSON lines file to record results in and resume from")
+    args = parser.parse_args(argv)
+    tournament = Tournament(args.seed, args.format, args.seats, args.games, args.rounds, args.results)
+    for name in args.entrants:
+        tournament.register(name, STRATEGIES[name]())
+    tournament.load_results()
+    resumed = len(tournament.results)
+    start = time.perf_counter()
+    ratings = tournament.run(
+        args.workers, progress=lambda done, ratings: print(f"\r{done} matches", end="", flush=True)
+    )
+    elapsed = time.perf_counter() - start
+    played = len(tournament.results) - resumed
+    print(f"\r{len(tournament.results)} matches, {played} played in {elapsed:.1f}s")
+    print(format_ratings(ratings))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""Opt-in timing of the phases of a turn. Nothing is wrapped unless tracing is enabled, so when it is off the game runs the
+same code as without this module. Enable it by setting YAHTZEE_TRACE, to the path of the trace file or to 1 for
+DEFAULT_TRACE_PATH, or by starting the game with --trace or --trace=PATH.
+
+Once enabled, instrument replaces a method with a wrapper that times every call. Each call is recorded as a span carrying the
+turn it happened in, counted from Game.begin_turn. On finish, or at interpreter exit, the spans are written as a Chrome trace
+(open it in chrome://tracing or https://ui.perfetto.dev) and a summary of the phases is printed, slowest in total first.
+"""
+
+import atexit
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import types
+
+ENV_VAR = "YAHTZEE_TRACE"
+DEFAULT_TRACE_PATH = "yahtzee-trace.json"
+MAX_EVENTS = 1_000_000
+
+_tracer = None
+
+
+class Tracer:
+    """Collects spans and per-phase totals. Spans past MAX_EVENTS are only counted in the totals, so a kiosk left tracing for
+    days keeps bounded memory."""
+
+    def __init__(self, path):
+        """Expects the path the Chrome trace is written to."""
+        self.path = path
+        self.start = time.perf_counter_ns()
+        self.events = []
+        self.stats = {}
+        self.turn = 0
+        self.pid = os.getpid()
+        self.finished = False
+
+    def record(self, phase, began, ended):
+        """Expects a phase name and the perf_counter_ns at which a call began and ended. Records the span."""
+        duration = ended - began
+        stats = self.stats.get(phase)
+        if stats is None:
+            self.stats[phase] = [1, duration, duration]
+        else:
+            stats[0] += 1
+            stats[1] += duration
+            if duration > stats[2]:
+                stats[2] = duration
+        if len(self.events) < MAX_EVENTS:
+            self.events.append((phase, began, duration, self.turn, threading.get_ident()))
+
+    def wrap(self, function, phase):
+        """Returns function wrapped to record a span named phase for every call."""
+        clock = time.perf_counter_ns
+        record = self.record
+
+        @functools.wraps(function)
+        def traced(*args, **kwargs):
+            began = clock()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                record(phase, began, clock())
+
+        traced.__traced__ = function
+        return traced
+
+    def chrome_trace(self):
+        """Returns the spans as a Chrome trace event dict, timestamps in microseconds from when tracing was enabled."""
+        return {
+            "traceEvents": [
+                {
+                    "name": phase,
+                    "cat": phase.split(".")[0],
+                    "ph": "X",
+                    "ts": (began - self.start) / 1000,
+                    "dur": duration / 1000,
+                    "pid": self.pid,
+                    "tid": thread,
+                    "args": {"turn": turn},
+                }
+                for phase, began, duration, turn, thread in self.events
+            ],
+            "displayTimeUnit": "ms",
+        }
+
+    def summary(self):
+        """Returns a table of every phase with its call count, total, mean and slowest call, slowest in total first."""
+        lines = [f"{'phase':<48}{'calls':>8}{'total ms':>11}{'mean ms':>10}{'max ms':>10}"]
+        for phase, (calls, total, slowest) in sorted(self.stats.items(), key=lambda item: -item[1][1]):
+            lines.append(f"{phase:<48}{calls:8d}{total / 1e6:11.2f}{total / calls / 1e6:10.3f}{slowest / 1e6:10.2f}")
+        return "\n".join(lines)
+
+    def finish(self):
+        """Writes the Chrome trace and prints the summary to stderr. Only the first call does anything."""
+        if self.finished:
+            return
+        self.finished = True
+        with open(self.path, "w") as trace_file:
+            json.dump(self.chrome_trace(), trace_file)
+        print(f"trace of {len(self.events)} spans written to {self.path}", file=sys.stderr)
+        print(self.summary(), file=sys.stderr)
+
+
+def enable(path=DEFAULT_TRACE_PATH):
+    """Turns tracing on, writing the trace to path at exit, and starts counting turns. Returns the Tracer."""
+    global _tracer
+    if _tracer is None:
+        from engine.game import Game
+
+        _tracer = Tracer(path)
+        atexit.register(_tracer.finish)
+        begin_turn = Game.begin_turn
+
+        def counted_begin_turn(game):
+            _tracer.turn += 1
+            return begin_turn(game)
+
+        Game.begin_turn = counted_begin_turn
+    return _tracer
+
+
+def enabled():
+    """Returns True if tracing is on."""
+    return _tracer is not None
+
+
+def configure(argv=None, environ=None):
+    """Turns tracing on if the YAHTZEE_TRACE environment variable is set or argv holds --trace or --trace=PATH,
+    removing the flag from argv. Returns True if tracing is on."""
+    argv = sys.argv if argv is None else argv
+    environ = os.environ if environ is None else environ
+    path = None
+    for argument in list(argv[1:]):
+        if argument == "--trace" or argument.startswith("--trace="):
+            path = argument.partition("=")[2] or DEFAULT_TRACE_PATH
+            argv.remove(argument)
+    if path is None and environ.get(ENV_VAR):
+        value = environ[ENV_VAR]
+        path = DEFAULT_TRACE_PATH if value == "1" else value
+    if path is not None:
+        enable(path)
+    return enabled()
+
+
+def instrument(owner, attribute, phase=None):
+    """Expects a class or module and the name of a function on it. When tracing is on, replaces the function with one that
+    records a span named phase for every call, by default the module and class the function is looked up on followed by
+    attribute. Does nothing when tracing is off."""
+    if _tracer is None:
+        return
+    function = getattr(owner, attribute)
+    if hasattr(function, "__traced__"):
+        return
+    if phase is None:
+        prefix = owner.__name__ if isinstance(owner, types.ModuleType) else f"{owner.__module__}.{owner.__qualname__}"
+        phase = f"{prefix}.{attribute}"
+    setattr(owner, attribute, _tracer.wrap(function, phase))
+
+
+def instrument_engine():
+    """Instruments the turn phases of the headless engine: rolling, holding, scoring and the end of game totals."""
+    from engine.game import Game
+    from engine.scoreboard import ScoreKeeper
+    from engine.scoring import Scorer
+    from engine.turn import TurnTaker
+
+    instrument(TurnTaker, "roll")
+    instrument(Scorer, "score_roll")
+    instrument(Game, "roll")
+    instrument(Game, "hold")
+    instrument(Game, "score")
+    instrument(ScoreKeeper, "end_of_game_score")
+
+
+def finish():
+    """Writes the trace and summary now rather than at exit, for exits that skip atexit handlers. Does nothing when tracing is off."""
+    if _tracer is not None:
+        _tracer.finish()
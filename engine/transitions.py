@@ -0,0 +1,66 @@
+"""Reroll transition tables. A hold is the multiset of dice kept before a reroll, there are 462 of them from no dice to all five.
+Each hold maps to the sparse distribution of sorted five-dice rolls it can lead to, and each of the 252 rolls lists the hold
+reached by each of its 32 keep subsets. Built once at import of this module, the engine package does not import it on its own.
+transition_matrix gives the same distributions as one dense NumPy matrix, built on first use and shared by every caller."""
+
+from functools import lru_cache
+from itertools import combinations_with_replacement
+from math import factorial
+
+import numpy as np
+
+from engine.table import ROLLS, ROLL_INDEX, face_key, face_counts
+
+KEEPS = tuple(
+    keep for size in range(6) for keep in combinations_with_replacement(range(1, 7), size)
+)
+KEEP_INDEX = {face_key(keep): index for index, keep in enumerate(KEEPS)}
+EMPTY_KEEP = KEEP_INDEX[0]
+
+
+def keep_index(dice):
+    """Expects up to five held dice faces in any order. Returns the index of the hold in KEEPS."""
+    return KEEP_INDEX[face_key(dice)]
+
+
+def _outcome_probability(rerolled):
+    """Expects the sorted faces of the rerolled dice. Returns the probability of rolling exactly that multiset."""
+    ways = factorial(len(rerolled))
+    for count in face_counts(rerolled):
+        ways //= factorial(count)
+    return ways / 6 ** len(rerolled)
+
+
+def _outcomes(keep):
+    """Expects a hold. Returns a tuple of (roll index, probability) pairs for every roll reachable by rerolling the other dice."""
+    return tuple(
+        (ROLL_INDEX[face_key(keep + rerolled)], _outcome_probability(rerolled))
+        for rerolled in combinations_with_replacement(range(1, 7), 5 - len(keep))
+    )
+
+
+OUTCOMES = tuple(_outcomes(keep) for keep in KEEPS)
+
+
+def _subset_keeps(roll):
+    """Expects a sorted roll. Returns the hold index for each of the 32 subsets of its positions, subset bit i holding die i."""
+    return tuple(
+        keep_index([die for position, die in enumerate(roll) if subset >> position & 1])
+        for subset in range(32)
+    )
+
+
+SUBSET_KEEPS = tuple(_subset_keeps(roll) for roll in ROLLS)
+ROLL_KEEPS = tuple(tuple(sorted(set(keeps))) for keeps in SUBSET_KEEPS)
+
+
+@lru_cache(maxsize=None)
+def transition_matrix():
+    """Returns the dense, read-only (462, 252) matrix of the probability of each sorted roll after rerolling around each hold,
+    the OUTCOMES of hold i in row i."""
+    transition = np.zeros((len(KEEPS), len(ROLLS)))
+    for keep, outcomes in enumerate(OUTCOMES):
+        for roll, probability in outcomes:
+            transition[keep, roll] = probability
+    transition.setflags(write=False)
+    return transition
@@ -0,0 +1,62 @@
+import random
+
+from engine.dice import as_dice
+from engine.scoring import Scorer
+
+
+class TurnTaker:
+    """Class for the rules of a turn per instance of player. Keeps the roll count, the current roll result and the dice chosen to keep
+    and passes the final roll to Scorer. Has no knowledge of how the dice or scores are displayed."""
+
+    scorer_class = Scorer
+
+    def __init__(self, board, dice=random):
+        """Expects a ScoreKeeper board and optionally an engine.dice DiceSource or a random.Random to roll with, the shared
+        random module by default.
+        Gives the turn class the number of rolls, dice and turns to start with.
+        Also gives an empty list for the roll result and an empty set for the dice chosen to keep."""
+        self.num_dice = 5
+        self.num_rolls = 3
+        self.roll_result = []
+        self.kept_dice = set()
+        self.turn_count = 0
+        self.board = board
+        self.dice = as_dice(dice)
+
+    def can_roll(self):
+        """Returns True while the current turn has rolls remaining."""
+        return self.num_rolls > 0
+
+    def roll(self):
+        """Rolls every die that is not in kept_dice. Kept dice are moved to the front of the roll result in index order,
+        the kept_dice set is cleared and the number of rolls is decremented. Returns the new roll result."""
+        if self.num_rolls > 0:
+            chosen_dice = [self.roll_result[index] for index in sorted(self.kept_dice)]
+            self.roll_result = chosen_dice + self.dice.roll(self.num_dice - len(chosen_dice))
+            self.kept_dice.clear()
+            self.num_rolls -= 1
+        return self.roll_result
+
+    def keepers(self, index):
+        """Expects an index. Keeps track of actively held dice.
+        ie: if users highlight then de-highlight a die, the kept_dice is accurate to only highlighted die.
+        Returns True if the die is held after the call."""
+        if index in self.kept_dice:
+            self.kept_dice.remove(index)
+            return False
+        self.kept_dice.add(index)
+        return True
+
+    def score_category(self, category):
+        """Expects a category name. Scores the current roll result into the board with Scorer and ends the turn.
+        Returns the score written to the board."""
+        score = self.scorer_class(self.roll_result, self.board).score_roll(category)
+        self.end_of_turn()
+        return score
+
+    def end_of_turn(self):
+        """Increments the turn counter. Then resets kept dice, roll count and roll result for the next turn."""
+        self.turn_count += 1
+        self.num_rolls = 3
+        self.roll_result = []
+        self.kept_dice.clear()
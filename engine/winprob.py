@@ -0,0 +1,356 @@
+"""Win probabilities of two player games in progress.
+
+Each player's final score is the points on their board plus the score still to come, which depends only on their own board
+state and, during their turn, on the dice. The score still to come is taken to be played with the optimal solitaire strategy
+of engine.solver, so the two players are independent and the chance of one beating the other follows from the two
+distributions.
+
+The distribution of the score to come from every state is summarised by its mean and variance, computed once for all
+2**13 * 64 * 2 states by the same backwards induction as engine.solver, carrying second moments alongside the expected values.
+They are written to a binary file opened with a read-only memory map, so every process shares them and a lookup is free.
+Once a player has EXACT_OPEN categories or fewer left, the exact distribution is worked out instead by following the strategy
+through every final roll of every remaining turn, and two exact distributions are compared exactly. Otherwise the totals are
+compared as normal distributions with the cached moments.
+
+Like the value tables, every engine.rules variant has its own moments table, named after it.
+
+Solve from the repository root with:
+    python -m engine.winprob [--rules NAME] [--workers N] [--output PATH]
+"""
+
+import argparse
+import math
+import os
+import struct
+from functools import lru_cache
+
+import numpy as np
+
+from engine import table, transitions
+from engine.rules import NUM_UPPER, get_rules
+from engine.solver import (
+    UPPER_STATES,
+    StaleTableError,
+    TableFormat,
+    forbidden_rolls,
+    open_table,
+    print_progress,
+    score_matrix,
+    solve_levels,
+)
+
+MOMENTS_VERSION = 2
+MAGIC = b"YAHTZMO\0"
+HEADER = struct.Struct("<8sIIIII16s")
+MOMENTS_TABLE = TableFormat("a score moments table", MAGIC, MOMENTS_VERSION, HEADER)
+DEFAULT_MOMENTS_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "score_moments.bin"
+)
+EXACT_OPEN = 2
+
+
+def shape(rules):
+    """Expects a Rules. Returns the (masks, 64, 2, 2) shape of its moments table."""
+    return (1 << rules.num_categories, UPPER_STATES, 2, 2)
+
+
+def moments_path(rules):
+    """Expects a Rules. Returns the default path of its moments table, DEFAULT_MOMENTS_PATH for the default variant."""
+    if rules is get_rules():
+        return DEFAULT_MOMENTS_PATH
+    root, extension = os.path.splitext(DEFAULT_MOMENTS_PATH)
+    return f"{root}-{rules.name}{extension}"
+
+
+def _category_outcomes(rules, scores):
+    """Expects a Rules and a (252, categories) score matrix of it. Returns, for each category, the (64, 2, 252) points gained
+    by scoring each roll there from each upper sum and yahtzee state, bonuses included, and the upper sum and yahtzee state
+    it leads to."""
+    shape = (UPPER_STATES, 2, len(table.ROLLS))
+    threshold = rules.upper_bonus_threshold
+    upper = np.arange(UPPER_STATES)[:, None, None]
+    yahtzee_scored = np.arange(2)[None, :, None]
+    bonus = np.where((yahtzee_scored == 1) & (scores[:, rules.yahtzee] > 0), rules.yahtzee_bonus, 0)
+    outcomes = []
+    for category in range(rules.num_categories):
+        points = scores[:, category][None, None, :]
+        next_upper, next_yahtzee = upper, yahtzee_scored
+        gained = points + bonus
+        if category < NUM_UPPER:
+            next_upper = np.minimum(upper + points, threshold)
+            gained = gained + np.where((upper < threshold) & (next_upper >= threshold), rules.upper_bonus, 0)
+        elif category == rules.yahtzee and rules.yahtzee_bonus:
+            next_yahtzee = (points > 0).astype(np.int64)
+        outcomes.append(
+            (
+                np.broadcast_to(gained, shape),
+                np.broadcast_to(next_upper, shape),
+                np.broadcast_to(next_yahtzee, shape),
+            )
+        )
+    return outcomes
+
+
+def _turn_arrays(rules=None):
+    """Expects a Rules, the default variant when None. Builds the arrays shared by every mask: the dense reroll transitions
+    and the _category_outcomes of its scores and, with a joker rule, of its joker scores."""
+    rules = rules or get_rules()
+    transition = transitions.transition_matrix()
+    return {
+        "rules": rules,
+        "transition": transition,
+        "transition_t": np.ascontiguousarray(transition.T),
+        "subset_keeps": np.array(transitions.SUBSET_KEEPS),
+        "outcomes": _category_outcomes(rules, score_matrix(rules.scores)),
+        "joker_outcomes": rules.joker and _category_outcomes(rules, score_matrix(rules.joker_scores)),
+    }
+
+
+def mask_outcomes(mask, arrays):
+    """Expects a mask and the arrays from _turn_arrays. Returns the category outcomes for a turn from the mask and its
+    engine.solver.forbidden_rolls."""
+    forbidden = forbidden_rolls(arrays["rules"], mask)
+    if forbidden is None:
+        return arrays["outcomes"], None
+    return arrays["joker_outcomes"], forbidden
+
+
+def solve_mask(mask, moments, arrays):
+    """Expects a mask with at least one open category, the (masks, 64, 2, 2) table of mean and variance filled in for
+    every mask with more categories scored, and the arrays from _turn_arrays. Returns the (64, 2, 2) mean and variance of
+    the score still to come at the start of a turn, playing the three rolls for the highest expected score."""
+    outcomes, forbidden = mask_outcomes(mask, arrays)
+    best_mean = np.full((UPPER_STATES, 2, len(table.ROLLS)), -np.inf)
+    best_square = np.zeros_like(best_mean)
+    for category in range(arrays["rules"].num_categories):
+        if mask >> category & 1:
+            continue
+        after = moments[mask | 1 << category].astype(np.float64)
+        gained, next_upper, next_yahtzee = outcomes[category]
+        after_mean = after[next_upper, next_yahtzee, 0]
+        after_square = after[next_upper, next_yahtzee, 1] + after_mean * after_mean
+        mean = gained + after_mean
+        if forbidden is not None:
+            mean = np.where(forbidden[category], -np.inf, mean)
+        better = mean > best_mean
+        best_mean = np.where(better, mean, best_mean)
+        best_square = np.where(better, gained * gained + 2 * gained * after_mean + after_square, best_square)
+    rolled_mean = best_mean.reshape(UPPER_STATES * 2, -1)
+    rolled_square = best_square.reshape(UPPER_STATES * 2, -1)
+    subset_keeps = arrays["subset_keeps"]
+    rolls = np.arange(len(table.ROLLS))
+    for _ in range(2):
+        keep_mean, keep_square = np.split(np.vstack([rolled_mean, rolled_square]) @ arrays["transition_t"], 2)
+        chosen = subset_keeps[rolls, keep_mean[:, subset_keeps].argmax(axis=2)]
+        rolled_mean = np.take_along_axis(keep_mean, chosen, axis=1)
+        rolled_square = np.take_along_axis(keep_square, chosen, axis=1)
+    first_roll = arrays["transition"][transitions.EMPTY_KEEP]
+    mean = rolled_mean @ first_roll
+    variance = np.maximum(rolled_square @ first_roll - mean * mean, 0)
+    return np.stack([mean, variance], axis=1).reshape(UPPER_STATES, 2, 2)
+
+
+def solve(path=None, workers=None, progress=print_progress, chunk_size=16, rules=None):
+    """Expects an output path (the rules' moments_path when None), a worker count (every core when None), a progress callback
+    taking (done, total, elapsed seconds) and the Rules to solve, the default variant when None. Solves the table with
+    engine.solver.solve_levels. Returns the loaded table."""
+    rules = rules or get_rules()
+    path = path or moments_path(rules)
+    solve_levels(path, MOMENTS_TABLE, shape(rules), rules, _turn_arrays, solve_mask, workers, progress, chunk_size)
+    return load_moments(path, rules)
+
+
+def load_moments(path=None, rules=None):
+    """Expects the path of a solved table (the rules' moments_path when None) and the Rules it was solved for, the default
+    variant when None. Checks the header and returns a read-only (masks, 64, 2, 2) float32 memory map of the mean and
+    variance of the score to come. Raises StaleTableError if the file was written by a different MOMENTS_VERSION, for other
+    rules or has another shape."""
+    rules = rules or get_rules()
+    return open_table(path or moments_path(rules), MOMENTS_TABLE, shape(rules), rules)
+
+
+def ensure_moments(path=None, workers=None, progress=print_progress, rules=None):
+    """Returns the moments table of rules at path, solving it first when the file is missing or stale."""
+    try:
+        return load_moments(path, rules)
+    except (FileNotFoundError, StaleTableError):
+        return solve(path, workers, progress, rules=rules)
+
+
+class ScoreDistribution:
+    """Distribution of a score. Always has a mean and variance, and the probability of every score from 0 up in pmf when it
+    is known exactly."""
+
+    __slots__ = ("mean", "variance", "pmf")
+
+    def __init__(self, mean, variance, pmf=None):
+        """Expects the mean, the variance and optionally the exact probabilities of the scores 0, 1, 2 and so on."""
+        self.mean = mean
+        self.variance = variance
+        self.pmf = pmf
+
+    @classmethod
+    def exactly(cls, pmf):
+        """Expects the probabilities of the scores 0, 1, 2 and so on. Returns the exact distribution."""
+        points = np.arange(len(pmf))
+        mean = float(pmf @ points)
+        return cls(mean, max(float(pmf @ (points * points)) - mean * mean, 0.0), pmf)
+
+    @classmethod
+    def mixture(cls, components):
+        """Expects (probability, points, ScoreDistribution) triples whose probabilities add up to one. Returns the distribution
+        of points plus a score drawn from the distribution of the chosen component, exact when every component is."""
+        if all(distribution.pmf is not None for _, _, distribution in components):
+            pmf = np.zeros(max(points + len(distribution.pmf) for _, points, distribution in components))
+            for probability, points, distribution in components:
+                pmf[points : points + len(distribution.pmf)] += probability * distribution.pmf
+            return cls.exactly(pmf)
+        mean = sum(probability * (points + distribution.mean) for probability, points, distribution in components)
+        square = sum(
+            probability * (distribution.variance + (points + distribution.mean) ** 2)
+            for probability, points, distribution in components
+        )
+        return cls(mean, max(square - mean * mean, 0.0))
+
+    def shifted(self, points):
+        """Returns the distribution of points plus a score from this distribution."""
+        if self.pmf is None:
+            return ScoreDistribution(self.mean + points, self.variance)
+        return ScoreDistribution(self.mean + points, self.variance, np.concatenate([np.zeros(points), self.pmf]))
+
+    def chance_to_beat(self, other):
+        """Expects another ScoreDistribution. Returns the probability that a score from this distribution is higher, counting
+        half of the probability of a tie. Exact when both distributions are, otherwise from the normal approximation. Clamped to
+        [0, 1], as the rounding of an exact comparison can stray just outside it."""
+        if self.pmf is not None and other.pmf is not None:
+            other_below = np.concatenate([[0.0], np.cumsum(other.pmf)])
+            scores = np.arange(len(self.pmf))
+            below = other_below[np.minimum(scores, len(other.pmf))]
+            tied = np.where(scores < len(other.pmf), other.pmf[np.minimum(scores, len(other.pmf) - 1)], 0.0)
+            return min(1.0, max(0.0, float(self.pmf @ (below + tied / 2))))
+        spread = math.sqrt(self.variance + other.variance)
+        if spread == 0:
+            return 0.5 + math.copysign(0.5, self.mean - other.mean) * (self.mean != other.mean)
+        return 0.5 * (1 + math.erf((self.mean - other.mean) / (spread * math.sqrt(2))))
+
+
+class WinEstimator:
+    """Estimates win probabilities from the cached moments table. The strategy for a board state, its exact distributions
+    and the distributions of the states it leads to are kept in LRU caches, so repeated estimates in a game are cheap."""
+
+    def __init__(self, moments, exact_open=EXACT_OPEN, cache_size=4096, rules=None):
+        """Expects the table from load_moments, the number of open categories from which distributions are worked out exactly,
+        the number of board states to keep per cache and the Rules the table was solved for, the default variant when None."""
+        self.moments = moments
+        self.exact_open = exact_open
+        self.rules = rules or get_rules()
+        self.full_mask = (1 << self.rules.num_categories) - 1
+        self.arrays = _turn_arrays(self.rules)
+        self.final_rolls = lru_cache(maxsize=cache_size)(self._final_rolls)
+        self.keep_policy = lru_cache(maxsize=cache_size)(self._keep_policy)
+        self.turn_start = lru_cache(maxsize=cache_size)(self._turn_start)
+
+    def _final_rolls(self, state):
+        """Expects a board state with an open category. Returns, for each of the 252 final rolls, the expected score to come
+        when the roll is scored in the best category, the points gained there and the state it leads to."""
+        mask, upper, yahtzee_scored = state
+        outcomes, forbidden = mask_outcomes(mask, self.arrays)
+        open_categories = [category for category in range(self.rules.num_categories) if not mask >> category & 1]
+        gained, next_upper, next_yahtzee = (
+            np.stack([outcomes[category][part][upper, yahtzee_scored] for category in open_categories])
+            for part in range(3)
+        )
+        next_masks = np.array([mask | 1 << category for category in open_categories])[:, None]
+        values = gained + self.moments[next_masks, next_upper, next_yahtzee, 0]
+        if forbidden is not None:
+            values = np.where(forbidden[open_categories], -np.inf, values)
+        chosen = values.argmax(axis=0)
+        rolls = np.arange(len(table.ROLLS))
+        best = values[chosen, rolls]
+        gained = gained[chosen, rolls]
+        next_states = list(
+            zip(
+                next_masks[chosen, 0].tolist(),
+                next_upper[chosen, rolls].tolist(),
+                next_yahtzee[chosen, rolls].tolist(),
+            )
+        )
+        return best, gained, next_states
+
+    def _keep_policy(self, state):
+        """Expects a board state. Returns the (252, 252) matrices of the probability of each roll after the next reroll, from
+        each roll with one and with two rerolls left, holding the dice with the highest expected score."""
+        rolled = self.final_rolls(state)[0]
+        subset_keeps = self.arrays["subset_keeps"]
+        policy = []
+        for _ in range(2):
+            keep_values = (self.arrays["transition"] @ rolled)[subset_keeps]
+            chosen = subset_keeps[np.arange(len(table.ROLLS)), keep_values.argmax(axis=1)]
+            policy.append(self.arrays["transition"][chosen])
+            rolled = keep_values.max(axis=1)
+        return policy
+
+    def final_roll_probabilities(self, state, roll=None, rerolls=2):
+        """Expects a board state and optionally a roll in progress with the rerolls left. Returns the (252,) probability of
+        ending the turn on each roll, from the start of the turn when roll is None."""
+        one_left, two_left = self.keep_policy(state)
+        if roll is None:
+            return self.arrays["transition"][transitions.EMPTY_KEEP] @ two_left @ one_left
+        probabilities = np.zeros(len(table.ROLLS))
+        probabilities[table.roll_index(roll)] = 1.0
+        for step in (two_left, one_left)[2 - rerolls :]:
+            probabilities = probabilities @ step
+        return probabilities
+
+    def remaining(self, state, roll=None, rerolls=2):
+        """Expects a board state and optionally a roll in progress with the rerolls left. Returns the ScoreDistribution of the
+        score still to come, exact when every state the turn can lead to has at most exact_open categories open."""
+        if state[0] == self.full_mask:
+            return ScoreDistribution.exactly(np.ones(1))
+        if roll is None and bin(self.full_mask & ~state[0]).count("1") > self.exact_open:
+            mean, variance = self.moments[state].tolist()
+            return ScoreDistribution(mean, variance)
+        probabilities = self.final_roll_probabilities(state, roll, rerolls)
+        _, gained, next_states = self.final_rolls(state)
+        outcomes = {}
+        for final in np.flatnonzero(probabilities):
+            key = (int(gained[final]), next_states[final])
+            outcomes[key] = outcomes.get(key, 0.0) + probabilities[final]
+        return ScoreDistribution.mixture(
+            [(probability, points, self.turn_start(after)) for (points, after), probability in outcomes.items()]
+        )
+
+    def _turn_start(self, state):
+        """Expects a board state. Returns the ScoreDistribution of the score to come from the start of its next turn."""
+        return self.remaining(state)
+
+    def final_scores(self, board, roll=None, rerolls=2):
+        """Expects a player's Board and optionally their roll in progress with the rerolls left. Returns the ScoreDistribution
+        of the player's final score."""
+        return self.remaining(board.state(), roll, rerolls).shifted(board.final_score())
+
+    def win_probabilities(self, boards, current=0, roll=None, rerolls=2):
+        """Expects the Boards of two players, the index of the player whose turn it is and optionally that player's roll in
+        progress with the rerolls left. Returns each player's probability of winning, a tie counting as half a win."""
+        first, second = (
+            self.final_scores(board, roll, rerolls) if index == current else self.final_scores(board)
+            for index, board in enumerate(boards)
+        )
+        chance = first.chance_to_beat(second)
+        return chance, 1 - chance
+
+
+def main(argv=None):
+    """Command line entry point. Solves the table and prints the mean and spread of the score of a new game."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rules", default=None, help="rules variant to solve, standard Yahtzee by default")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes, every core by default")
+    parser.add_argument("--output", default=None, help="table file to write, named after the rules by default")
+    args = parser.parse_args(argv)
+    moments = solve(args.output, args.workers, rules=get_rules(args.rules))
+    mean, variance = moments[0, 0, 0].tolist()
+    print(f"score of a new game: mean {mean:.4f}, standard deviation {math.sqrt(variance):.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,86 @@
 import tkinter as tk
-from tkinter import messagebox
+import random
 import sys
 import os
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from engine import tracing
+from engine.dice import BufferedDice, game_dice
+from engine.opponent import DEFAULT_STRENGTH
+from engine.rules import get_rules
+
+DIE_SIZE = 200
+DIE_SCALES = ((1, 1), (4, 5), (3, 4), (2, 3))
+SCORE_AREA_HEIGHT = 620
+SCREEN_MARGIN = 80
+
+_image_cache = {}
+
+
+def load_image(path, zoom=1, subsample=1):
+    """Expects an image path and the zoom and subsample factors to scale it by. Decodes and scales the image the first time it is
+    asked for and returns the cached PhotoImage after that, so each size of each image is only ever produced once."""
+    key = (path, zoom, subsample)
+    image = _image_cache.get(key)
+    if image is None:
+        image = tk.PhotoImage(file=path)
+        if zoom > 1:
+            image = image.zoom(zoom)
+        if subsample > 1:
+            image = image.subsample(subsample)
+        _image_cache[key] = image
+    return image
+
+
+def fit_die_scale(screen_height):
+    """Expects the screen height. Returns the largest (zoom, subsample) of DIE_SCALES whose window fits on the screen."""
+    for zoom, subsample in DIE_SCALES:
+        if SCORE_AREA_HEIGHT + 2 * (DIE_SIZE * zoom // subsample) + SCREEN_MARGIN <= screen_height:
+            return zoom, subsample
+    return DIE_SCALES[-1]
+
+
+class BudgetedCall:
+    """A call running on the window's thinker thread under a time budget, see GameGui.run_with_budget."""
+
+    def __init__(self, window, deadline):
+        """Expects the GameGui polling for the call and the time.monotonic() it must be done by. The Future is set once the
+        call is submitted."""
+        self.window = window
+        self.future = None
+        self.deadline = deadline
+        self.cancelled = threading.Event()
+        self.poll = None
+
+    def stop(self):
+        """Cancels the call if it has not started yet and sets cancelled, so a running call can give up at its next check.
+        A running call that never checks it still runs to the end on the thinker thread, its result dropped."""
+        self.cancelled.set()
+        self.future.cancel()
+
+    def cancel(self):
+        """Stops waiting for the call, so its callback is never called, and stops the call."""
+        self.stop()
+        if self.poll is not None:
+            self.window.after_cancel(self.poll)
+            self.poll = None
 
 
 class GameGui(tk.Frame):
-    """Class for creating Tkinter instance and setup for use by Yahtzee class. """
+    """Class for creating Tkinter instance and setup for use by Yahtzee class. The dice images are not decoded before the
+    welcome screen is shown: they load one per idle callback once the window is first painted, or when a die is first drawn."""
 
-    def __init__(self, master=None):
+    def __init__(self, master=None, die_scale=None):
+        """Expects the root window and the (zoom, subsample) to scale the 200 pixel dice images by, fitted to the screen when None.
+        The window is as tall as the score area plus two rows of dice."""
         super().__init__(master)
         self.master = master
-        self.height = 1020
+        self.die_zoom, self.die_subsample = die_scale or fit_die_scale(master.winfo_screenheight())
+        self.die_height = self.die_width = DIE_SIZE * self.die_zoom // self.die_subsample
+        self.height = SCORE_AREA_HEIGHT + 2 * self.die_height
         self.width = 600
         self.main_bg_color = "#59728f"
         self.popup_frame_bg_color = "#8093A9"
@@ -18,16 +88,35 @@ class GameGui(tk.Frame):
         self.canvas = tk.Canvas(
             self.master, height=self.height, width=self.width, bg=self.main_bg_color
         )
-        self.title = master.title("Yahtzee")
-        self.icon = master.iconbitmap("images/logo_small.ico")
-        self.die_height, self.die_width = (200, 200)
-        self.dice_imgs = [tk.PhotoImage(file=f"images/die{i}.png") for i in range(1, 7)]
-        self.highlight_imgs = [
-            tk.PhotoImage(file=f"images/die{i}_highlight.png") for i in range(1, 7)
-        ]
-        self.drawn_dice = []
+        self.rules = get_rules()
+        self.dice = None
+        self.dice_seed = None
+        self.games_started = 0
+        self.computer_strength = DEFAULT_STRENGTH
+        self.row_height = 40
+        self.title = master.title(self.rules.title)
+        try:
+            self.icon = master.iconbitmap("images/logo_small.ico")
+        except tk.TclError:
+            # X11 Tk only takes XBM bitmaps, the .ico icon is for Windows
+            self.icon = None
+        self.preload = None
+        self.dice_items = []
+        self.die_command = None
+        self.animate_rolls = True
+        self.roll_frames = 10
+        self.roll_frame_ms = 33
+        self.animation = None
         self.category_buttons = []
+        self.odds = None
+        self.win_estimator = None
+        self.optimizer = None
+        self.background_loads = {}
+        self.worker = None
+        self.thinker = None
         self.player_scores = {}
+        self.player_score_text = {}
+        self.name_labels = {}
         self.roll_button = tk.Button(
             self.canvas,
             text="ROLL",
@@ -49,6 +138,26 @@ class GameGui(tk.Frame):
             self.width // 1.5,
         )
         self.main_widget()
+        self.create_dice()
+        self.canvas.bind("<Expose>", self.start_preload)
+
+    def set_rules(self, rules):
+        """Expects the engine.rules Rules to play by. Titles the window after the variant and fits its category rows into
+        the score area. Must be called before the category buttons are first drawn."""
+        self.rules = rules
+        self.row_height = min(40, 520 // rules.num_categories)
+        self.title = self.master.title(rules.title)
+
+    def new_game_dice(self):
+        """Returns the engine.dice source the players of a new game roll with: with a dice_seed, a source seeded from it and
+        the number of the game in this session, so every game of a session can be played again, otherwise one unseeded
+        BufferedDice shared by every game."""
+        self.games_started += 1
+        if self.dice_seed is not None:
+            return game_dice(self.dice_seed, self.games_started)
+        if self.dice is None:
+            self.dice = BufferedDice()
+        return self.dice
 
     def main_widget(self):
         """Packs canvas to the screen"""
@@ -56,7 +165,9 @@ class GameGui(tk.Frame):
         self.canvas.pack()
 
     def close_game(self):
-        """Calls destory on root object and calls for system exit."""
+        """Cancels the computer moves not started yet, calls destory on root object and calls for system exit."""
+        if self.thinker is not None:
+            self.thinker.shutdown(wait=False, cancel_futures=True)
         # root.quit()
         # root.withdraw()
         root.destroy()
@@ -93,30 +204,251 @@ class GameGui(tk.Frame):
             x=self.width // 2, y=(self.roll_button.winfo_y() - 20), anchor="center"
         )
 
-    def place_dice(self):
-        """Iterates over the drawn_dice list and placement list to place dice in 
-        intended positions of three dice in row at bottom of screen and two dice centered above the bottom row"""
-        for index, (dice, placement) in enumerate(
-            zip(self.drawn_dice, [0, 0, 1, 0, 2]), start=1
-        ):
-            if index == 2:
-                dice.place(
-                    x=(self.width / 2),
-                    y=(self.height - (self.die_height * 2) - 8),
-                    anchor="ne",
+    def create_dice(self):
+        """Creates the five dice as hidden canvas image items in their intended positions of three dice in row at bottom of screen
+        and two dice centered above the bottom row. Binds the click handler of each die once; clicks are passed to die_command."""
+        top_row_y = self.height - self.die_height * 2 - 8
+        bottom_row_y = self.height - self.die_height - 2
+        left = (self.width - self.die_width * 3) // 2
+        positions = [
+            (left, bottom_row_y, "nw"),
+            (self.width / 2, top_row_y, "ne"),
+            (left + self.die_width, bottom_row_y, "nw"),
+            (self.width / 2, top_row_y, "nw"),
+            (left + self.die_width * 2, bottom_row_y, "nw"),
+        ]
+        for index, (x, y, anchor) in enumerate(positions):
+            die = self.canvas.create_image(x, y, anchor=anchor, state="hidden")
+            self.canvas.tag_bind(
+                die, "<Button-1>", lambda event, index=index: self.click_die(index)
+            )
+            self.dice_items.append(die)
+
+    def click_die(self, index):
+        """Expects a die index. Passes the click to die_command if the dice are currently clickable."""
+        if self.die_command is not None:
+            self.die_command(index)
+
+    def die_image(self, face, highlighted=False):
+        """Expects a face and whether the die is held. Returns the face image at the window's die size from the image cache."""
+        highlight = "_highlight" if highlighted else ""
+        return load_image(
+            f"images/die{face}{highlight}.png", self.die_zoom, self.die_subsample
+        )
+
+    def start_preload(self, event=None):
+        """Bound to the first <Expose> of the canvas. Starts loading the dice images in idle callbacks, one image per callback,
+        so the welcome screen stays responsive while they decode."""
+        self.canvas.unbind("<Expose>")
+        pending = [(face, highlighted) for highlighted in (False, True) for face in range(1, 7)]
+
+        def load_next():
+            face, highlighted = pending.pop(0)
+            self.die_image(face, highlighted)
+            self.preload = self.after_idle(load_next) if pending else None
+
+        self.preload = self.after_idle(load_next)
+
+    def load_in_background(self, name, build, on_ready):
+        """Expects a name, a function taking no arguments and a callback taking what it returns. Calls build in a background
+        thread the first time name is asked for, so slow imports and table loads never hold up the event loop, and polls for
+        the result from after callbacks. Calls on_ready with the result once it is there. If build raises, on_ready is never called."""
+        if name in self.background_loads:
+            return
+        built = []
+        loader = self.background_loads[name] = threading.Thread(
+            target=lambda: built.append(build()), name=name, daemon=True
+        )
+        loader.start()
+
+        def poll():
+            if loader.is_alive():
+                self.after(20, poll)
+            elif built:
+                on_ready(built[0])
+
+        self.after(20, poll)
+
+    def run_in_background(self, function, on_done, *args):
+        """Expects a function, a callback and the arguments to call the function with. Runs the call on the window's worker
+        thread, one call at a time in the order they were made, and calls on_done with the result from an after callback.
+        If the call raises, on_done is never called."""
+        if self.worker is None:
+            self.worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="gamegui")
+        future = self.worker.submit(function, *args)
+
+        def poll():
+            if not future.done():
+                self.after(10, poll)
+            elif future.exception() is None:
+                on_done(future.result())
+
+        self.after(10, poll)
+
+    def run_with_budget(self, function, on_done, budget, fallback, *args):
+        """Expects a function, a callback, a time budget in seconds, a function taking no arguments and the arguments to call
+        the function with. Runs the call on the window's thinker thread, apart from the worker so computer moves never wait
+        behind win chances, and polls for it from after callbacks. The function is also passed the BudgetedCall's cancelled
+        event as its cancelled keyword argument, set once the budget runs out or the call is cancelled, and should check it
+        between steps so a stale call frees the thinker thread for the next one. Calls on_done with the result, or with what
+        fallback returns once the budget runs out or if the call raises, the late result then being dropped.
+        Returns the BudgetedCall, whose cancel stops it before on_done is called."""
+        if self.thinker is None:
+            self.thinker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="thinker")
+        call = BudgetedCall(self, time.monotonic() + budget)
+        call.future = self.thinker.submit(function, *args, cancelled=call.cancelled)
+
+        def poll():
+            call.poll = None
+            if call.future.done():
+                on_done(fallback() if call.future.exception() is not None else call.future.result())
+            elif time.monotonic() >= call.deadline:
+                call.stop()
+                on_done(fallback())
+            else:
+                call.poll = self.after(10, poll)
+
+        call.poll = self.after(10, poll)
+        return call
+
+    def load_odds(self, on_ready=None):
+        """Expects an optional callback. Builds the engine.odds tables in the background the first time it is called.
+        Sets odds and calls on_ready once they are built."""
+
+        def build():
+            from engine.odds import TurnOdds
+
+            return TurnOdds(self.rules)
+
+        def ready(odds):
+            self.odds = odds
+            if on_ready:
+                on_ready()
+
+        self.load_in_background("odds", build, ready)
+
+    def load_win_estimator(self, on_ready=None):
+        """Expects an optional callback. Loads the engine.winprob moments table in the background the first time it is called,
+        solving it first in a separate process when the file is missing or stale, which takes a few minutes once.
+        Sets win_estimator and calls on_ready once it is loaded."""
+
+        rules = self.rules
+
+        def build():
+            from engine import solver, winprob
+
+            try:
+                moments = winprob.load_moments(rules=rules)
+            except (FileNotFoundError, solver.StaleTableError):
+                subprocess.run(
+                    [sys.executable, "-m", "engine.winprob", "--rules", rules.name],
+                    cwd=os.path.dirname(os.path.abspath(__file__)),
+                    stderr=subprocess.DEVNULL,
+                    stdout=subprocess.DEVNULL,
+                    check=True,
                 )
-            elif index == 4:
-                dice.place(
-                    x=(self.width / 2),
-                    y=(self.height - self.die_height * 2 - 8),
-                    anchor="nw",
+                moments = winprob.load_moments(rules=rules)
+            return winprob.WinEstimator(moments, rules=rules)
+
+        def ready(win_estimator):
+            self.win_estimator = win_estimator
+            if on_ready:
+                on_ready()
+
+        self.load_in_background("win estimator", build, ready)
+
+    def load_optimizer(self, on_ready=None):
+        """Expects an optional callback. Loads the engine.solver value table into an engine.holds HoldOptimizer in the background
+        the first time it is called, solving the table first in a separate process when the file is missing or stale.
+        Sets optimizer and calls on_ready once it is loaded."""
+
+        rules = self.rules
+
+        def build():
+            from engine import solver
+            from engine.holds import HoldOptimizer
+
+            try:
+                values = solver.load_table(rules=rules)
+            except (FileNotFoundError, solver.StaleTableError):
+                subprocess.run(
+                    [sys.executable, "-m", "engine.solver", "--rules", rules.name],
+                    cwd=os.path.dirname(os.path.abspath(__file__)),
+                    stderr=subprocess.DEVNULL,
+                    stdout=subprocess.DEVNULL,
+                    check=True,
                 )
+                values = solver.load_table(rules=rules)
+            return HoldOptimizer(values, rules=rules)
+
+        def ready(optimizer):
+            self.optimizer = optimizer
+            if on_ready:
+                on_ready()
+
+        self.load_in_background("optimizer", build, ready)
+
+    def show_category_odds(self, odds=None):
+        """Expects a dict of category name to (probability of a non-zero score, expected points), or None.
+        Appends the odds to the buttons of the categories in odds and shows only the name on the others.
+        Only buttons whose text changed are reconfigured."""
+        for category_button, category in zip(self.category_buttons, self.rules.categories):
+            text = category.title()
+            if odds and category in odds:
+                probability, points = odds[category]
+                text = f"{text}  {min(probability, 1):.0%}  ~{points:.1f}"
+            if category_button["text"] != text:
+                category_button["text"] = text
+
+    def draw_die(self, index, face, highlighted=False):
+        """Expects a die index, the face to show and whether the die is held. Swaps the die's image to the cached face image."""
+        self.canvas.itemconfigure(
+            self.dice_items[index], image=self.die_image(face, highlighted), state="normal"
+        )
+
+    def draw_dice(self, faces, rolling=(), on_done=None):
+        """Expects the faces of the five dice, the indices of the dice that were just rolled and an optional callback.
+        When animate_rolls is set, shows random faces on the rolling dice for roll_frames frames scheduled against the clock
+        so the frame rate stays steady, then draws the final faces and calls on_done. A new call cancels a running animation."""
+        self.stop_animation()
+        rolling = list(rolling)
+        if not (self.animate_rolls and rolling):
+            for index, face in enumerate(faces):
+                self.draw_die(index, face)
+            if on_done:
+                on_done()
+            return
+        start = time.perf_counter()
+
+        def frame(number):
+            if number < self.roll_frames:
+                for index in rolling:
+                    self.draw_die(index, random.randint(1, 6))
+                for index in set(range(len(faces))) - set(rolling):
+                    self.draw_die(index, faces[index])
+                next_frame = start + (number + 1) * self.roll_frame_ms / 1000
+                delay = int((next_frame - time.perf_counter()) * 1000)
+                self.animation = self.after(max(delay, 1), frame, number + 1)
             else:
-                dice.place(
-                    x=(self.die_width * placement),
-                    y=(self.height - self.die_height - 2),
-                    anchor="nw",
-                )
+                self.animation = None
+                for index, face in enumerate(faces):
+                    self.draw_die(index, face)
+                if on_done:
+                    on_done()
+
+        frame(0)
+
+    def stop_animation(self):
+        """Cancels a running roll animation."""
+        if self.animation is not None:
+            self.after_cancel(self.animation)
+            self.animation = None
+
+    def hide_dice(self):
+        """Cancels a running roll animation and hides the five dice."""
+        self.stop_animation()
+        for die in self.dice_items:
+            self.canvas.itemconfigure(die, state="hidden")
 
 
 root = tk.Tk()
@@ -127,9 +459,12 @@ game = GameGui(root)
 def on_close():
     """Creates messagebox object to prompt "yes or no?" to user when main window Close/Exit ("X") button is clicked.
     If user choses yes, root Tkinter instance is destroyed and os._exit(1) terminates program."""
+    from tkinter import messagebox
+
     close = messagebox.askokcancel("Yahtzee", "Would you like to close the program?")
     if close:
         root.destroy()
+        tracing.finish()
         os._exit(1)
 
 
@@ -1,3 +1,5 @@
+import random
+
 from turn import TurnTaker
 from calculate_score import Scorer
 from scoreboard import ScoreKeeper
@@ -8,15 +10,17 @@ class Player(TurnTaker, ScoreKeeper):
 
     _counter = 0
 
-    def __init__(self, name):
-        """Expects a name for the instance.
-        Initializes the player class to inherit from the TurnTaker Score and ScoreKeeper classes"""
+    def __init__(self, name, rules=None, dice=random, opponent=None):
+        """Expects a name for the instance, the Rules to play by, the game window's rules when None, the engine.dice
+        source to roll with, and the engine.opponent Opponent deciding the moves of a computer player, None for a person.
+        Initializes the player class to inherit from the TurnTaker Score and ScoreKeeper classes.
+        The player is its own board, so the scores drawn on the canvas are the ones the turns write to"""
 
-        ScoreKeeper.__init__(self)
-        self.board = ScoreKeeper()
-        TurnTaker.__init__(self, self.board)
+        ScoreKeeper.__init__(self, rules)
+        TurnTaker.__init__(self, self, dice)
         Player._counter += 1
         self.name = name
+        self.opponent = opponent
         self.id = Player._counter
 
     def delete_player(self):
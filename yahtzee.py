@@ -1,11 +1,16 @@
 from gamegui import GameGui, game, root, on_close
 from player import Player
 from scoreboard import ScoreKeeper
-from tkinter import messagebox
-import sys
+from calculate_score import Scorer
+from turn import TurnTaker
+from engine.game import Game
+from engine.eventlog import EventLog
+from engine.snapshot import Autosave
+from engine.opponent import STRENGTHS, Opponent
+from engine import dice, rules, tracing
 import tkinter as tk
-import json
-import os
+
+COMPUTER_PAUSE_MS = 600
 
 
 class Yahtzee(GameGui, Player):
@@ -17,18 +22,25 @@ class Yahtzee(GameGui, Player):
         self.active_players = []
         self.highscore_labels = []
         self.player_count = len(self.active_players)
-        self.scores_file = "highscores.json"
+        self.scores_file = "highscores.db"
+        self.event_log = EventLog("games.log")
+        self.autosave = Autosave("autosave.bin")
         self.placed_highscore_items = []
-        self.var = tk.IntVar()
+        self.match = None
+        self.win_chance_request = None
+        self.thinking = None
+        self.computer_pause = None
         self.board = ScoreKeeper()
         self.ask_for_players()
 
     def ask_for_players(self):
         """Displays and positions the initial title text and player count select buttons.
         The buttons expect user input for desired player count.
-        Once selected, it calls the setup_game function and passes the player count to it. """
+        Once selected, it calls the setup_game function and passes the player count to it. Versus Computer sets up a game
+        against a computer player of the strength shown on the strength button, which steps through the strengths when clicked.
+        When the window has not started a game yet and a game was left unfinished, also offers a Resume Game button calling resume_game."""
         self.game.display_start_screen_text(
-            "Welcome to Yahtzee\nHow many players are there?"
+            f"Welcome to {self.game.rules.title}\nHow many players are there?"
         )
         one_player_button = tk.Button(
             self.game.canvas,
@@ -48,30 +60,114 @@ class Yahtzee(GameGui, Player):
         two_player_button.place(
             x=self.game.width // 2, y=self.game.height // 3 + 150, anchor="w"
         )
-        buttons = one_player_button, two_player_button
+        computer_button = tk.Button(
+            self.game.canvas,
+            text="Versus Computer",
+            command=lambda: self.setup_game(1, buttons, computer=True),
+            bg=self.game.button_bg_color,
+        )
+        computer_button.place(
+            x=self.game.width // 2, y=self.game.height // 3 + 190, anchor="e"
+        )
+        strength_button = tk.Button(
+            self.game.canvas,
+            text=f"Computer: {self.game.computer_strength.title()}",
+            bg=self.game.button_bg_color,
+        )
+        strength_button["command"] = lambda: self.next_strength(strength_button)
+        strength_button.place(
+            x=self.game.width // 2, y=self.game.height // 3 + 190, anchor="w"
+        )
+        buttons = one_player_button, two_player_button, computer_button, strength_button
+        saved = self.autosave.load() if self.game.games_started == 0 else None
+        if saved is not None:
+            resume_button = tk.Button(
+                self.game.canvas,
+                text="Resume Game",
+                command=lambda: self.resume_game(saved, buttons),
+                bg=self.game.button_bg_color,
+            )
+            resume_button.place(
+                x=self.game.width // 2, y=self.game.height // 3 + 230, anchor="center"
+            )
+            buttons += (resume_button,)
         self.game.roll_button["state"] = "disabled"
 
-    def setup_game(self, player_count, buttons):
-        """Expects a player count and button objects. 
-        Initializes a Player class instance for the desired player amount. 
+    def next_strength(self, strength_button):
+        """Expects the strength button. Moves the game window's computer strength on to the next of STRENGTHS and shows it on the button."""
+        strengths = list(STRENGTHS)
+        self.game.computer_strength = strengths[(strengths.index(self.game.computer_strength) + 1) % len(strengths)]
+        strength_button["text"] = f"Computer: {self.game.computer_strength.title()}"
+
+    def setup_game(self, player_count, buttons, computer=False):
+        """Expects a player count, button objects and whether a computer player joins the game after them.
+        Initializes a Player class instance for the desired player amount, all rolling from the game window's dice for a new game,
+        and a computer Player with an Opponent of the game window's computer strength.
         Destroys the start screen text and buttons and calls the main_game_start function"""
+        game_dice = self.game.new_game_dice()
         for amount in range(1, player_count + 1):
-            self.active_players.append(Player(f"player{amount}"))
+            self.active_players.append(Player(f"player{amount}", dice=game_dice))
+        if computer:
+            self.active_players.append(
+                Player("computer", dice=game_dice, opponent=Opponent(self.game.computer_strength))
+            )
         for item in buttons:
             item.destroy()
         self.game.start_screen_text.destroy()
         self.main_game_start()
 
-    def main_game_start(self):
-        """Activates the roll_button. Calls the place_player_name_frame function.
-        Draws the categories to the screen. Creates a dictionary for storing column position in key of player name.
-        Iterates through active_players and calls draw_player_score to display player names in column positions.
-        Starts a while loop for the main Yahtzee turn taking logic and ends when the last player reaches the last turn.
-        Main Yahtzee logic includes calling each player's roll function and then calls the update scores to refresh current score amounts.
-        Calls the end_of_game_display and end_of_game_text functions and then the get_final_scores and store_player_scores functions
-        which presents the end of game screen for the player's to decide next action Play Again, View Highscores or Quit Game."""
+    def resume_game(self, saved, buttons):
+        """Expects the SavedGame of the unfinished game and the start screen buttons. Switches the window to the rules the game
+        was played by, recreates its players under their saved names, restores their boards and turns from the save and
+        destroys the start screen text and buttons. Calls main_game_start to carry on with the game."""
+        self.game.set_rules(saved.rules)
+        self.board = ScoreKeeper(saved.rules)
+        game_dice = self.game.new_game_dice()
+        for name, strength in zip(saved.names, saved.strengths):
+            opponent = Opponent(strength) if strength is not None else None
+            self.active_players.append(Player(name, saved.rules, game_dice, opponent))
+        self.autosave.restore(saved, self.active_players)
+        for item in buttons:
+            item.destroy()
+        self.game.start_screen_text.destroy()
+        self.main_game_start(saved)
+
+    def main_game_start(self, resume=None):
+        """Expects the SavedGame being resumed, None for a new game. Activates the roll_button, starts building the category
+        odds tables in the background, for two players loading the win probability estimator, and for computer players that
+        play from the solver's value table loading it and handing it to them. A new game calls the
+        place_player_name_frame function, and once every player is named submit_name calls start_match, which draws the
+        board and starts the game. A resumed game already has its names and calls start_match straight away."""
         self.game.roll_button["state"] = "active"
-        self.place_player_name_frame()
+        self.game.roll_button["command"] = ""
+        self.game.load_odds(self.show_odds)
+        if len(self.active_players) == 2:
+            self.game.load_win_estimator(self.show_win_chances)
+        if any(player.opponent is not None and player.opponent.needs_table for player in self.active_players):
+            self.game.load_optimizer(self.hand_out_optimizer)
+            self.hand_out_optimizer()
+        if resume is not None:
+            self.start_match(resume)
+        else:
+            self.place_player_name_frame()
+
+    def hand_out_optimizer(self):
+        """Gives the game window's HoldOptimizer, once it is loaded, to the computer players playing by its rules.
+        Until then they play their fallback moves."""
+        optimizer = self.game.optimizer
+        if optimizer is None:
+            return
+        for player in self.active_players:
+            if player.opponent is not None and player.board.rules is optimizer.rules:
+                player.opponent.use_optimizer(optimizer)
+
+    def start_match(self, resume=None):
+        """Draws the roll button and the categories to the screen. Creates a dictionary for storing column position in key of player name.
+        Iterates through active_players and calls draw_player_score and draw_player_name to display player scores and names in column positions.
+        Creates the engine Game state machine for the active_players with handle_game_event as its listener, records its rolls, holds
+        and scores in the games.log event log, keeps the game in progress in the autosave, points the roll button at roll_clicked and starts the first turn.
+        Expects the SavedGame being resumed, None for a new game: a resumed game carries on from the saved turn instead and is
+        not written to the event log, whose replays start from an empty board. From here on the game only advances from Tk callbacks, nothing waits for input."""
         self.game.draw_roll_button()
         self.board.scores_on_board()
         self.player_score_column = {
@@ -83,17 +179,145 @@ class Yahtzee(GameGui, Player):
         for player in self.active_players:
             player.draw_player_scores(self.player_score_column[player])
             self.draw_player_name(player)
-        while self.active_players[-1].turn_count < 13:
-            for i in self.active_players:
-                self.game.turn_indicator["text"] = f"{i.name.title()}'s turn"
-                self.game.after(1, self.game.draw_turn_indicator)
-                self.game.update_idletasks()
-                i.roll()
-                self.update_scores()
-        self.end_of_game_display()
-        self.end_of_game_text()
-        # self.get_final_scores()
-        self.store_player_scores()
+        self.match = Game(self.active_players, self.handle_game_event)
+        if resume is None:
+            self.event_log.listen(self.match)
+        self.autosave.listen(self.match)
+        self.game.roll_button["command"] = self.roll_clicked
+        if resume is None:
+            self.match.start()
+        else:
+            self.match.resume(resume.current, resume.state)
+
+    def roll_clicked(self):
+        """Command of the roll button. Rolls when the state machine allows it and a person is playing the turn, ignores the click otherwise."""
+        if self.match is not None and self.match.can_roll() and self.match.current_player.opponent is None:
+            self.match.roll()
+
+    def handle_game_event(self, event, player, **details):
+        """Listener of the engine Game. Expects an event name, the player it concerns and the event details.
+        On "turn started" shows whose turn it is and makes the first roll of the turn.
+        On "rolled" refreshes the odds overlay and the win chances, has the player draw the dice and calls roll_drawn once they are drawn.
+        On "held" has the player highlight or de-highlight the die and refreshes the odds overlay.
+        On "scored" calls update_scores to refresh current score amounts.
+        On "game over" closes the event log and shows the final win chances, then calls the end_of_game_display and end_of_game_text functions and then the store_player_scores function
+        which presents the end of game screen for the player's to decide next action Play Again, View Highscores or Quit Game."""
+        if event == "turn started":
+            self.game.turn_indicator["text"] = f"{player.name.title()}'s turn"
+            self.game.after(1, self.game.draw_turn_indicator)
+            self.game.update_idletasks()
+            self.match.roll()
+        elif event == "rolled":
+            self.show_odds()
+            self.show_win_chances()
+            player.show_roll(details["rolling"], lambda: self.roll_drawn(player))
+        elif event == "held":
+            player.show_hold(details["index"], details["held"])
+            self.show_odds()
+        elif event == "scored":
+            self.update_scores()
+        elif event == "game over":
+            self.event_log.close()
+            self.show_win_chances()
+            self.end_of_game_display()
+            self.end_of_game_text()
+            self.store_player_scores()
+
+    def roll_drawn(self, player):
+        """Expects the player whose roll was just drawn. Lets the player hold dice while rolls remain.
+        After the last roll enables the category buttons and asks the player to score.
+        A computer player instead starts working out its move after a pause that lets the roll be seen."""
+        if player.opponent is not None:
+            self.computer_pause = self.game.after(COMPUTER_PAUSE_MS, lambda: self.think(player))
+        elif self.match.state == Game.ROLLED:
+            player.enable_dice(self.match.hold)
+        elif self.match.state == Game.MUST_SCORE:
+            player.enable_categories(self.match.score)
+            if player.turn_count < 3:
+                self.game.turn_indicator[
+                    "text"
+                ] = "Click on a category name to score your roll!"
+            else:
+                self.game.turn_indicator["text"] = "Time to score your roll!"
+            self.game.update_idletasks()
+
+    def think(self, player):
+        """Expects the computer player whose turn it is. Works out its move from copies of its roll and board on the game
+        window's thinker thread, within the opponent's time budget, and calls play_computer_move with it. Opponents whose
+        value table is not loaded yet play the fallback move without waiting."""
+        self.computer_pause = None
+        opponent = player.opponent
+        position = list(player.roll_result), player.num_rolls, player.board.copy()
+        if not opponent.ready:
+            self.play_computer_move(player, opponent.quick_move(*position))
+            return
+        self.thinking = self.game.run_with_budget(
+            opponent.decide,
+            lambda move: self.play_computer_move(player, move),
+            opponent.time_budget,
+            lambda: opponent.quick_move(*position),
+            *position,
+        )
+
+    def play_computer_move(self, player, move):
+        """Expects a computer player and the engine.opponent Move it decided on. Scores the move's category, or holds the dice
+        of the move and rolls again after a pause that lets the held dice be seen. Ignores the move if the game has moved on."""
+        self.thinking = None
+        if self.match is None or self.match.current_player is not player or self.match.state not in (Game.ROLLED, Game.MUST_SCORE):
+            return
+        if move.category is not None:
+            self.match.score(move.category)
+            return
+        for index in range(player.num_dice):
+            if (index in move.keep) != (index in player.kept_dice):
+                self.match.hold(index)
+        self.computer_pause = self.game.after(COMPUTER_PAUSE_MS, self.computer_roll)
+
+    def computer_roll(self):
+        """Rolls again for the computer player whose turn it is."""
+        self.computer_pause = None
+        if self.match is not None and self.match.can_roll():
+            self.match.roll()
+
+    def cancel_computer_move(self):
+        """Stops a computer player's move in progress: drops the move being worked out and the pending roll or move."""
+        if self.thinking is not None:
+            self.thinking.cancel()
+            self.thinking = None
+        if self.computer_pause is not None:
+            self.game.after_cancel(self.computer_pause)
+            self.computer_pause = None
+
+    def show_odds(self):
+        """Shows the odds of the current player's open categories for the dice held while rolls remain, once the odds tables
+        are built, and hides them otherwise. The odds of an empty hold do not depend on the dice, so they show while the
+        roll is still animating."""
+        if self.match is None or self.match.state == Game.GAME_OVER:
+            return
+        player = self.match.current_player
+        if self.match.state == Game.ROLLED and self.game.odds is not None:
+            player.show_odds(self.game.odds)
+        else:
+            player.hide_odds()
+
+    def show_win_chances(self):
+        """In two player games, once the win probability estimator is loaded, works out each player's chance of winning from
+        copies of both boards and the current player's roll on the game window's worker thread, and shows the chances next
+        to the player names when they arrive, unless the game has moved on since."""
+        estimator = self.game.win_estimator
+        if self.match is None or len(self.active_players) != 2 or estimator is None:
+            return
+        player = self.match.current_player
+        roll = list(player.roll_result) if self.match.state in (Game.ROLLED, Game.MUST_SCORE) else None
+        self.win_chance_request = request = (self.match, self.match.current, roll, player.num_rolls)
+        boards = [active_player.scores.copy() for active_player in self.active_players]
+
+        def show(chances):
+            if self.win_chance_request is request:
+                for active_player, chance in zip(self.active_players, chances):
+                    self.game.name_labels[active_player.id]["text"] = f"{active_player.name.title()}  {chance:.0%}"
+
+        self.game.run_in_background(estimator.win_probabilities, show, boards, *request[1:])
 
     def place_player_name_frame(self):
         """Displays frame for holding name selection input and enter button. Calls place_player_name_form function."""
@@ -114,10 +338,10 @@ class Yahtzee(GameGui, Player):
         self.place_player_name_form()
 
     def place_player_name_form(self):
-        """Creates and displays entry form and button asking user to input custom names for each player in active_players.
+        """Creates and displays entry form and button asking user to input custom names for each person in active_players, computer players keep their name.
         Binds left mouse button to the entry form to clear preset text and also the retrun key to submit name.
-        Assigns name_player_count a starting value of 0 to correspond submitted names with the player instances in active_players.
-        Sets a wait variable after each name entry to pause until the total amount of players have names assigned and then destroys the prompt_frame."""
+        Assigns name_player_count a starting value of 0 to correspond submitted names with the people in players_to_name
+        and calls prompt_for_name for the first player. submit_name moves on to the next player until every player is named."""
         self.name_form = tk.Entry(
             self.prompt_frame,
             bg=self.game.popup_frame_bg_color,
@@ -125,7 +349,7 @@ class Yahtzee(GameGui, Player):
             font=(None, 12),
         )
         self.name_form.bind("<Button-1>", self.clear_form)
-        self.name_form.bind("<Return>", lambda x: self.submit_name(_))
+        self.name_form.bind("<Return>", self.submit_name)
         self.name_form.place(
             height=self.prompt_frame_x // 2,
             width=self.prompt_frame_y * 5 / 7,
@@ -134,24 +358,26 @@ class Yahtzee(GameGui, Player):
             anchor="nw",
         )
         self.game.update_idletasks()
+        self.name_button = tk.Button(
+            self.prompt_frame,
+            bg=self.game.button_bg_color,
+            activebackground=self.game.button_bg_color,
+            text="Enter",
+            command=lambda: self.submit_name(None),
+        )
+        self.name_button.place(
+            height=self.prompt_frame_x // 2,
+            width=self.prompt_frame_y * 1 / 5,
+            x=self.name_form.winfo_width(),
+            y=8,
+        )
+        self.players_to_name = [player for player in self.active_players if player.opponent is None]
         self.named_player_count = 0
-        for index, _ in enumerate(range(len(self.active_players)), start=1):
-            self.name_form.insert(12, f"Enter player {index}'s name")
-            self.name_button = tk.Button(
-                self.prompt_frame,
-                bg=self.game.button_bg_color,
-                activebackground=self.game.button_bg_color,
-                text="Enter",
-                command=lambda: self.submit_name(_),
-            )
-            self.name_button.place(
-                height=self.prompt_frame_x // 2,
-                width=self.prompt_frame_y * 1 / 5,
-                x=self.name_form.winfo_width(),
-                y=8,
-            )
-            self.game.wait_variable(self.var)
-        self.prompt_frame.destroy()
+        self.prompt_for_name()
+
+    def prompt_for_name(self):
+        """Fills the entry form with the preset text asking for the name of the next unnamed player."""
+        self.name_form.insert(0, f"Enter player {self.named_player_count + 1}'s name")
 
     def clear_form(self, event):
         """Clears entry form."""
@@ -161,30 +387,37 @@ class Yahtzee(GameGui, Player):
         """Expects an event from either name selection entry form or button.
         Calls set_player_name passing the current Player instance.
         Calls clear_form to delete current text in entry form.
-        Sets the wait variable to 1 which allows the next player to select name or returns to next call in main_game_start."""
-        self.set_player_name(self.active_players[self.named_player_count])
+        Prompts for the next player's name, or destroys the prompt_frame and calls start_match once every player is named."""
+        self.set_player_name(self.players_to_name[self.named_player_count])
         self.clear_form(0)
         self.named_player_count += 1
-        self.var.set(1)
+        if self.named_player_count < len(self.players_to_name):
+            self.prompt_for_name()
+        else:
+            self.prompt_frame.destroy()
+            self.start_match()
 
     def set_player_name(self, player):
         """Expects the player instance position in active_players list. Gets and assigns entry form text to player.name."""
         player.name = f"{self.name_form.get()}"
 
     def draw_player_name(self, player):
-        """Creates and alignment index to draw player names in position under each player's score column."""
+        """Creates and alignment index to draw player names in position under each player's score column.
+        The name label of each column is created once, kept in game.name_labels and reused on later games."""
         name_alignment_index = {1: 1, 2: 3}
-        name_label = tk.Label(
-            self.canvas,
-            bg=f"{self.game.main_bg_color}",
-            fg="black",
-            text=f"{player.name.title()}",
-            font=(None, 12, "underline"),
-        )
+        name_label = self.game.name_labels.get(player.id)
+        if name_label is None:
+            name_label = self.game.name_labels[player.id] = tk.Label(
+                self.canvas,
+                bg=f"{self.game.main_bg_color}",
+                fg="black",
+                font=(None, 12, "underline"),
+            )
+        name_label["text"] = f"{player.name.title()}"
         self.game.update_idletasks()
         x, y = (
             (self.game.width // 4) * name_alignment_index[player.id],
-            (self.game.category_buttons[-1].winfo_y() + 40),
+            (self.game.category_buttons[-1].winfo_y() + self.game.row_height),
         )
         name_label.place(x=x, y=y, anchor="center")
 
@@ -200,31 +433,25 @@ class Yahtzee(GameGui, Player):
         )
 
     def store_player_scores(self):
-        """Try and except block to look for a JSON scores_file. Either assigns loaded json to json_data or sets up initial object to be dumped and added to.
-        Iterates over active_players and appends the player name and end_of_game_score function to the JSON list object and dumps the updated object."""
-        try:
-            with open(self.scores_file) as f:
-                json_data = json.load(f)
-        except FileNotFoundError:
-            json_data = {"player_scores": []}
-        for player in self.active_players:
-            new_score_list = {"name": player.name, "score": player.end_of_game_score()}
-            json_data["player_scores"].append(new_score_list)
+        """Opens the HighScores store, which migrates an old highscores.json on first use.
+        Records the player name, end_of_game_score function result and bonuses of every person in active_players,
+        which also brings each player's running statistics up to date. Computer players are left out of the highscores."""
+        from engine.highscores import HighScores
 
-        with open(self.scores_file, "w") as f:
-            json.dump(json_data, f)
+        with HighScores(self.scores_file) as highscores:
+            highscores.add_many(
+                (player.name, player.end_of_game_score(), player.scores.upper_bonus > 0, player.scores.yahtzee_bonus)
+                for player in self.active_players
+                if player.opponent is None
+            )
 
     def get_highscores(self):
-        """Opens newly updated JSON file and assigns the load to json_data. 
-        Sorts the list of player scores dictionaries by score and creates Tkinter label objects for the Top 10 scores."""
-        with open(self.scores_file) as f:
-            json_data = json.load(f)
-        sorted_scores = sorted(
-            json_data["player_scores"], key=lambda i: i["score"], reverse=True
-        )
-        for index, (score, name) in enumerate(
-            ((i["score"], i["name"]) for i in sorted_scores[:10]), start=1
-        ):
+        """Reads the Top 10 scores from the HighScores store's score index and creates Tkinter label objects for them."""
+        from engine.highscores import HighScores
+
+        with HighScores(self.scores_file) as highscores:
+            top_scores = highscores.top(10)
+        for index, (name, score) in enumerate(top_scores, start=1):
             highscore_item = tk.Label(
                 self.game.end_frame,
                 text=f"{index}.  {name}  {score}",
@@ -420,14 +647,20 @@ class Yahtzee(GameGui, Player):
             button["command"] = command()
 
     def play_again(self):
-        """Clears the master frame widget and deletes the instances in active_players and clears the active_players list.
+        """Clears the master frame widget and destroys the end of game widgets, which are rebuilt for every game.
+        Stops any computer move in progress. Deletes the instances in active_players and clears the active_players list.
         Calls Yahtzee __init__ method to restart the game from the beginning."""
         master_frame_items = self.get_widget_children(self.game.master)
         for item in master_frame_items:
             item.place_forget()
+        for item in self.game.end_frame.winfo_children():
+            item.destroy()
+        self.cancel_computer_move()
+        self.game.hide_dice()
         for player in self.active_players:
             player.delete_player()
         self.active_players.clear()
+        self.match = None
         self.game.update_idletasks()
         self.__init__()
 
@@ -439,7 +672,8 @@ class Yahtzee(GameGui, Player):
         self.display_highscores()
 
     def quit_game(self):
-        """Calls the close_game function to destroy the root Tkinter instance and calls sys.exit()."""
+        """Stops any computer move in progress and calls the close_game function to destroy the root Tkinter instance and calls sys.exit()."""
+        self.cancel_computer_move()
         self.game.close_game()
 
     def get_widget_children(self, widget):
@@ -452,5 +686,23 @@ class Yahtzee(GameGui, Player):
         return widget_objects
 
 
+game.set_rules(rules.configure())
+game.dice_seed = dice.configure()
+if tracing.configure():
+    tracing.instrument_engine()
+    for owner, attribute in (
+        (Scorer, "score_roll"),
+        (TurnTaker, "show_roll"),
+        (ScoreKeeper, "draw_player_scores"),
+        (GameGui, "draw_dice"),
+        (GameGui, "draw_die"),
+        (GameGui, "update_idletasks"),
+        (Yahtzee, "handle_game_event"),
+        (Yahtzee, "roll_drawn"),
+        (Yahtzee, "update_scores"),
+        (Yahtzee, "store_player_scores"),
+    ):
+        tracing.instrument(owner, attribute)
+
 start = Yahtzee()
 start.game.mainloop()